@@ -3,17 +3,28 @@ import re
 import sqlite3
 import json
 import html
+import hashlib
+import hmac
 import socket
 import sys
 from datetime import datetime
 import telegram
 import threading
 import time
+import queue
+import heapq
+import itertools
+import functools
+import concurrent.futures
+import traceback
 import requests
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, ForceReply
 from telegram import Update, Message
 from telegram import BotCommand, BotCommandScopeChat
 from telegram.utils.helpers import escape_markdown
+from telegram.utils.request import Request
+from telegram.ext.utils.webhookhandler import WebhookHandler, WebhookServer
+import tornado.web
 from telegram.ext import (
     Updater,
     CommandHandler,
@@ -21,7 +32,11 @@ from telegram.ext import (
     CallbackContext,
     CallbackQueryHandler,
     Filters,
-    ConversationHandler
+    ConversationHandler,
+    TypeHandler,
+    Dispatcher,
+    JobQueue,
+    ExtBot
 )
 import os
 import sys
@@ -32,216 +47,748 @@ from telegram.error import Conflict
 from dotenv import load_dotenv
 from datetime import datetime
 from contextlib import contextmanager
+from collections import namedtuple, Counter, OrderedDict, deque
 import logging
+import logging.handlers
+import atexit
 from typing import Optional
 
 
 # Import keep_alive at the top
 try:
-    from keep_alive import start_keep_alive
+    from keep_alive import start_keep_alive, set_webhook_handler, set_status_providers
     KEEP_ALIVE_AVAILABLE = True
 except ImportError as e:
     print(f"Keep alive module not available: {e}")
     KEEP_ALIVE_AVAILABLE = False
 
-def debug_log(message):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] DEBUG: {message}")
+# Logging. Records go through a QueueHandler, so the thread that logs only
+# enqueues; a QueueListener thread formats and writes them to stdout. Records
+# carry key=value fields, both passed explicitly and taken from the context of
+# the handler that is running (see log_context).
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_SECONDS = float(os.getenv("LOG_SAMPLE_SECONDS", "60"))
+
+logger = logging.getLogger("pokeauction")
+log_context = threading.local()
+log_samples = {}  # sample key -> [last logged at, suppressed since]
+log_samples_lock = threading.Lock()
+
+class LogFieldsFilter(logging.Filter):
+    """Render explicit fields plus the current handler context as key=value pairs"""
+
+    def filter(self, record):
+        fields = dict(getattr(log_context, 'fields', None) or {})
+        fields.update(getattr(record, 'fields', None) or {})
+        record.fieldstext = "".join(f" {key}={value}" for key, value in fields.items() if value is not None)
+        return True
 
-SELECT_CATEGORY, GET_POKEMON_NAME, GET_NATURE, GET_IVS, GET_MOVESET, GET_BOOST_INFO, GET_BASE_PRICE, GET_TM_DETAILS = range(2, 10)
+def setup_logging():
+    if logger.handlers:
+        return
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(
+        "[%(asctime)s] %(levelname)s: %(message)s%(fieldstext)s", "%Y-%m-%d %H:%M:%S"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(LogFieldsFilter())
+    logger.addHandler(queue_handler)
+    logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+    logger.propagate = False
+    listener.start()
+    atexit.register(listener.stop)
+
+setup_logging()
+
+def debug_enabled():
+    """Guard for work (extra queries, big f-strings) that only feeds DEBUG logs"""
+    return logger.isEnabledFor(logging.DEBUG)
+
+FAILURE_PREFIXES = ("Error", "Failed", "FATAL", "Couldn't", "Could not", "Critical", "WARNING", "❌", "⚠️")
+
+def debug_log(message, level=None, **fields):
+    """Log message with optional key=value fields.
+
+    Without an explicit level, messages that report a failure ("Error ...",
+    "Failed ...", "Couldn't ...") are logged at WARNING and the rest at
+    DEBUG; lifecycle and audit messages that belong in production logs pass
+    logging.INFO.
+    """
+    if level is None:
+        level = logging.WARNING if message.startswith(FAILURE_PREFIXES) else logging.DEBUG
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={'fields': fields})
+
+def sampled_log(key, message, level=logging.INFO, **fields):
+    """debug_log() for high-frequency events: at most once per LOG_SAMPLE_SECONDS per key"""
+    if not logger.isEnabledFor(level):
+        return
+    now = time.monotonic()
+    with log_samples_lock:
+        sample = log_samples.get(key)
+        if sample and now - sample[0] < LOG_SAMPLE_SECONDS:
+            sample[1] += 1
+            return
+        suppressed = sample[1] if sample else 0
+        log_samples[key] = [now, 0]
+    if suppressed:
+        fields['suppressed'] = suppressed
+    logger.log(level, message, extra={'fields': fields})
 
 @contextmanager
-def db_connection(db_name='auctions.db'):
-    conn = None
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            conn = sqlite3.connect(db_name)
-            conn.row_factory = sqlite3.Row
-            yield conn
-            break
-        except sqlite3.OperationalError as e:
-            if "database is locked" in str(e) and attempt < max_retries - 1:
-                debug_log(f"Database locked, retrying... (attempt {attempt + 1})")
-                time.sleep(0.1 * (attempt + 1))
-                continue
-            else:
-                debug_log(f"Database error: {str(e)}")
-                raise
-        except Exception as e:
-            debug_log(f"Database error: {str(e)}")
-            raise
-        finally:
-            if conn:
-                conn.close()
+def logging_fields(**fields):
+    """Attach fields to every record logged from this thread inside the block"""
+    previous = getattr(log_context, 'fields', None)
+    log_context.fields = dict(previous or {}, **fields)
+    try:
+        yield
+    finally:
+        log_context.fields = previous
+
+# Metrics. Handler, database and Telegram API timings are collected here and
+# rendered in the Prometheus text format for keep_alive's /metrics.
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_HELP = {
+    'pokeauction_handler_seconds': ('histogram', "Time spent in an update handler"),
+    'pokeauction_handler_errors_total': ('counter', "Handler calls that raised"),
+    'pokeauction_db_seconds': ('histogram', "Time spent inside db_connection() blocks, by calling function"),
+    'pokeauction_telegram_api_seconds': ('histogram', "Telegram Bot API request latency, by endpoint"),
+    'pokeauction_telegram_api_errors_total': ('counter', "Telegram Bot API errors, by endpoint and code"),
+    'pokeauction_outbound_wait_seconds': ('histogram', "Time a request waited in the outbound queue"),
+    'pokeauction_slow_handlers_total': ('counter', "Handler calls that held a worker past HANDLER_WATCHDOG_SECONDS"),
+    'pokeauction_lane_dropped_total': ('counter', "Updates dropped because their lane was full"),
+}
+
+metrics_lock = threading.Lock()
+metric_histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+metric_counters = {}  # (name, labels) -> value
+
+def observe(name, labels, seconds):
+    """Record a duration in the histogram name{labels}; labels is a tuple of (key, value)"""
+    with metrics_lock:
+        histogram = metric_histograms.get((name, labels))
+        if histogram is None:
+            histogram = metric_histograms[(name, labels)] = [0] * (len(METRIC_BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(METRIC_BUCKETS):
+            if seconds <= bound:
+                histogram[i] += 1
+        histogram[len(METRIC_BUCKETS)] += 1
+        histogram[-1] += seconds
+
+def inc_metric(name, labels, amount=1):
+    with metrics_lock:
+        metric_counters[(name, labels)] = metric_counters.get((name, labels), 0) + amount
+
+def format_metric_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+def render_metrics(gauges=()):
+    """Prometheus text exposition of every metric, plus (name, help, labels, value) gauges"""
+    with metrics_lock:
+        histograms = {key: list(value) for key, value in metric_histograms.items()}
+        counters = dict(metric_counters)
 
-def init_db():
-    try:
-        with db_connection() as conn:
-            c = conn.cursor()
+    lines = []
+    described = set()
 
-            c.execute('''CREATE TABLE IF NOT EXISTS auctions
-                          (auction_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          item_text TEXT NOT NULL,
-                          photo_id TEXT,
-                          base_price REAL NOT NULL,
-                          current_bid REAL,
-                          current_bidder_id INTEGER,
-                          current_bidder TEXT,
-                          previous_bidder TEXT,
-                          is_active BOOLEAN DEFAULT 1,
-                          auction_status TEXT DEFAULT 'active',
-                          channel_message_id INTEGER,
-                          discussion_message_id INTEGER,
-                          created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                          seller_id INTEGER,
-                          seller_name TEXT)''')
-
-
-            c.execute('''CREATE TABLE IF NOT EXISTS bids
-                         (bid_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          auction_id INTEGER NOT NULL,
-                          bidder_id INTEGER NOT NULL,
-                          bidder_name TEXT NOT NULL,
-                          amount REAL NOT NULL,
-                          timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                          is_active BOOLEAN DEFAULT 1,
-                          FOREIGN KEY(auction_id) REFERENCES auctions(auction_id))''')
-
-            c.execute('''CREATE TABLE IF NOT EXISTS submissions
-                         (submission_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          user_id INTEGER NOT NULL,
-                          data TEXT NOT NULL,
-                          status TEXT DEFAULT 'pending',
-                          created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                          channel_message_id INTEGER)''')
-
-            c.execute('''CREATE TABLE IF NOT EXISTS temp_data
-                         (user_id INTEGER PRIMARY KEY,
-                          data TEXT,
-                          timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)''')
-
-            c.execute('''CREATE TABLE IF NOT EXISTS system_status
-                         (id INTEGER PRIMARY KEY,
-                          submissions_open BOOLEAN DEFAULT 0,
-                          auctions_open BOOLEAN DEFAULT 0)''')
-
-            c.execute('''CREATE TABLE IF NOT EXISTS verification_messages
-                         (submission_id INTEGER,
-                          admin_id INTEGER,
-                          message_id INTEGER,
-                          PRIMARY KEY (submission_id, admin_id),
-                          FOREIGN KEY(submission_id) REFERENCES submissions(submission_id))''')
-            c.execute('''CREATE TABLE IF NOT EXISTS bot_admins
-                         (user_id INTEGER PRIMARY KEY,
-                          username TEXT,
-                          added_by INTEGER,
-                          added_at DATETIME DEFAULT CURRENT_TIMESTAMP)''')
-            c.execute('''CREATE TABLE IF NOT EXISTS active_rejections
-                         (submission_id INTEGER PRIMARY KEY,
-                          admin_id INTEGER NOT NULL,
-                          user_id INTEGER NOT NULL,
-                          item_name TEXT NOT NULL,
-                          original_chat_id INTEGER NOT NULL,
-                          original_message_id INTEGER NOT NULL,
-                          created_at DATETIME DEFAULT CURRENT_TIMESTAMP)''')
-
-            # Add category-specific submission settings table
-            c.execute('''CREATE TABLE IF NOT EXISTS submission_categories
-                         (category TEXT PRIMARY KEY,
-                          enabled BOOLEAN DEFAULT 1,
-                          updated_at DATETIME DEFAULT CURRENT_TIMESTAMP)''')
-            
+    def describe(name, kind, help_text):
+        if name not in described:
+            described.add(name)
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
 
+    for (name, labels), histogram in sorted(histograms.items()):
+        describe(name, 'histogram', METRIC_HELP.get(name, ('', name))[1])
+        for i, bound in enumerate(METRIC_BUCKETS):
+            lines.append(f"{name}_bucket{format_metric_labels(labels + (('le', bound),))} {histogram[i]}")
+        lines.append(f"{name}_bucket{format_metric_labels(labels + (('le', '+Inf'),))} {histogram[len(METRIC_BUCKETS)]}")
+        lines.append(f"{name}_sum{format_metric_labels(labels)} {histogram[-1]:.6f}")
+        lines.append(f"{name}_count{format_metric_labels(labels)} {histogram[len(METRIC_BUCKETS)]}")
 
-            c.execute("PRAGMA table_info(auctions)")
-            existing_columns = [col[1] for col in c.fetchall()]
+    for (name, labels), value in sorted(counters.items()):
+        describe(name, 'counter', METRIC_HELP.get(name, ('', name))[1])
+        lines.append(f"{name}{format_metric_labels(labels)} {value}")
 
-            if 'seller_id' not in existing_columns:
-                c.execute("ALTER TABLE auctions ADD COLUMN seller_id INTEGER")
-                debug_log("Added seller_id column to auctions table")
+    for name, help_text, labels, value in gauges:
+        describe(name, 'gauge', help_text)
+        lines.append(f"{name}{format_metric_labels(labels)} {value}")
 
-            if 'seller_name' not in existing_columns:
-                c.execute("ALTER TABLE auctions ADD COLUMN seller_name TEXT")
-                debug_log("Added seller_name column to auctions table")
+    return "\n".join(lines) + "\n"
 
-            if 'auction_status' not in existing_columns:
-                c.execute("ALTER TABLE auctions ADD COLUMN auction_status TEXT DEFAULT 'active'")
-                debug_log("Added auction_status column to auctions table")
+SELECT_CATEGORY, GET_POKEMON_NAME, GET_NATURE, GET_IVS, GET_MOVESET, GET_BOOST_INFO, GET_BASE_PRICE, GET_TM_DETAILS = range(2, 10)
+
+# Everything (auctions, verification, profiles, leaderboard) lives in one
+# database file. The old per-feature files are imported by init_db() once.
+DB_PATH = os.getenv("DB_PATH", "auctions.db")
+LEGACY_DB_FILES = ['verified_users.db', 'user_profiles.db', 'leaderboard.db']
+
+# Connection pool: one long-lived connection per (thread, database file).
+# Opening a sqlite3 connection and applying PRAGMAs on every helper call was
+# the main cost on the bid path, so connections are created once per worker
+# thread and reused for every later db_connection() call on that thread.
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(64 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "8192"))
+
+_db_local = threading.local()
+_db_pool_lock = threading.Lock()
+_db_pool = {}  # (thread ident, db_name) -> sqlite3.Connection
+
+def _open_pooled_connection(db_name):
+    conn = sqlite3.connect(db_name, timeout=DB_BUSY_TIMEOUT_MS / 1000.0, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
 
-            c.execute('''INSERT OR IGNORE INTO system_status (id, submissions_open, auctions_open)
-                         VALUES (1, 0, 0)''')
+def _prune_dead_connections():
+    """Close pooled connections whose owning thread has exited"""
+    alive = {t.ident for t in threading.enumerate()}
+    with _db_pool_lock:
+        dead = [key for key in _db_pool if key[0] not in alive]
+        for key in dead:
+            try:
+                _db_pool.pop(key).close()
+            except Exception:
+                pass
 
-            # Initialize category settings
-            categories = ['legendary', 'nonlegendary', 'shiny', 'tms']
-            for category in categories:
-                c.execute('''INSERT OR IGNORE INTO submission_categories 
-                            (category, enabled) VALUES (?, 1)''', (category,))
+def get_pooled_connection(db_name=DB_PATH):
+    """Return this thread's connection to db_name, opening it on first use"""
+    conns = getattr(_db_local, 'conns', None)
+    if conns is None:
+        conns = _db_local.conns = {}
+    conn = conns.get(db_name)
+    if conn is None:
+        _prune_dead_connections()
+        conn = _open_pooled_connection(db_name)
+        conns[db_name] = conn
+        with _db_pool_lock:
+            _db_pool[(threading.get_ident(), db_name)] = conn
+        debug_log(f"Opened pooled connection to {db_name} for thread {threading.current_thread().name}")
+    return conn
 
-            conn.commit()
-            debug_log("Database initialized successfully with all required columns and category settings")
+def close_all_connections():
+    """Close every pooled connection (used on shutdown)"""
+    with _db_pool_lock:
+        for conn in _db_pool.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _db_pool.clear()
+    _db_local.__dict__.pop('conns', None)
+
+# Context managers that only pass a db_connection() on; query timing skips
+# them (and contextlib's frames) to label the function that asked for it
+DB_CONNECTION_WRAPPERS = {'db_connection', 'leaderboard_connection', 'profile_connection'}
+CONTEXTLIB_FILE = contextmanager.__code__.co_filename
+
+def query_caller():
+    """Name of the function that opened the current db_connection block"""
+    frame = sys._getframe(1)
+    while frame is not None and (frame.f_code.co_name in DB_CONNECTION_WRAPPERS
+                                 or frame.f_code.co_filename == CONTEXTLIB_FILE):
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else 'unknown'
+
+@contextmanager
+def db_connection(db_name=DB_PATH):
+    conn = get_pooled_connection(db_name)
+    depth = getattr(_db_local, 'depth', None)
+    if depth is None:
+        depth = _db_local.depth = {}
+    depth[db_name] = depth.get(db_name, 0) + 1
+    if depth[db_name] == 1:
+        caller = query_caller()
+        started = time.perf_counter()
+    try:
+        yield conn
     except Exception as e:
-        debug_log(f"Database initialization failed: {str(e)}")
+        debug_log(f"Database error: {str(e)}", logging.WARNING)
+        if depth[db_name] == 1 and conn.in_transaction:
+            conn.rollback()
         raise
+    finally:
+        depth[db_name] -= 1
+        # The connection outlives the block, so drop anything the caller
+        # didn't commit - the same outcome closing the connection used to have
+        if depth[db_name] == 0:
+            if conn.in_transaction:
+                conn.rollback()
+            observe('pokeauction_db_seconds', (('function', caller),), time.perf_counter() - started)
+
+def add_missing_columns(c, table, columns):
+    """ALTER TABLE ADD COLUMN for every (name, definition) the table doesn't have yet"""
+    c.execute(f"PRAGMA table_info({table})")
+    existing_columns = [col[1] for col in c.fetchall()]
+    for name, definition in columns:
+        if name not in existing_columns:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            debug_log(f"Added {name} column to {table} table")
+
+def run_migrations(db_name, migrations):
+    """Apply pending numbered migrations to db_name, each in its own transaction.
+
+    A migration is (version, description, steps) where steps is a list of SQL
+    statements or a callable taking a cursor. Applied versions are recorded in
+    the schema_version table, so a boot with an up-to-date schema costs one query.
+    Never edit a migration that has shipped - append a new one instead.
+    """
+    with db_connection(db_name) as conn:
+        c = conn.cursor()
+        c.execute('''CREATE TABLE IF NOT EXISTS schema_version
+                     (version INTEGER PRIMARY KEY,
+                      description TEXT,
+                      applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)''')
+        current = c.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+        applied = 0
+        for version, description, steps in migrations:
+            if version <= current:
+                continue
+            try:
+                c.execute("BEGIN")
+                if callable(steps):
+                    steps(c)
+                else:
+                    for statement in steps:
+                        c.execute(statement)
+                c.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                          (version, description))
+                conn.commit()
+                applied += 1
+                debug_log(f"{db_name}: applied migration {version} ({description})", logging.INFO)
+            except Exception as e:
+                conn.rollback()
+                debug_log(f"{db_name}: migration {version} failed: {str(e)}", logging.ERROR)
+                raise
 
-def init_verified_users_db():
-    try:
-        with db_connection('verified_users.db') as conn:
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-
-            tables = {
-                'verified_users': '''
-                    CREATE TABLE IF NOT EXISTS verified_users (
-                        user_id INTEGER PRIMARY KEY,
-                        username TEXT NOT NULL,
-                        verified_by INTEGER NOT NULL,
-                        verified_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        last_active DATETIME,
-                        total_submissions INTEGER DEFAULT 0,
-                        total_bids INTEGER DEFAULT 0,
-                        FOREIGN KEY (verified_by) REFERENCES verified_users(user_id)
-                    )''',
-
-                'verification_requests': '''
-                    CREATE TABLE IF NOT EXISTS verification_requests (
-                        request_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER UNIQUE NOT NULL,
-                        username TEXT NOT NULL,
-                        request_date DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (user_id) REFERENCES verified_users(user_id) ON DELETE CASCADE
-                    )''',
-
-                'user_activity': '''
-                    CREATE TABLE IF NOT EXISTS user_activity (
-                        log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER NOT NULL,
-                        action TEXT NOT NULL,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        details TEXT,
-                        FOREIGN KEY (user_id) REFERENCES verified_users(user_id) ON DELETE CASCADE
-                    )'''
-            }
+        return applied
 
-            for table_name, schema in tables.items():
-                c.execute(schema)
+def migrate_auctions_legacy_columns(c):
+    # Databases created before these columns were part of the CREATE TABLE
+    add_missing_columns(c, 'auctions', [
+        ('seller_id', 'INTEGER'),
+        ('seller_name', 'TEXT'),
+        ('auction_status', "TEXT DEFAULT 'active'"),
+        ('winning_bid_id', 'INTEGER'),
+    ])
 
-                c.execute(f"PRAGMA table_info({table_name})")
-                existing_columns = [col[1] for col in c.fetchall()]
+def migrate_auction_listing_columns(c):
+    """auctions.category and auctions.bid_count, so /items pages can be read straight off an index"""
+    add_missing_columns(c, 'auctions', [
+        ('category', "TEXT DEFAULT 'nonlegendary'"),
+        ('bid_count', 'INTEGER DEFAULT 0'),
+    ])
 
-                if table_name == 'verified_users' and 'last_active' not in existing_columns:
-                    c.execute("ALTER TABLE verified_users ADD COLUMN last_active DATETIME")
-                if table_name == 'verified_users' and 'total_bids' not in existing_columns:
-                    c.execute("ALTER TABLE verified_users ADD COLUMN total_bids INTEGER DEFAULT 0")
+    # The category only ever lived in the submission JSON; parse it here once instead of on every /items
+    c.execute('''SELECT a.auction_id, s.data FROM auctions a
+                 JOIN submissions s ON s.channel_message_id = a.channel_message_id
+                 WHERE a.channel_message_id IS NOT NULL''')
+    categories = []
+    for auction_id, data in c.fetchall():
+        try:
+            category = json.loads(data).get('category') if data else None
+        except (ValueError, AttributeError):
+            category = None
+        if category in ITEMS_CATEGORIES and category != 'nonlegendary':
+            categories.append((category, auction_id))
+    c.executemany("UPDATE auctions SET category=? WHERE auction_id=?", categories)
+
+    c.execute('''UPDATE auctions SET bid_count = (
+                     SELECT COUNT(*) FROM bids WHERE bids.auction_id = auctions.auction_id AND bids.is_active = 1
+                 )''')
+
+    for name, key in ITEMS_SORT_INDEXES.items():
+        c.execute(f"CREATE INDEX IF NOT EXISTS {name} ON auctions(category, {key} DESC, auction_id DESC) "
+                  f"WHERE auction_status = 'active'")
+
+def migrate_item_attribute_columns(c):
+    """Typed copies of the submission JSON fields the listings read, on submissions and auctions"""
+    add_missing_columns(c, 'submissions', [('category', 'TEXT')] + ITEM_ATTRIBUTE_TYPES)
+    add_missing_columns(c, 'auctions', ITEM_ATTRIBUTE_TYPES)
+
+    c.execute("SELECT submission_id, data FROM submissions")
+    rows = []
+    for submission_id, data in c.fetchall():
+        try:
+            attributes = extract_item_attributes(json.loads(data) if data else {})
+        except (ValueError, AttributeError):
+            attributes = extract_item_attributes({})
+        rows.append(tuple(attributes[name] for name in ITEM_ATTRIBUTE_COLUMNS) + (submission_id,))
+    assignments = ", ".join(f"{name}=?" for name in ITEM_ATTRIBUTE_COLUMNS)
+    c.executemany(f"UPDATE submissions SET {assignments} WHERE submission_id=?", rows)
+
+    copied = ", ".join(name for name, _ in ITEM_ATTRIBUTE_TYPES)
+    c.execute(f'''UPDATE auctions SET ({copied}) = (
+                      SELECT {copied} FROM submissions s
+                      WHERE s.channel_message_id = auctions.channel_message_id
+                      ORDER BY s.submission_id DESC LIMIT 1)
+                  WHERE channel_message_id IS NOT NULL
+                  AND EXISTS (SELECT 1 FROM submissions s WHERE s.channel_message_id = auctions.channel_message_id)''')
+
+ITEMS_CATEGORIES = ['legendary', 'nonlegendary', 'shiny', 'tms']
+
+# /items sort orders: (SQL key, button label). Each key has a partial index on active auctions,
+# created by migration 10, so a page is an index range read of ITEMS_PAGE_SIZE rows.
+ITEMS_SORTS = {
+    'new': ('created_at', "🕒 Newest"),
+    'price': ('ifnull(current_bid, base_price)', "💰 Top bid"),
+    'bids': ('bid_count', "🔥 Most bids"),
+}
+ITEMS_SORT_INDEXES = {
+    'idx_auctions_items_new': ITEMS_SORTS['new'][0],
+    'idx_auctions_items_price': ITEMS_SORTS['price'][0],
+    'idx_auctions_items_bids': ITEMS_SORTS['bids'][0],
+}
+
+# Submission JSON fields stored as columns on submissions and auctions (category lives on both too)
+ITEM_ATTRIBUTE_TYPES = [
+    ('pokemon_name', 'TEXT'),
+    ('level', 'INTEGER'),
+    ('nature', 'TEXT'),
+    ('iv_total', 'INTEGER'),
+    ('boosted', 'INTEGER'),
+    ('tm_name', 'TEXT'),
+]
+ITEM_ATTRIBUTE_COLUMNS = ['category'] + [name for name, _ in ITEM_ATTRIBUTE_TYPES]
+
+LEVEL_RE = re.compile(r'Lv\.\s*(\d+)')
+NATURE_RE = re.compile(r'Nature:\s*([A-Za-z]+)')
+IV_TOTAL_RE = re.compile(r'(\d{1,3})\s*/\s*186\b')
+IV_STAT_RE = re.compile(r'^[^:\n]+:\s*(\d{1,2})\s*/\s*\d+', re.MULTILINE)
+TM_NAME_RE = re.compile(r'TM\d+')
+
+def extract_item_attributes(data):
+    """The ITEM_ATTRIBUTE_COLUMNS values for a submission's data dict; unknown fields are None"""
+    category = data.get('category')
+    attributes = dict.fromkeys(ITEM_ATTRIBUTE_COLUMNS)
+    attributes['category'] = category if category in ITEMS_CATEGORIES else 'nonlegendary'
 
-            c.execute('''CREATE INDEX IF NOT EXISTS idx_verified_users_id ON verified_users(user_id)''')
-            c.execute('''CREATE INDEX IF NOT EXISTS idx_activity_user ON user_activity(user_id)''')
-            c.execute('''CREATE INDEX IF NOT EXISTS idx_requests_date ON verification_requests(request_date)''')
+    if category == 'tms':
+        tm_match = TM_NAME_RE.search((data.get('tm_details') or {}).get('text') or '')
+        attributes['tm_name'] = tm_match.group(0) if tm_match else None
+        return attributes
+
+    attributes['pokemon_name'] = data.get('pokemon_name')
+    nature_text = (data.get('nature') or {}).get('text') or ''
+    level_match = LEVEL_RE.search(nature_text)
+    nature_match = NATURE_RE.search(nature_text)
+    ivs_text = (data.get('ivs') or {}).get('text') or ''
+    iv_match = IV_TOTAL_RE.search(ivs_text)
+    iv_stats = IV_STAT_RE.findall(ivs_text)
+    attributes['level'] = int(level_match.group(1)) if level_match else None
+    attributes['nature'] = nature_match.group(1) if nature_match else None
+    if iv_match:
+        attributes['iv_total'] = int(iv_match.group(1))
+    elif len(iv_stats) == 6:
+        # No total line on the page: add up the six "Stat: IV / EV" rows
+        attributes['iv_total'] = sum(int(iv) for iv in iv_stats)
+
+    boosted = data.get('boosted')
+    boost_info = (data.get('boost_info') or '').strip().lower()
+    if boosted in ('yes', 'no'):
+        attributes['boosted'] = 1 if boosted == 'yes' else 0
+    elif boost_info:
+        attributes['boosted'] = 0 if boost_info.startswith(('no', 'unboosted')) else 1
+    return attributes
+
+def get_item_name(row):
+    """Display name from a row carrying the item attribute columns"""
+    if row['category'] == 'tms':
+        return row['tm_name'] or "TM"
+    return row['pokemon_name'] or 'Unknown Pokémon'
+
+SCHEMA_MIGRATIONS = [
+    (1, "Base tables", [
+        '''CREATE TABLE IF NOT EXISTS auctions
+           (auction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_text TEXT NOT NULL,
+            photo_id TEXT,
+            base_price REAL NOT NULL,
+            current_bid REAL,
+            current_bidder_id INTEGER,
+            current_bidder TEXT,
+            previous_bidder TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            auction_status TEXT DEFAULT 'active',
+            channel_message_id INTEGER,
+            discussion_message_id INTEGER,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            seller_id INTEGER,
+            seller_name TEXT,
+            winning_bid_id INTEGER)''',
+        '''CREATE TABLE IF NOT EXISTS bids
+           (bid_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            auction_id INTEGER NOT NULL,
+            bidder_id INTEGER NOT NULL,
+            bidder_name TEXT NOT NULL,
+            amount REAL NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT 1,
+            FOREIGN KEY(auction_id) REFERENCES auctions(auction_id))''',
+        '''CREATE TABLE IF NOT EXISTS submissions
+           (submission_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            channel_message_id INTEGER)''',
+        '''CREATE TABLE IF NOT EXISTS temp_data
+           (user_id INTEGER PRIMARY KEY,
+            data TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)''',
+        '''CREATE TABLE IF NOT EXISTS system_status
+           (id INTEGER PRIMARY KEY,
+            submissions_open BOOLEAN DEFAULT 0,
+            auctions_open BOOLEAN DEFAULT 0)''',
+        '''CREATE TABLE IF NOT EXISTS verification_messages
+           (submission_id INTEGER,
+            admin_id INTEGER,
+            message_id INTEGER,
+            PRIMARY KEY (submission_id, admin_id),
+            FOREIGN KEY(submission_id) REFERENCES submissions(submission_id))''',
+        '''CREATE TABLE IF NOT EXISTS bot_admins
+           (user_id INTEGER PRIMARY KEY,
+            username TEXT,
+            added_by INTEGER,
+            added_at DATETIME DEFAULT CURRENT_TIMESTAMP)''',
+        '''CREATE TABLE IF NOT EXISTS active_rejections
+           (submission_id INTEGER PRIMARY KEY,
+            admin_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            item_name TEXT NOT NULL,
+            original_chat_id INTEGER NOT NULL,
+            original_message_id INTEGER NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP)''',
+        '''CREATE TABLE IF NOT EXISTS submission_categories
+           (category TEXT PRIMARY KEY,
+            enabled BOOLEAN DEFAULT 1,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP)''',
+        '''INSERT OR IGNORE INTO system_status (id, submissions_open, auctions_open)
+           VALUES (1, 0, 0)''',
+        '''INSERT OR IGNORE INTO submission_categories (category, enabled)
+           VALUES ('legendary', 1), ('nonlegendary', 1), ('shiny', 1), ('tms', 1)''',
+    ]),
+    (2, "seller, status and winner columns on older databases", migrate_auctions_legacy_columns),
+    (3, "Join and lookup indexes", [
+        # auctions <-> submissions are joined on channel_message_id everywhere
+        '''CREATE INDEX IF NOT EXISTS idx_auctions_channel_msg ON auctions(channel_message_id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_submissions_channel_msg ON submissions(channel_message_id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_auctions_status_created ON auctions(auction_status, created_at)''',
+        '''CREATE INDEX IF NOT EXISTS idx_auctions_seller ON auctions(seller_id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_auctions_current_bidder ON auctions(current_bidder_id)''',
+        # top-bid lookups: WHERE auction_id=? AND is_active=1 ORDER BY amount DESC
+        '''CREATE INDEX IF NOT EXISTS idx_bids_auction_active_amount ON bids(auction_id, is_active, amount)''',
+        '''CREATE INDEX IF NOT EXISTS idx_bids_bidder ON bids(bidder_id)''',
+        # /myitems only ever lists approved submissions
+        '''CREATE INDEX IF NOT EXISTS idx_submissions_user_approved
+           ON submissions(user_id, created_at) WHERE status = 'approved' ''',
+        '''CREATE INDEX IF NOT EXISTS idx_submissions_rejected_created
+           ON submissions(created_at) WHERE status = 'rejected' ''',
+        '''CREATE INDEX IF NOT EXISTS idx_active_rejections_admin ON active_rejections(admin_id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_active_rejections_created ON active_rejections(created_at)''',
+    ]),
+    (4, "Verification tables", [
+        '''CREATE TABLE IF NOT EXISTS verified_users (
+               user_id INTEGER PRIMARY KEY,
+               username TEXT NOT NULL,
+               verified_by INTEGER NOT NULL,
+               verified_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+               last_active DATETIME,
+               total_submissions INTEGER DEFAULT 0,
+               total_bids INTEGER DEFAULT 0,
+               FOREIGN KEY (verified_by) REFERENCES verified_users(user_id)
+           )''',
+        '''CREATE TABLE IF NOT EXISTS verification_requests (
+               request_id INTEGER PRIMARY KEY AUTOINCREMENT,
+               user_id INTEGER UNIQUE NOT NULL,
+               username TEXT NOT NULL,
+               request_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+               FOREIGN KEY (user_id) REFERENCES verified_users(user_id) ON DELETE CASCADE
+           )''',
+        '''CREATE TABLE IF NOT EXISTS user_activity (
+               log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+               user_id INTEGER NOT NULL,
+               action TEXT NOT NULL,
+               timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+               details TEXT,
+               FOREIGN KEY (user_id) REFERENCES verified_users(user_id) ON DELETE CASCADE
+           )''',
+        '''CREATE INDEX IF NOT EXISTS idx_verified_users_id ON verified_users(user_id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_activity_user ON user_activity(user_id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_requests_date ON verification_requests(request_date)''',
+        '''CREATE INDEX IF NOT EXISTS idx_verified_users_username ON verified_users(username)''',
+        '''CREATE INDEX IF NOT EXISTS idx_verified_users_verified_at ON verified_users(verified_at)''',
+    ]),
+    (5, "Leaderboard table", [
+        '''CREATE TABLE IF NOT EXISTS leaderboard (
+               user_id INTEGER PRIMARY KEY,
+               username TEXT NOT NULL,
+               total_wins INTEGER DEFAULT 0,
+               total_sales INTEGER DEFAULT 0,
+               updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+           )''',
+        '''CREATE INDEX IF NOT EXISTS idx_leaderboard_wins
+           ON leaderboard(total_wins DESC, updated_at) WHERE total_wins > 0''',
+        '''CREATE INDEX IF NOT EXISTS idx_leaderboard_sales
+           ON leaderboard(total_sales DESC, updated_at) WHERE total_sales > 0''',
+    ]),
+    (6, "User profiles table", [
+        '''CREATE TABLE IF NOT EXISTS user_profiles
+           (user_id INTEGER PRIMARY KEY,
+            username TEXT,
+            first_name TEXT,
+            total_submissions INTEGER DEFAULT 0,
+            approved_submissions INTEGER DEFAULT 0,
+            rejected_submissions INTEGER DEFAULT 0,
+            pending_submissions INTEGER DEFAULT 0,
+            revoked_submissions INTEGER DEFAULT 0,
+            is_banned BOOLEAN DEFAULT 0,
+            banned_by INTEGER,
+            ban_reason TEXT,
+            banned_at DATETIME,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP)''',
+        '''CREATE INDEX IF NOT EXISTS idx_profiles_user_id ON user_profiles(user_id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_profiles_banned ON user_profiles(is_banned)''',
+        '''CREATE INDEX IF NOT EXISTS idx_profiles_banned_at
+           ON user_profiles(banned_at) WHERE is_banned = 1''',
+    ]),
+    (7, "Broadcast jobs", [
+        '''CREATE TABLE IF NOT EXISTS broadcast_jobs
+           (job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            admin_id INTEGER NOT NULL,
+            from_chat_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            status_chat_id INTEGER,
+            status_message_id INTEGER,
+            status TEXT NOT NULL DEFAULT 'running',
+            total INTEGER DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            finished_at DATETIME)''',
+        '''CREATE TABLE IF NOT EXISTS broadcast_recipients
+           (job_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            error TEXT,
+            PRIMARY KEY (job_id, user_id)) WITHOUT ROWID''',
+        '''CREATE INDEX IF NOT EXISTS idx_broadcast_jobs_running
+           ON broadcast_jobs(job_id) WHERE status = 'running' ''',
+    ]),
+    (8, "Recipient health", [
+        '''CREATE TABLE IF NOT EXISTS recipient_health
+           (user_id INTEGER PRIMARY KEY,
+            reason TEXT,
+            failures INTEGER DEFAULT 0,
+            unreachable BOOLEAN DEFAULT 0,
+            first_failed_at DATETIME,
+            last_failed_at DATETIME,
+            reachable_at DATETIME)''',
+        '''CREATE INDEX IF NOT EXISTS idx_recipient_health_unreachable
+           ON recipient_health(reason) WHERE unreachable = 1''',
+    ]),
+    (9, "Auction settlement jobs", [
+        '''CREATE TABLE IF NOT EXISTS settlement_jobs
+           (job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            admin_id INTEGER,
+            status_chat_id INTEGER,
+            status_message_id INTEGER,
+            status TEXT NOT NULL DEFAULT 'running',
+            total INTEGER DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            finished_at DATETIME)''',
+        '''CREATE TABLE IF NOT EXISTS auction_settlements
+           (auction_id INTEGER PRIMARY KEY,
+            job_id INTEGER NOT NULL,
+            winner_id INTEGER,
+            winner_name TEXT,
+            seller_id INTEGER,
+            seller_name TEXT,
+            amount REAL,
+            notified_buyer INTEGER DEFAULT 0,
+            notified_seller INTEGER DEFAULT 0,
+            leaderboard_updated INTEGER DEFAULT 0,
+            buttons_removed INTEGER DEFAULT 0,
+            last_error TEXT,
+            settled_at DATETIME)''',
+        '''CREATE INDEX IF NOT EXISTS idx_settlements_job ON auction_settlements(job_id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_settlement_jobs_running
+           ON settlement_jobs(job_id) WHERE status = 'running' ''',
+    ]),
+    (10, "auctions.category and bid_count for paginated /items", migrate_auction_listing_columns),
+    (11, "Typed item attribute columns on submissions and auctions", migrate_item_attribute_columns),
+    (12, "auctions.state_version for the caption cache", [
+        '''ALTER TABLE auctions ADD COLUMN state_version INTEGER DEFAULT 0''',
+    ]),
+    (13, "Drop the submissions category index nothing reads", [
+        '''DROP INDEX IF EXISTS idx_submissions_category_status''',
+    ]),
+]
+
+def import_legacy_databases():
+    """One-shot copy of the old verified_users/user_profiles/leaderboard files into DB_PATH.
+
+    Each file is ATTACHed, its rows are copied with INSERT OR IGNORE (only the
+    columns both sides have, so files from older versions still import) and
+    the file is renamed to *.migrated so this never runs twice.
+    """
+    imported = 0
+    for legacy_file in LEGACY_DB_FILES:
+        if not os.path.exists(legacy_file) or os.path.abspath(legacy_file) == os.path.abspath(DB_PATH):
+            continue
 
-            conn.commit()
-            debug_log("Verified users database initialized")
+        with db_connection() as conn:
+            c = conn.cursor()
+            c.execute("ATTACH DATABASE ? AS legacy", (legacy_file,))
+            try:
+                c.execute("BEGIN")
+                tables = [row[0] for row in c.execute(
+                    "SELECT name FROM legacy.sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' AND name != 'schema_version'")]
+                for table in tables:
+                    target_columns = {col[1] for col in c.execute(f"PRAGMA main.table_info({table})")}
+                    if not target_columns:
+                        debug_log(f"Skipping legacy table {table} from {legacy_file}: not in schema")
+                        continue
+                    columns = ", ".join(col[1] for col in c.execute(f"PRAGMA legacy.table_info({table})")
+                                        if col[1] in target_columns)
+                    c.execute(f"INSERT OR IGNORE INTO main.{table} ({columns}) SELECT {columns} FROM legacy.{table}")
+                    debug_log(f"Imported {c.rowcount} rows into {table} from {legacy_file}", logging.INFO)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                c.execute("DETACH DATABASE legacy")
+
+        # Fold any WAL back into the file before it is renamed out of the way
+        legacy_conn = sqlite3.connect(legacy_file)
+        legacy_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        legacy_conn.execute("PRAGMA journal_mode=DELETE")
+        legacy_conn.close()
+        os.replace(legacy_file, f"{legacy_file}.migrated")
+        imported += 1
+
+    return imported
+
+def init_db():
+    try:
+        run_migrations(DB_PATH, SCHEMA_MIGRATIONS)
+        import_legacy_databases()
+        debug_log("Database initialized successfully with all required columns and category settings", logging.INFO)
     except Exception as e:
-        debug_log(f"Verified users DB init failed: {str(e)}")
+        debug_log(f"Database initialization failed: {str(e)}", logging.ERROR)
         raise
 
 
@@ -250,16 +797,11 @@ def get_user_bought_items(user_id):
     try:
         with db_connection() as conn:
             c = conn.cursor()
-            c.execute('''SELECT a.auction_id, a.item_text, a.channel_message_id, b.amount as price, 
-                                s.data as submission_data, a.created_at
+            c.execute('''SELECT a.auction_id, a.item_text, a.channel_message_id, a.current_bid as price,
+                                a.created_at, a.photo_id, a.category, a.pokemon_name, a.tm_name
                          FROM auctions a
-                         JOIN bids b ON a.auction_id = b.auction_id
-                         LEFT JOIN submissions s ON a.channel_message_id = s.channel_message_id
-                         WHERE b.bidder_id = ?  -- SPECIFIC USER
-                         AND b.amount = (
-                             SELECT MAX(amount) FROM bids WHERE auction_id = a.auction_id AND is_active = 1
-                         )
-                         AND b.is_active = 1
+                         WHERE a.current_bidder_id = ?  -- SPECIFIC USER
+                         AND a.winning_bid_id IS NOT NULL
                          AND (a.auction_status = 'ended' OR a.is_active = 0)
                          ORDER BY a.created_at DESC''', (user_id,))
             return c.fetchall()
@@ -272,17 +814,12 @@ def get_user_sold_items(user_id):
     try:
         with db_connection() as conn:
             c = conn.cursor()
-            c.execute('''SELECT a.auction_id, a.item_text, a.channel_message_id, 
-                                b.amount as sale_price, a.base_price,
-                                s.data as submission_data, a.created_at
+            c.execute('''SELECT a.auction_id, a.item_text, a.channel_message_id,
+                                a.current_bid as sale_price, a.base_price, a.created_at,
+                                a.photo_id, a.category, a.pokemon_name, a.tm_name
                          FROM auctions a
-                         JOIN bids b ON a.auction_id = b.auction_id
-                         LEFT JOIN submissions s ON a.channel_message_id = s.channel_message_id
                          WHERE a.seller_id = ?  -- SPECIFIC USER
-                         AND b.amount = (
-                             SELECT MAX(amount) FROM bids WHERE auction_id = a.auction_id AND is_active = 1
-                         )
-                         AND b.is_active = 1
+                         AND a.winning_bid_id IS NOT NULL
                          AND (a.auction_status = 'ended' OR a.is_active = 0)
                          ORDER BY a.created_at DESC''', (user_id,))
             return c.fetchall()
@@ -307,76 +844,71 @@ def migrate_auction_status():
             
             count = c.rowcount
             if count > 0:
-                debug_log(f"Migrated {count} auction statuses")
+                debug_log(f"Migrated {count} auction statuses", logging.INFO)
             
             conn.commit()
     except Exception as e:
         debug_log(f"Error migrating auction status: {str(e)}")
 
-def leaderboard_connection(db_name="leaderboard.db"):
-    conn = sqlite3.connect(db_name)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def init_leaderboard_db():
-    try:
-        conn = leaderboard_connection()
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS leaderboard (
-                        user_id INTEGER PRIMARY KEY,
-                        username TEXT NOT NULL,
-                        total_wins INTEGER DEFAULT 0,
-                        total_sales INTEGER DEFAULT 0,
-                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )''')
-        conn.commit()
-        conn.close()
-        debug_log("Leaderboard DB initialized")
-    except Exception as e:
-        debug_log(f"Leaderboard DB init failed: {str(e)}")
-        raise
-
-def profile_connection(db_name='user_profiles.db'):
-    try:
-        conn = sqlite3.connect(db_name)
-        conn.row_factory = sqlite3.Row
-        debug_log(f"Connected to profile database: {db_name}")
-        return conn
-    except Exception as e:
-        debug_log(f"Error connecting to profile database {db_name}: {str(e)}")
-        raise
-
-def init_profiles_db():
+def rebuild_winner_columns():
+    """Check auctions.current_bid / current_bidder_id / winning_bid_id against the bids table and repair drift"""
     try:
-        with profile_connection() as conn:
+        with db_connection() as conn:
             c = conn.cursor()
-
-            c.execute('''CREATE TABLE IF NOT EXISTS user_profiles
-                         (user_id INTEGER PRIMARY KEY,
-                          username TEXT,
-                          first_name TEXT,
-                          total_submissions INTEGER DEFAULT 0,
-                          approved_submissions INTEGER DEFAULT 0,
-                          rejected_submissions INTEGER DEFAULT 0,
-                          pending_submissions INTEGER DEFAULT 0,
-                          revoked_submissions INTEGER DEFAULT 0,
-                          is_banned BOOLEAN DEFAULT 0,
-                          banned_by INTEGER,
-                          ban_reason TEXT,
-                          banned_at DATETIME,
-                          created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                          updated_at DATETIME DEFAULT CURRENT_TIMESTAMP)''')
-
-            c.execute('''CREATE INDEX IF NOT EXISTS idx_profiles_user_id
-                         ON user_profiles(user_id)''')
-            c.execute('''CREATE INDEX IF NOT EXISTS idx_profiles_banned
-                         ON user_profiles(is_banned)''')
+            c.execute('''SELECT a.auction_id, a.current_bid, a.current_bidder_id, a.winning_bid_id,
+                                b.bid_id, b.bidder_id, b.bidder_name, b.amount
+                         FROM auctions a
+                         LEFT JOIN bids b ON b.bid_id = (
+                             SELECT bid_id FROM bids
+                             WHERE auction_id = a.auction_id AND is_active = 1
+                             ORDER BY amount DESC, bid_id ASC
+                             LIMIT 1
+                         )''')
+            fixed = 0
+            for row in c.fetchall():
+                if (row['winning_bid_id'] == row['bid_id']
+                        and row['current_bidder_id'] == row['bidder_id']
+                        and row['current_bid'] == row['amount']):
+                    continue
+
+                if row['bid_id'] is None:
+                    conn.execute('''UPDATE auctions SET
+                                    current_bid=NULL, current_bidder_id=NULL,
+                                    current_bidder=NULL, winning_bid_id=NULL,
+                                    state_version=state_version + 1
+                                    WHERE auction_id=?''', (row['auction_id'],))
+                else:
+                    conn.execute('''UPDATE auctions SET
+                                    current_bid=?, current_bidder_id=?,
+                                    current_bidder=?, winning_bid_id=?,
+                                    state_version=state_version + 1
+                                    WHERE auction_id=?''',
+                                 (row['amount'], row['bidder_id'],
+                                  f"{row['bidder_name']} ({row['bidder_id']})",
+                                  row['bid_id'], row['auction_id']))
+                fixed += 1
 
             conn.commit()
-            debug_log("User profiles database initialized successfully")
+            if fixed:
+                debug_log(f"Rebuilt winner columns for {fixed} auctions", logging.INFO)
+            return fixed
     except Exception as e:
-        debug_log(f"Profiles database initialization failed: {str(e)}")
-        raise
+        debug_log(f"Error rebuilding winner columns: {str(e)}")
+        return 0
+
+@contextmanager
+def leaderboard_connection():
+    # Commits on success like a bare sqlite3 connection used in a with-block
+    with db_connection() as conn:
+        yield conn
+        conn.commit()
+
+@contextmanager
+def profile_connection():
+    # Callers rely on the sqlite3 "with conn:" behaviour of committing on success
+    with db_connection() as conn:
+        yield conn
+        conn.commit()
 
 
 def load_admins():
@@ -390,7 +922,7 @@ def load_admins():
     
     # Also load from database if available
     try:
-        with db_connection('auctions.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
             
             # Ensure table exists
@@ -404,7 +936,7 @@ def load_admins():
             db_admins = [row['user_id'] for row in c.fetchall()]
             
             all_admins = list(set(env_admins + db_admins))
-            debug_log(f"Loaded {len(all_admins)} admins: {all_admins}")
+            debug_log(f"Loaded {len(all_admins)} admins: {all_admins}", logging.INFO)
             return all_admins
     except Exception as e:
         debug_log(f"Error loading admins from database: {str(e)}")
@@ -417,12 +949,29 @@ def load_admins():
 load_dotenv("auc.env")
 TOKEN = os.getenv("BOT_TOKEN")
 ADMINS = load_admins()
+# Shared by the admin/user message handlers; add_admin/remove_admin keep it in sync
+ADMIN_FILTER = Filters.user(user_id=ADMINS, allow_empty=True)
 #ADMINS = [int(admin_id) for admin_id in os.getenv("ADMIN_IDS").split(",") if admin_id]
 CHANNEL_ID = int(os.getenv("CHANNEL_ID", "-1003321180638"))
 CHANNEL_USERNAME = os.getenv("CHANNEL_USERNAME", "@sjsjwhabb")
 DISCUSSION_ID = int(os.getenv("DISCUSSION_ID", "-1003333433940"))
 LOGS_CHANNEL_ID = int(os.getenv("LOGS_CHANNEL_ID", "-1003333433940"))
 
+# Update delivery. Polling is the default; BOT_MODE=webhook has Telegram push
+# updates to WEBHOOK_URL instead, served either by the keep-alive Flask app
+# (WEBHOOK_SERVER=keep_alive, on PORT) or by python-telegram-bot's webhook
+# server (WEBHOOK_SERVER=builtin, on WEBHOOK_PORT). Both check the secret
+# token header. The path and secret default to values derived from the token
+# so they can't be guessed.
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").rstrip('/')
+WEBHOOK_SERVER = os.getenv("WEBHOOK_SERVER", "keep_alive").lower()
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH") or hashlib.sha256(f"path:{TOKEN}".encode()).hexdigest()[:32]
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or hashlib.sha256(f"secret:{TOKEN}".encode()).hexdigest()
+# Bot API server root, e.g. a self-hosted telegram-bot-api or tools/fake_bot_api.py; empty means api.telegram.org
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "").rstrip('/')
+
 def ensure_single_instance():
     """
     Cross-platform single instance check with better stale lock handling
@@ -530,6 +1079,8 @@ def set_admin_commands(bot, admin_id):
         BotCommand('removebid', 'Remove last bid'),
         BotCommand('removeitem', 'Remove the item from Auction'),
         BotCommand('broad', 'Broadcast a message'),
+        BotCommand('broad_cancel', 'Cancel a running broadcast'),
+        BotCommand('unreachable', 'Users who blocked the bot'),
         BotCommand('unverify', 'Unverify a user'),
         BotCommand('msg', 'Message a specific user'),
         BotCommand('addadmin', 'Add new admin'),
@@ -564,6 +1115,8 @@ def set_bot_commands(updater):
         BotCommand('removebid', 'Remove last bid'),
         BotCommand('removeitem', 'Remove the item from Auction'),
         BotCommand('broad', 'Broadcast a message'),
+        BotCommand('broad_cancel', 'Cancel a running broadcast'),
+        BotCommand('unreachable', 'Users who blocked the bot'),
         BotCommand('unverify', 'Unverify a user'),
         BotCommand('msg', 'Message a specific user'),
         BotCommand('addadmin', 'Add new admin'),
@@ -635,6 +1188,8 @@ def show_help(update: Update, context: CallbackContext):
             "/removebid - Remove last bid",
             "/removeitem - Remove item from Auction",
             "/broad - Broadcast a message",
+            "/broad_cancel - Cancel a running broadcast",
+            "/unreachable - Users the bot can't message",
             "/msg - Message to specific user",
             "",
             "⚙️ <b>Category Management:</b>",
@@ -689,11 +1244,9 @@ def show_help(update: Update, context: CallbackContext):
     update.message.reply_text("\n".join(help_text), parse_mode='HTML')
 
 def admin_only(func):
+    @functools.wraps(func)
     def wrapper(update: Update, context: CallbackContext):
-        # Reload admins to ensure we have the latest list
-        global ADMINS
-        ADMINS = load_admins()
-        
+        # ADMINS is kept current by add_admin/remove_admin (see load_auth_cache)
         if update.effective_user.id not in ADMINS:
             update.message.reply_text("🚫 Admin only command")
             return
@@ -806,7 +1359,7 @@ def extract_base_price(text):
     except (ValueError, AttributeError):
         return None
 
-def save_auction(item_text, photo_id, base_price, seller_id, seller_name, channel_msg_id=None):
+def save_auction(item_text, photo_id, base_price, seller_id, seller_name, channel_msg_id=None, attributes=None):
     try:
         if not item_text or base_price is None:
             raise ValueError("Missing required fields (item_text or base_price)")
@@ -823,15 +1376,19 @@ def save_auction(item_text, photo_id, base_price, seller_id, seller_name, channe
                     debug_log("Auction with this channel message ID already exists")
                     return None
 
-            c.execute('''INSERT INTO auctions
-                        (item_text, photo_id, base_price, channel_message_id, is_active, seller_id, seller_name)
-                        VALUES (?, ?, ?, ?, 1, ?, ?)''',
+            attributes = attributes or extract_item_attributes({})
+            columns = ", ".join(ITEM_ATTRIBUTE_COLUMNS)
+            c.execute(f'''INSERT INTO auctions
+                        (item_text, photo_id, base_price, channel_message_id, is_active, seller_id, seller_name,
+                         {columns})
+                        VALUES (?, ?, ?, ?, 1, ?, ?{", ?" * len(ITEM_ATTRIBUTE_COLUMNS)})''',
                     (str(item_text),
                      str(photo_id) if photo_id else None,
                      float(base_price),
                      channel_msg_id,
                      seller_id,
-                     seller_name))
+                     seller_name,
+                     *(attributes[name] for name in ITEM_ATTRIBUTE_COLUMNS)))
 
             auction_id = c.lastrowid
             conn.commit()
@@ -839,7 +1396,7 @@ def save_auction(item_text, photo_id, base_price, seller_id, seller_name, channe
             return auction_id
 
     except Exception as e:
-        debug_log(f"Critical error saving auction: {str(e)}")
+        debug_log(f"Critical error saving auction: {str(e)}", logging.ERROR)
         raise
 
 def verify_auction_integrity():
@@ -868,109 +1425,1013 @@ def verify_auction_integrity():
 
         return True
 
-def record_bid(auction_id, bidder_id, bidder_name, amount, context=None):
+# Outbound queue. Every send, edit and copy made through QueuedBot waits here
+# for its turn: a global token bucket (~30/s), one bucket per destination
+# (1/s with a short burst for private chats, 20/min for groups and channels),
+# priorities so interactive replies overtake bulk sends, and RetryAfter
+# handled by holding the destination instead of sleeping in the caller.
+# Callers that don't need the result queue detached (see outbound_detached)
+# and get on with their work instead of waiting for a sender.
+#
+# Handlers still wait for their replies: they use the returned Message and
+# rely on send errors for their fallbacks, so detaching them would change
+# what every handler does. The wait is bounded instead. The burst lets a
+# user's first few replies out at once, and a send that no sender has picked
+# up within OUTBOUND_MAX_WAIT_SECONDS is withdrawn and raises TimedOut. A
+# handler therefore holds its lane worker for at most that long per send,
+# plus the HTTP call itself.
+OUTBOUND_GLOBAL_PER_SECOND = float(os.getenv("OUTBOUND_GLOBAL_PER_SECOND", "30"))
+OUTBOUND_PRIVATE_PER_SECOND = 1.0
+OUTBOUND_PRIVATE_BURST = int(os.getenv("OUTBOUND_PRIVATE_BURST", "5"))
+OUTBOUND_GROUP_PER_MINUTE = 20
+OUTBOUND_SENDERS = int(os.getenv("OUTBOUND_SENDERS", "8"))
+OUTBOUND_MAX_RETRY_AFTER = 5
+OUTBOUND_MAX_WAIT_SECONDS = float(os.getenv("OUTBOUND_MAX_WAIT_SECONDS", "10"))
+OUTBOUND_STATS_CHATS = 1000
+
+PRIORITY_HIGH = 0    # replies to the user who is talking to the bot
+PRIORITY_NORMAL = 1  # side effects of a user action (logs, outbid DMs, channel posts)
+PRIORITY_LOW = 2     # broadcasts and bulk notifications
+
+THROTTLED_ENDPOINTS = {
+    'sendMessage', 'sendPhoto', 'sendAnimation', 'sendDocument', 'sendVideo',
+    'sendAudio', 'sendVoice', 'sendSticker', 'sendMediaGroup', 'sendPoll',
+    'copyMessage', 'forwardMessage',
+    'editMessageText', 'editMessageCaption', 'editMessageMedia', 'editMessageReplyMarkup',
+}
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+
+    def wait_time(self, now):
+        """Seconds until a token is available"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def is_idle(self, now):
+        return now >= self.blocked_until and self.wait_time(now) == 0 and self.tokens >= self.capacity
+
+class OutboundRequest:
+    def __init__(self, chat_id, priority, send, on_done=None):
+        self.chat_id = chat_id
+        self.priority = priority
+        self.send = send
+        self.on_done = on_done  # on_done(result, error), called by the sender once the request is finished
+        self.queued_at = time.monotonic()
+        self.retry_afters = 0
+        self.started = False  # taken by a sender; a started request can no longer be withdrawn
+        self.cancelled = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class OutboundQueue:
+    """Per-destination FIFO queues scheduled through token buckets.
+
+    A destination with queued requests sits in exactly one place: the ready
+    heap (priority order), the waiting heap (until its bucket refills) or
+    the in-flight set (one request per destination at a time, so messages
+    to a chat keep their order).
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.global_bucket = TokenBucket(OUTBOUND_GLOBAL_PER_SECOND, OUTBOUND_GLOBAL_PER_SECOND)
+        self.buckets = {}
+        self.chat_queues = {}
+        self.ready = []
+        self.waiting = []
+        self.in_flight = set()
+        self.seq = itertools.count()
+        self.threads = []
+        self.stats = Counter()
+        self.chat_stats = OrderedDict()
+
+    def bucket_for(self, chat_id):
+        bucket = self.buckets.get(chat_id)
+        if bucket is None:
+            if len(self.buckets) > 10000:
+                now = time.monotonic()
+                for idle_chat in [c for c, b in self.buckets.items() if b.is_idle(now) and c not in self.chat_queues]:
+                    del self.buckets[idle_chat]
+            if isinstance(chat_id, int) and chat_id > 0:
+                bucket = TokenBucket(OUTBOUND_PRIVATE_PER_SECOND, OUTBOUND_PRIVATE_BURST)
+            else:
+                bucket = TokenBucket(OUTBOUND_GROUP_PER_MINUTE / 60.0, OUTBOUND_GROUP_PER_MINUTE)
+            self.buckets[chat_id] = bucket
+        return bucket
+
+    def count(self, chat_id, outcome, amount=1):
+        self.stats[outcome] += amount
+        chat = self.chat_stats.get(chat_id)
+        if chat is None:
+            chat = self.chat_stats[chat_id] = Counter()
+            while len(self.chat_stats) > OUTBOUND_STATS_CHATS:
+                self.chat_stats.popitem(last=False)
+        else:
+            self.chat_stats.move_to_end(chat_id)
+        chat[outcome] += amount
+
+    def schedule(self, chat_id, now):
+        """Put a destination with queued requests into the ready or waiting heap"""
+        wait = self.bucket_for(chat_id).wait_time(now)
+        if wait > 0:
+            heapq.heappush(self.waiting, (now + wait, next(self.seq), chat_id))
+        else:
+            head = self.chat_queues[chat_id][0]
+            heapq.heappush(self.ready, (head.priority, next(self.seq), chat_id))
+
+    def submit(self, request, wait=True):
+        """Queue a request; with wait, block until a sender has run it and return its result"""
+        with self.cond:
+            chat_queue = self.chat_queues.get(request.chat_id)
+            if chat_queue is None:
+                chat_queue = self.chat_queues[request.chat_id] = deque()
+            chat_queue.append(request)
+            if len(chat_queue) == 1 and request.chat_id not in self.in_flight:
+                self.schedule(request.chat_id, time.monotonic())
+            self.count(request.chat_id, 'queued')
+            self.cond.notify()
+
+        if not wait:
+            return None
+        deadline = time.monotonic() + OUTBOUND_MAX_WAIT_SECONDS
+        # Past the deadline, keep checking: a RetryAfter puts a started request back in the queue
+        while not request.done.wait(max(deadline - time.monotonic(), 0.1)):
+            with self.cond:
+                if not request.started:
+                    # Left in its chat queue; next_request discards it
+                    request.cancelled = True
+                    self.count(request.chat_id, 'cancelled')
+                    raise telegram.error.TimedOut()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def next_request(self):
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                while self.waiting and self.waiting[0][0] <= now:
+                    _, _, chat_id = heapq.heappop(self.waiting)
+                    self.schedule(chat_id, now)
+
+                timeout = self.waiting[0][0] - now if self.waiting else None
+                if self.ready:
+                    global_wait = self.global_bucket.wait_time(now)
+                    if global_wait == 0:
+                        _, _, chat_id = heapq.heappop(self.ready)
+                        chat_queue = self.chat_queues[chat_id]
+                        while chat_queue and chat_queue[0].cancelled:
+                            chat_queue.popleft()
+                        if not chat_queue:
+                            del self.chat_queues[chat_id]
+                            continue
+                        bucket = self.bucket_for(chat_id)
+                        if bucket.wait_time(now) > 0:
+                            self.schedule(chat_id, now)
+                            continue
+                        bucket.take()
+                        self.global_bucket.take()
+                        self.in_flight.add(chat_id)
+                        request = chat_queue.popleft()
+                        request.started = True
+                        return request
+                    timeout = global_wait if timeout is None else min(timeout, global_wait)
+
+                self.cond.wait(timeout)
+
+    def finish(self, request, retry_after=None):
+        with self.cond:
+            chat_id = request.chat_id
+            self.in_flight.discard(chat_id)
+            now = time.monotonic()
+            chat_queue = self.chat_queues[chat_id]
+            if retry_after is not None:
+                self.bucket_for(chat_id).blocked_until = now + retry_after
+                request.started = False
+                chat_queue.appendleft(request)
+            if chat_queue:
+                self.schedule(chat_id, now)
+            else:
+                del self.chat_queues[chat_id]
+            self.cond.notify()
+
+    def sender(self):
+        while True:
+            request = self.next_request()
+            waited = time.monotonic() - request.queued_at
+            self.count(request.chat_id, 'wait_seconds', waited)
+            observe('pokeauction_outbound_wait_seconds', (('priority', request.priority),), waited)
+            try:
+                request.result = request.send()
+                self.count(request.chat_id, 'sent')
+            except telegram.error.RetryAfter as e:
+                request.retry_afters += 1
+                self.count(request.chat_id, 'retry_after')
+                if request.retry_afters <= OUTBOUND_MAX_RETRY_AFTER:
+                    sampled_log('flood_control', f"Flood control, holding destination for {e.retry_after}s",
+                                logging.WARNING, chat_id=request.chat_id)
+                    self.finish(request, retry_after=e.retry_after)
+                    continue
+                request.error = e
+            except Exception as e:
+                self.count(request.chat_id, 'failed')
+                request.error = e
+            self.finish(request)
+            request.done.set()
+            if request.on_done:
+                try:
+                    request.on_done(request.result, request.error)
+                except Exception as e:
+                    debug_log(f"Outbound completion callback failed: {str(e)}", logging.WARNING,
+                              chat_id=request.chat_id)
+
+    def start(self, senders=OUTBOUND_SENDERS):
+        for i in range(senders):
+            thread = threading.Thread(target=self.sender, name=f"outbound-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def depth(self):
+        with self.cond:
+            return sum(len(q) for q in self.chat_queues.values())
+
+outbound_queue = OutboundQueue()
+outbound_context = threading.local()
+
+@contextmanager
+def outbound_priority(priority):
+    """Send everything in this block from the current thread at priority"""
+    previous = getattr(outbound_context, 'priority', PRIORITY_HIGH)
+    outbound_context.priority = priority
     try:
-        if bidder_id not in ADMINS and not check_verification_status(bidder_id):
-            debug_log(f"Unverified user {bidder_id} attempted to place bid")
-            raise ValueError("User not verified")
+        yield
+    finally:
+        outbound_context.priority = previous
 
-        with db_connection() as conn:
-            c = conn.cursor()
+def log_detached_failure(result, error):
+    if error is not None:
+        sampled_log('detached_send_failed', f"Queued send failed: {str(error)}", logging.WARNING)
 
-            if bidder_name and 'tg://user?id=' in bidder_name:
-                bidder_parts = bidder_name.split(' ')
-                if len(bidder_parts) > 1:
-                    plain_bidder_name = bidder_parts[-1]  
-                else:
-                    plain_bidder_name = bidder_name
-            else:
-                plain_bidder_name = bidder_name.replace('\\', '') if bidder_name else "Unknown"
+@contextmanager
+def outbound_detached(on_done=log_detached_failure, on_queued=None):
+    """Queue sends, edits and copies made in this block without waiting for them.
 
-            bidder_display = f"{plain_bidder_name} ({bidder_id})" if plain_bidder_name else f"User ({bidder_id})"
+    The bot methods return None straight away; on_done(result, error) runs on
+    a sender thread once each request has been tried. on_queued(), if given,
+    runs on the calling thread as each request is queued, before it can finish.
+    """
+    previous = (getattr(outbound_context, 'on_done', None), getattr(outbound_context, 'on_queued', None))
+    outbound_context.on_done = on_done
+    outbound_context.on_queued = on_queued
+    try:
+        yield
+    finally:
+        outbound_context.on_done, outbound_context.on_queued = previous
 
-            c.execute('''SELECT bidder_id, bidder_name, amount
-                         FROM bids
-                         WHERE auction_id=? AND is_active=1
-                         ORDER BY amount DESC
-                         LIMIT 1''', (auction_id,))
-            prev_bidder = c.fetchone()
+class OutboundBatch:
+    """Detached sends a background job queues in one go and then waits for together"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = 0
+
+    def send(self, on_done, call):
+        """Run call() with its send detached; on_done(result, error) gets the outcome"""
+        with self.cond:
+            self.pending += 1
+
+        def finished(result, error):
+            try:
+                on_done(result, error)
+            finally:
+                with self.cond:
+                    self.pending -= 1
+                    self.cond.notify_all()
+
+        with outbound_detached(finished):
+            try:
+                call()
+            except Exception as e:
+                # Raised before anything was queued (bad arguments and the like)
+                finished(None, e)
+
+    def wait(self):
+        with self.cond:
+            while self.pending:
+                self.cond.wait()
+
+def telegram_error_code(e):
+    if isinstance(e, telegram.error.RetryAfter):
+        return '429'
+    if isinstance(e, telegram.error.Unauthorized):
+        return '403'
+    if isinstance(e, telegram.error.BadRequest):
+        return '400'
+    if isinstance(e, telegram.error.TimedOut):
+        return 'timeout'
+    if isinstance(e, telegram.error.NetworkError):
+        return 'network'
+    return type(e).__name__
+
+def timed_api_call(endpoint, func, *args):
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    except Exception as e:
+        inc_metric('pokeauction_telegram_api_errors_total',
+                   (('endpoint', endpoint), ('code', telegram_error_code(e))))
+        raise
+    finally:
+        observe('pokeauction_telegram_api_seconds', (('endpoint', endpoint),), time.perf_counter() - started)
+
+class QueuedBot(ExtBot):
+    """ExtBot whose sends, edits and copies go through outbound_queue"""
+
+    def _post(self, endpoint, data=None, timeout=None, api_kwargs=None):
+        chat_id = (data or {}).get('chat_id')
+        on_done = getattr(outbound_context, 'on_done', None)
+        if on_done is not None and endpoint in THROTTLED_ENDPOINTS and chat_id is not None:
+            return self._post_detached(endpoint, chat_id, data, timeout, api_kwargs, on_done)
+        try:
+            if endpoint not in THROTTLED_ENDPOINTS or chat_id is None or not outbound_queue.threads:
+                return timed_api_call(endpoint, super()._post, endpoint, data, timeout, api_kwargs)
+
+            send = functools.partial(timed_api_call, endpoint, super()._post, endpoint, data, timeout, api_kwargs)
+            priority = getattr(outbound_context, 'priority', PRIORITY_HIGH)
+            return outbound_queue.submit(OutboundRequest(chat_id, priority, send))
+        except (telegram.error.Unauthorized, telegram.error.BadRequest) as e:
+            if endpoint in THROTTLED_ENDPOINTS and not endpoint.startswith('edit'):
+                record_delivery_failure(chat_id, e)
+            raise
+
+    def _post_detached(self, endpoint, chat_id, data, timeout, api_kwargs, on_done):
+        send = functools.partial(timed_api_call, endpoint, super()._post, endpoint, data, timeout, api_kwargs)
 
-            c.execute('''INSERT INTO bids (auction_id, bidder_id, bidder_name, amount)
-                         VALUES (?, ?, ?, ?)''',
-                     (auction_id, bidder_id, plain_bidder_name, amount))
+        def finished(result, error):
+            if isinstance(error, (telegram.error.Unauthorized, telegram.error.BadRequest)) and not endpoint.startswith('edit'):
+                record_delivery_failure(chat_id, error)
+            on_done(result, error)
 
-            if prev_bidder:
-                previous_bidder_name = prev_bidder['bidder_name'] if prev_bidder['bidder_name'] else None
+        on_queued = getattr(outbound_context, 'on_queued', None)
+        if on_queued:
+            on_queued()
+
+        if not outbound_queue.threads:
+            try:
+                result = send()
+            except Exception as e:
+                finished(None, e)
             else:
-                previous_bidder_name = None
+                finished(result, None)
+            return None
 
-            c.execute('''UPDATE auctions SET
-                         current_bid=?,
-                         current_bidder_id=?,
-                         previous_bidder=?,
-                         current_bidder=?
-                         WHERE auction_id=?''',
-                      (amount, bidder_id, previous_bidder_name, bidder_display, auction_id))
+        priority = getattr(outbound_context, 'priority', PRIORITY_HIGH)
+        outbound_queue.submit(OutboundRequest(chat_id, priority, send, on_done=finished), wait=False)
+        # Message.de_json / MessageId.de_json turn this into a None return value
+        return None
 
-            conn.commit()
-            
-            if context:
+# Side-effect pipeline. Work that follows a committed bid (bid log, outbid DM,
+# channel caption edit) is queued here and run by a bounded pool of worker
+# threads, so the bidder's confirmation doesn't wait on the Telegram API.
+# The workers queue their sends detached: a slow destination holds up its own
+# outbound queue, not a worker. An attempt is settled once its sends are
+# through, and one that failed transiently goes back on the queue after a
+# backoff, up to SIDE_EFFECT_MAX_ATTEMPTS.
+SIDE_EFFECT_WORKERS = int(os.getenv("SIDE_EFFECT_WORKERS", "4"))
+SIDE_EFFECT_QUEUE_SIZE = int(os.getenv("SIDE_EFFECT_QUEUE_SIZE", "1000"))
+SIDE_EFFECT_MAX_ATTEMPTS = 3
+
+side_effect_queue = queue.Queue(maxsize=SIDE_EFFECT_QUEUE_SIZE)
+side_effect_threads = []
+side_effect_stats = {}  # event name -> Counter of queued/completed/retried/failed/dropped/seconds
+side_effect_stats_lock = threading.Lock()
+
+def count_side_effect(name, outcome, amount=1):
+    with side_effect_stats_lock:
+        side_effect_stats.setdefault(name, Counter())[outcome] += amount
+
+def is_transient_telegram_error(e):
+    """True for errors worth retrying (flood control, timeouts, connection problems)"""
+    if isinstance(e, (telegram.error.RetryAfter, telegram.error.TimedOut)):
+        return True
+    # BadRequest subclasses NetworkError in python-telegram-bot 13 but never succeeds on retry
+    return isinstance(e, telegram.error.NetworkError) and not isinstance(e, telegram.error.BadRequest)
+
+def run_side_effect(name, func, args, kwargs, attempt=1):
+    """Run one attempt of func with its sends detached; settled once the last send is through"""
+    started = time.monotonic()
+    state = {'pending': 1, 'error': None}  # pending counts func itself plus each queued send
+    state_lock = threading.Lock()
+
+    def queued():
+        with state_lock:
+            state['pending'] += 1
+
+    def finished(result, error):
+        with state_lock:
+            if error is not None and state['error'] is None:
+                state['error'] = error
+            state['pending'] -= 1
+            if state['pending']:
+                return
+            error = state['error']
+        settle_side_effect(name, func, args, kwargs, attempt, time.monotonic() - started, error)
+
+    with outbound_detached(finished, on_queued=queued):
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            finished(None, e)
+            return
+    finished(None, None)
+
+def settle_side_effect(name, func, args, kwargs, attempt, seconds, error):
+    """Count a finished attempt, or put it back on the queue after a backoff if it failed transiently"""
+    if error is None:
+        count_side_effect(name, 'completed')
+        count_side_effect(name, 'seconds', seconds)
+        return
+    if attempt < SIDE_EFFECT_MAX_ATTEMPTS and is_transient_telegram_error(error):
+        delay = error.retry_after if isinstance(error, telegram.error.RetryAfter) else 2 ** attempt
+        count_side_effect(name, 'retried')
+        sampled_log(f'side_effect_retry:{name}', f"Side effect {name} failed ({str(error)}), retry {attempt} in {delay}s",
+                    logging.WARNING)
+        timer = threading.Timer(delay, retry_side_effect, args=((name, func, args, kwargs, attempt + 1),))
+        timer.daemon = True
+        timer.start()
+        return
+    count_side_effect(name, 'failed')
+    debug_log(f"Side effect {name} failed: {str(error)}", logging.WARNING)
+
+def retry_side_effect(item):
+    if not side_effect_threads:
+        run_side_effect(*item)
+        return
+    try:
+        side_effect_queue.put_nowait(item)
+    except queue.Full:
+        count_side_effect(item[0], 'dropped')
+        debug_log(f"Side-effect queue full, dropped retry of {item[0]}", logging.WARNING)
+
+def side_effect_worker():
+    outbound_context.priority = PRIORITY_NORMAL
+    while True:
+        item = side_effect_queue.get()
+        try:
+            if item is None:
+                return
+            run_side_effect(*item)
+        finally:
+            side_effect_queue.task_done()
+
+def start_side_effect_workers(workers=SIDE_EFFECT_WORKERS):
+    for i in range(workers):
+        thread = threading.Thread(target=side_effect_worker, name=f"side-effects-{i}", daemon=True)
+        thread.start()
+        side_effect_threads.append(thread)
+    debug_log(f"Started {workers} side-effect workers", logging.INFO)
+
+def stop_side_effect_workers(timeout=10):
+    """Let queued work finish, then stop the workers"""
+    for _ in side_effect_threads:
+        side_effect_queue.put(None)
+    for thread in side_effect_threads:
+        thread.join(timeout)
+    side_effect_threads.clear()
+
+def enqueue_side_effect(name, func, *args, **kwargs):
+    """Queue func(*args, **kwargs) for the worker pool; runs inline if the pool isn't started"""
+    if not side_effect_threads:
+        run_side_effect(name, func, args, kwargs)
+        return True
+    try:
+        side_effect_queue.put_nowait((name, func, args, kwargs))
+        count_side_effect(name, 'queued')
+        return True
+    except queue.Full:
+        count_side_effect(name, 'dropped')
+        debug_log(f"Side-effect queue full, dropped {name}", logging.WARNING)
+        return False
+
+# Channel post scheduler. Edits to a channel post are coalesced: only the
+# latest caption per message is kept, it goes out after a short debounce
+# window, each chat has an edit budget, and an edit that would render the
+# same caption as the last successful one is skipped. An edit rendered from
+# an auction that has ended since is dropped, so it can't put the bid buttons
+# back on a settled post.
+CAPTION_DEBOUNCE_SECONDS = float(os.getenv("CAPTION_DEBOUNCE_SECONDS", "1.5"))
+CHANNEL_EDITS_PER_MINUTE = int(os.getenv("CHANNEL_EDITS_PER_MINUTE", "20"))
+POST_UPDATE_MAX_ATTEMPTS = 3
+POST_RENDER_CACHE_SIZE = 5000
+
+pending_post_updates = {}  # (chat_id, message_id) -> latest desired edit
+last_post_render = OrderedDict()  # (chat_id, message_id) -> (caption, markup, version) of the last successful edit
+chat_edit_times = {}  # chat_id -> deque of recent edit timestamps
+post_updates_cond = threading.Condition()
+post_update_state = {'thread': None, 'stopping': False}
+
+def markup_key(reply_markup):
+    return reply_markup.to_json() if reply_markup else None
+
+def is_post_current(chat_id, message_id, caption, reply_markup):
+    """True if the post already shows this caption and keyboard"""
+    with post_updates_cond:
+        rendered = last_post_render.get((chat_id, message_id))
+        return rendered is not None and rendered[:2] == (caption, markup_key(reply_markup))
+
+def post_shows_version(chat_id, message_id, version):
+    """True if the post was last edited to the caption of this (auction_id, state_version)"""
+    with post_updates_cond:
+        rendered = last_post_render.get((chat_id, message_id))
+        return rendered is not None and rendered[2] is not None and rendered[2] == version
+
+def remember_post_render(key, caption, reply_markup, version=None):
+    with post_updates_cond:
+        last_post_render[key] = (caption, markup_key(reply_markup), version)
+        last_post_render.move_to_end(key)
+        while len(last_post_render) > POST_RENDER_CACHE_SIZE:
+            last_post_render.popitem(last=False)
+
+def edit_budget_wait(chat_id, now):
+    """Seconds until chat_id may be edited again; 0 if there is budget left"""
+    recent = chat_edit_times.setdefault(chat_id, deque())
+    while recent and now - recent[0] >= 60:
+        recent.popleft()
+    if len(recent) < CHANNEL_EDITS_PER_MINUTE:
+        return 0
+    return 60 - (now - recent[0])
+
+def schedule_post_update(bot, chat_id, message_id, caption, reply_markup, has_photo, delay=None, version=None,
+                         on_failure=None):
+    """Ask for a channel post to show caption; newer requests for the same post replace older ones.
+
+    version is the (auction_id, state_version) the caption was rendered from, if any.
+    on_failure(error) is called if the edit is finally given up on.
+    """
+    key = (chat_id, message_id)
+    if is_post_current(chat_id, message_id, caption, reply_markup):
+        if version is not None:
+            remember_post_render(key, caption, reply_markup, version)
+        count_side_effect('channel_update', 'skipped')
+        return
+
+    entry = {
+        'bot': bot,
+        'caption': caption,
+        'reply_markup': reply_markup,
+        'has_photo': has_photo,
+        'version': version,
+        'on_failure': on_failure,
+        'attempts': 0,
+    }
+
+    with post_updates_cond:
+        if post_update_state['thread'] is None:
+            run_inline = True
+        else:
+            run_inline = False
+            delay = CAPTION_DEBOUNCE_SECONDS if delay is None else delay
+            due = time.monotonic() + delay
+            previous = pending_post_updates.get(key)
+            if previous:
+                # Keep the earlier deadline so a steady stream of bids can't starve the post
+                due = min(due, previous['due'])
+                entry['attempts'] = previous['attempts']
+                entry['on_failure'] = entry['on_failure'] or previous['on_failure']
+                count_side_effect('channel_update', 'coalesced')
+            entry['due'] = due
+            pending_post_updates[key] = entry
+            post_updates_cond.notify()
+
+    if run_inline:
+        apply_post_update(key, entry)
+
+def drop_post_update(chat_id, message_id):
+    """Cancel any edit still waiting for a post whose keyboard is being removed"""
+    key = (chat_id, message_id)
+    with post_updates_cond:
+        if pending_post_updates.pop(key, None) is not None:
+            count_side_effect('channel_update', 'superseded')
+        rendered = last_post_render.get(key)
+        remember_post_render(key, rendered[0] if rendered else None, None)
+
+def edit_channel_post(bot, chat_id, message_id, caption, reply_markup, has_photo):
+    """Edit a post's caption/text, falling back to plain text if the HTML is rejected"""
+    try:
+        if has_photo:
+            bot.edit_message_caption(chat_id=chat_id, message_id=message_id, caption=caption,
+                                     reply_markup=reply_markup, parse_mode='HTML')
+        else:
+            bot.edit_message_text(chat_id=chat_id, message_id=message_id, text=caption,
+                                  reply_markup=reply_markup, parse_mode='HTML')
+    except telegram.error.BadRequest as e:
+        if "Message is not modified" in str(e):
+            return
+        debug_log(f"Channel update failed: {str(e)}", logging.WARNING)
+        plain_caption = caption.replace('<br>', '\n').replace('<a href="', '').replace('">', ' ').replace('</a>', '')
+        if has_photo:
+            bot.edit_message_caption(chat_id=chat_id, message_id=message_id, caption=plain_caption,
+                                     reply_markup=reply_markup)
+        else:
+            bot.edit_message_text(chat_id=chat_id, message_id=message_id, text=plain_caption,
+                                  reply_markup=reply_markup)
+
+def apply_post_update(key, entry):
+    chat_id, message_id = key
+    version = entry['version']
+    if version is not None and get_auction_version(version[0]) is None:
+        count_side_effect('channel_update', 'skipped')
+        return
+    started = time.monotonic()
+    try:
+        edit_channel_post(entry['bot'], chat_id, message_id, entry['caption'], entry['reply_markup'], entry['has_photo'])
+        remember_post_render(key, entry['caption'], entry['reply_markup'], entry['version'])
+        count_side_effect('channel_update', 'completed')
+        count_side_effect('channel_update', 'seconds', time.monotonic() - started)
+    except Exception as e:
+        entry['attempts'] += 1
+        if (not is_transient_telegram_error(e) or entry['attempts'] >= POST_UPDATE_MAX_ATTEMPTS
+                or post_update_state['thread'] is None):
+            count_side_effect('channel_update', 'failed')
+            debug_log(f"Channel update for message {message_id} failed: {str(e)}", logging.WARNING)
+            if entry['on_failure']:
                 try:
-                    send_bid_log(context, auction_id, bidder_id, bidder_name, amount, prev_bidder)
-                except Exception as e:
-                    debug_log(f"Failed to send bid log: {str(e)}")
-            
-            return prev_bidder, auction_id
+                    entry['on_failure'](e)
+                except Exception as report_error:
+                    debug_log(f"Couldn't report failed channel update: {str(report_error)}")
+            return
+
+        count_side_effect('channel_update', 'retried')
+        delay = e.retry_after if isinstance(e, telegram.error.RetryAfter) else 2 ** entry['attempts']
+        sampled_log('channel_update_deferred', f"Channel update deferred {delay}s: {str(e)}",
+                    logging.WARNING, message_id=message_id)
+        with post_updates_cond:
+            # A newer caption queued meanwhile supersedes this one
+            if key not in pending_post_updates:
+                entry['due'] = time.monotonic() + delay
+                pending_post_updates[key] = entry
+            if isinstance(e, telegram.error.RetryAfter):
+                # Flood control applies to the whole chat, so hold every post in it
+                hold_until = time.monotonic() + delay
+                for (pending_chat, _), pending in pending_post_updates.items():
+                    if pending_chat == chat_id:
+                        pending['due'] = max(pending['due'], hold_until)
+            post_updates_cond.notify()
+
+def next_post_update():
+    """Block until a post update is due and within its chat's budget; None once stopped and drained"""
+    with post_updates_cond:
+        while True:
+            stopping = post_update_state['stopping']
+            if not pending_post_updates:
+                if stopping:
+                    return None
+                post_updates_cond.wait()
+                continue
+
+            now = time.monotonic()
+            key, entry = min(pending_post_updates.items(), key=lambda item: item[1]['due'])
+            if entry['due'] > now and not stopping:
+                post_updates_cond.wait(entry['due'] - now)
+                continue
+
+            rendered = last_post_render.get(key)
+            if rendered is not None and rendered[:2] == (entry['caption'], markup_key(entry['reply_markup'])):
+                del pending_post_updates[key]
+                count_side_effect('channel_update', 'skipped')
+                continue
+
+            wait = edit_budget_wait(key[0], now)
+            if wait > 0 and not stopping:
+                entry['due'] = now + wait
+                count_side_effect('channel_update', 'deferred')
+                continue
+
+            del pending_post_updates[key]
+            chat_edit_times[key[0]].append(now)
+            return key, entry
+
+def post_update_worker():
+    outbound_context.priority = PRIORITY_NORMAL
+    while True:
+        item = next_post_update()
+        if item is None:
+            return
+        apply_post_update(*item)
+
+def start_post_updates():
+    thread = threading.Thread(target=post_update_worker, name="channel-post-updates", daemon=True)
+    post_update_state['thread'] = thread
+    thread.start()
+
+def stop_post_updates(timeout=10):
+    """Flush pending edits (ignoring the debounce and budget) and stop the worker"""
+    thread = post_update_state['thread']
+    if not thread:
+        return
+    with post_updates_cond:
+        post_update_state['stopping'] = True
+        post_updates_cond.notify()
+    thread.join(timeout)
+    post_update_state['thread'] = None
+
+# Bid engine. A bid is validated and recorded in one step: the per-auction
+# lock serialises bidders inside this process, BEGIN IMMEDIATE takes SQLite's
+# write lock before the auction is read, and the UPDATE only applies if
+# current_bid is still the value the minimum was computed from.
+BID_ACCEPTED = 'accepted'
+BID_TOO_LOW = 'too_low'
+BID_CLOSED = 'closed'
+
+# status: one of the BID_* values
+# auction: auction dict after the bid (or as it stood, if rejected); None if it isn't active
+# min_bid: the minimum this bid had to meet
+# previous_bid: the outbid row (bidder_id, bidder_name, amount) or None
+BidResult = namedtuple('BidResult', ['status', 'auction', 'min_bid', 'previous_bid'])
+
+auction_locks = {}
+auction_locks_guard = threading.Lock()
+
+def get_auction_lock(auction_id):
+    with auction_locks_guard:
+        lock = auction_locks.get(auction_id)
+        if lock is None:
+            lock = auction_locks[auction_id] = threading.Lock()
+        return lock
+
+def get_min_bid(auction):
+    """Smallest acceptable next bid for an auction row/dict"""
+    current_amount = auction['current_bid'] or auction['base_price'] or 0
+    return int(current_amount + get_min_increment(current_amount))
+
+def place_bid(auction_id, bidder_id, bidder_name, amount):
+    """Validate and record a bid atomically. Returns a BidResult."""
+    if bidder_id not in ADMINS and not check_verification_status(bidder_id):
+        debug_log("Unverified user attempted to place bid", logging.WARNING, user_id=bidder_id, auction_id=auction_id)
+        raise ValueError("User not verified")
+
+    if bidder_name and 'tg://user?id=' in bidder_name:
+        bidder_parts = bidder_name.split(' ')
+        if len(bidder_parts) > 1:
+            plain_bidder_name = bidder_parts[-1]
+        else:
+            plain_bidder_name = bidder_name
+    else:
+        plain_bidder_name = bidder_name.replace('\\', '') if bidder_name else "Unknown"
+
+    bidder_display = f"{plain_bidder_name} ({bidder_id})" if plain_bidder_name else f"User ({bidder_id})"
+    amount = int(amount)
+
+    with get_auction_lock(auction_id):
+        with db_connection() as conn:
+            c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                status_row = c.execute("SELECT auctions_open FROM system_status WHERE id=1").fetchone()
+                row = c.execute('''SELECT * FROM auctions WHERE auction_id=? AND auction_status='active' ''',
+                                (auction_id,)).fetchone()
+
+                if not row:
+                    conn.rollback()
+                    return BidResult(BID_CLOSED, None, None, None)
+
+                auction = dict(row)
+                min_bid = get_min_bid(auction)
+
+                if not status_row or not status_row['auctions_open']:
+                    conn.rollback()
+                    return BidResult(BID_CLOSED, auction, min_bid, None)
+
+                if amount < min_bid:
+                    conn.rollback()
+                    return BidResult(BID_TOO_LOW, auction, min_bid, None)
+
+                prev_bidder = None
+                if auction['winning_bid_id']:
+                    prev_bidder = c.execute('''SELECT bidder_id, bidder_name, amount FROM bids
+                                               WHERE bid_id=?''', (auction['winning_bid_id'],)).fetchone()
+
+                c.execute('''INSERT INTO bids (auction_id, bidder_id, bidder_name, amount)
+                             VALUES (?, ?, ?, ?)''',
+                          (auction_id, bidder_id, plain_bidder_name, amount))
+                bid_id = c.lastrowid
+
+                previous_bidder_name = prev_bidder['bidder_name'] if prev_bidder and prev_bidder['bidder_name'] else None
+
+                c.execute('''UPDATE auctions SET
+                             current_bid=?,
+                             current_bidder_id=?,
+                             previous_bidder=?,
+                             current_bidder=?,
+                             winning_bid_id=?,
+                             bid_count=bid_count + 1,
+                             state_version=state_version + 1
+                             WHERE auction_id=? AND auction_status='active' AND current_bid IS ?
+                             AND state_version=?''',
+                          (amount, bidder_id, previous_bidder_name, bidder_display, bid_id,
+                           auction_id, auction['current_bid'], auction['state_version']))
+
+                if c.rowcount != 1:
+                    # Someone outside this process changed the auction under us
+                    conn.rollback()
+                    debug_log(f"Bid on auction {auction_id} lost compare-and-set, rejecting")
+                    return BidResult(BID_TOO_LOW, auction, min_bid, None)
+
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    auction.update({
+        'current_bid': amount,
+        'current_bidder_id': bidder_id,
+        'previous_bidder': previous_bidder_name,
+        'current_bidder': bidder_display,
+        'winning_bid_id': bid_id,
+        'bid_count': auction['bid_count'] + 1,
+        'state_version': auction['state_version'] + 1,
+    })
+    return BidResult(BID_ACCEPTED, auction, min_bid, prev_bidder)
+
+def record_bid(auction_id, bidder_id, bidder_name, amount):
+    """place_bid() for callers that only care about accepted bids; raises ValueError otherwise"""
+    try:
+        result = place_bid(auction_id, bidder_id, bidder_name, amount)
+        if result.status != BID_ACCEPTED:
+            raise ValueError(f"Bid rejected: {result.status}")
+
+        return result.previous_bid, auction_id
 
     except Exception as e:
         debug_log(f"Error in record_bid: {str(e)}")
         raise
 
-def send_bid_log(context, auction_id, bidder_id, bidder_name, amount, previous_bid):
+# Channel identity for t.me links to auction posts. main() fills it from the
+# get_chat(CHANNEL_ID) it already makes at startup; after that it is re-resolved
+# at most once per CHANNEL_INFO_TTL_SECONDS, so building a link costs no API call.
+CHANNEL_INFO_TTL_SECONDS = float(os.getenv("CHANNEL_INFO_TTL_SECONDS", "3600"))
+CHANNEL_INFO_RETRY_SECONDS = 60
+PRIVATE_CHANNEL_PATH = f"c/{str(CHANNEL_ID).replace('-100', '')}"
+# link_base is the t.me path of the channel: its username, or c/<id> when it is private.
+# Until the first get_chat it falls back to the configured CHANNEL_USERNAME.
+CHANNEL_INFO = {'username': None, 'title': None, 'expires_at': 0.0,
+                'link_base': CHANNEL_USERNAME.lstrip('@') or PRIVATE_CHANNEL_PATH}
+channel_info_lock = threading.Lock()
+
+def cache_channel_info(chat):
+    with channel_info_lock:
+        CHANNEL_INFO['username'] = chat.username
+        CHANNEL_INFO['title'] = chat.title
+        CHANNEL_INFO['link_base'] = chat.username or PRIVATE_CHANNEL_PATH
+        CHANNEL_INFO['expires_at'] = time.monotonic() + CHANNEL_INFO_TTL_SECONDS
+
+def refresh_channel_info(bot):
+    """Re-resolve the channel through bot if the cached identity has expired"""
+    with channel_info_lock:
+        if time.monotonic() < CHANNEL_INFO['expires_at']:
+            return
+        # Claim the refresh so concurrent callers keep using the old value meanwhile
+        CHANNEL_INFO['expires_at'] = time.monotonic() + CHANNEL_INFO_RETRY_SECONDS
     try:
-        if not LOGS_CHANNEL_ID:
+        cache_channel_info(bot.get_chat(CHANNEL_ID))
+    except Exception as e:
+        sampled_log('channel_info', f"Couldn't resolve channel {CHANNEL_ID}: {str(e)}", level=logging.WARNING)
+
+def channel_post_link(message_id, bot=None):
+    """Link to a channel post, or None without a message id. Pass bot to refresh a stale cache."""
+    if not message_id:
+        return None
+    if bot is not None:
+        refresh_channel_info(bot)
+    return f"https://t.me/{CHANNEL_INFO['link_base']}/{message_id}"
+
+# Bid log batching. The logs channel only takes ~20 messages a minute, so bid
+# log entries are buffered and posted by one thread, as many per message as
+# fit. While that thread waits for the channel's budget, new entries pile up
+# into the next message instead of holding side-effect workers.
+BID_LOG_MAX_CHARS = 4000
+BID_LOG_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+BID_LOG_MAX_PENDING = int(os.getenv("BID_LOG_MAX_PENDING", "2000"))
+BID_LOG_RETRY_SECONDS = 5
+
+bid_log_entries = deque()
+bid_log_cond = threading.Condition()
+bid_log_state = {'thread': None, 'stopping': False, 'bot': None}
+
+def queue_bid_log(bot, text):
+    """Buffer a bid log entry; posts it straight away if the batcher isn't running"""
+    with bid_log_cond:
+        if bid_log_state['thread'] is not None:
+            if len(bid_log_entries) >= BID_LOG_MAX_PENDING:
+                bid_log_entries.popleft()
+                count_side_effect('bid_log', 'dropped')
+            bid_log_entries.append(text)
+            bid_log_cond.notify()
             return
+    bot.send_message(chat_id=LOGS_CHANNEL_ID, text=text, parse_mode='HTML', disable_web_page_preview=True)
 
-        auction = get_auction(auction_id)
-        if not auction:
+def next_bid_log_batch():
+    """Block until entries are buffered and take as many as fit in one message; None once stopped and drained"""
+    with bid_log_cond:
+        while not bid_log_entries:
+            if bid_log_state['stopping']:
+                return None
+            bid_log_cond.wait()
+        batch = [bid_log_entries.popleft()]
+        size = len(batch[0])
+        while bid_log_entries and size + len(BID_LOG_SEPARATOR) + len(bid_log_entries[0]) <= BID_LOG_MAX_CHARS:
+            entry = bid_log_entries.popleft()
+            size += len(BID_LOG_SEPARATOR) + len(entry)
+            batch.append(entry)
+        return batch
+
+def bid_log_worker():
+    outbound_context.priority = PRIORITY_NORMAL
+    while True:
+        batch = next_bid_log_batch()
+        if batch is None:
             return
+        try:
+            bid_log_state['bot'].send_message(chat_id=LOGS_CHANNEL_ID, text=BID_LOG_SEPARATOR.join(batch),
+                                              parse_mode='HTML', disable_web_page_preview=True)
+            count_side_effect('bid_log', 'batches')
+        except Exception as e:
+            if not is_transient_telegram_error(e) or bid_log_state['stopping']:
+                count_side_effect('bid_log', 'failed', len(batch))
+                debug_log(f"Couldn't post {len(batch)} bid logs: {str(e)}")
+                continue
+            with bid_log_cond:
+                bid_log_entries.extendleft(reversed(batch))
+            sampled_log('bid_log_retry', f"Bid log post failed ({str(e)}), retrying in {BID_LOG_RETRY_SECONDS}s",
+                        logging.WARNING)
+            time.sleep(BID_LOG_RETRY_SECONDS)
+
+def start_bid_log_batcher(bot):
+    if not LOGS_CHANNEL_ID:
+        return
+    thread = threading.Thread(target=bid_log_worker, name="bid-logs", daemon=True)
+    with bid_log_cond:
+        bid_log_state['bot'] = bot
+        bid_log_state['thread'] = thread
+    thread.start()
+
+def stop_bid_log_batcher(timeout=10):
+    """Post what is buffered, then stop the thread"""
+    thread = bid_log_state['thread']
+    if not thread:
+        return
+    with bid_log_cond:
+        bid_log_state['stopping'] = True
+        bid_log_cond.notify()
+    thread.join(timeout)
+    bid_log_state['thread'] = None
+
+def send_bid_log(context, auction, bidder, amount, previous_bid):
+    """Post a new bid to the logs channel (runs on the side-effect pipeline)"""
+    if not LOGS_CHANNEL_ID:
+        return
 
-        user = context.bot.get_chat(bidder_id)
-        full_name = user.first_name
-        if user.last_name:
-            full_name += f" {user.last_name}"
-        
-        username = f"@{user.username}" if user.username else "No username"
-        
-        item_name = extract_item_name(auction['item_text'])
-        channel_username = CHANNEL_USERNAME or f"c/{str(CHANNEL_ID).replace('-100', '')}"
-        message_link = f"https://t.me/{channel_username}/{auction['channel_message_id']}"
-        
-        formatted_bid = format_bid_amount(amount)
-        previous_amount = previous_bid['amount'] if previous_bid else auction.get('base_price', 0)
-        formatted_previous = format_bid_amount(previous_amount)
-        
-        log_message = (
-            "🪙 <b>New Bid Placed</b> 🪙\n\n"
-            f"👤 <b>Bidder:</b> {html.escape(full_name)}\n"
-            f"📱 <b>Username:</b> {username}\n"
-            f"🆔 <b>User ID:</b> <code>{bidder_id}</code>\n\n"
-            f"💰 <b>Bid Amount:</b> {formatted_bid} pd\n"
-            f"📈 <b>Previous Bid:</b> {formatted_previous} pd\n\n"
-            f"📦 <b>Item:</b> <a href='{message_link}'>{html.escape(item_name)}</a>\n"
-            f"🏷️ <b>Auction ID:</b> #{auction_id}\n\n"
-            f"⏰ <b>Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        )
-        
-        context.bot.send_message(
-            chat_id=LOGS_CHANNEL_ID,
-            text=log_message,
-            parse_mode='HTML',
-            disable_web_page_preview=True
-        )
-        
-    except Exception as e:
-        debug_log(f"Error sending bid log: {str(e)}")
+    full_name = bidder.first_name
+    if bidder.last_name:
+        full_name += f" {bidder.last_name}"
+    
+    username = f"@{bidder.username}" if bidder.username else "No username"
+    
+    item_name = extract_item_name(auction['item_text'])
+    message_link = channel_post_link(auction['channel_message_id'], context.bot)
+    
+    formatted_bid = format_bid_amount(amount)
+    previous_amount = previous_bid['amount'] if previous_bid else auction.get('base_price', 0)
+    formatted_previous = format_bid_amount(previous_amount)
+    
+    log_message = (
+        "🪙 <b>New Bid Placed</b> 🪙\n\n"
+        f"👤 <b>Bidder:</b> {html.escape(full_name)}\n"
+        f"📱 <b>Username:</b> {username}\n"
+        f"🆔 <b>User ID:</b> <code>{bidder.id}</code>\n\n"
+        f"💰 <b>Bid Amount:</b> {formatted_bid} pd\n"
+        f"📈 <b>Previous Bid:</b> {formatted_previous} pd\n\n"
+        f"📦 <b>Item:</b> <a href='{message_link}'>{html.escape(item_name)}</a>\n"
+        f"🏷️ <b>Auction ID:</b> #{auction['auction_id']}\n\n"
+        f"⏰ <b>Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    )
+
+    queue_bid_log(context.bot, log_message)
 
 def get_auction(auction_id):
     try:
@@ -1026,11 +2487,13 @@ def get_auction_by_channel_id(channel_message_id):
 
 def save_submission(user_id, data):
     try:
+        attributes = extract_item_attributes(data)
+        columns = ", ".join(ITEM_ATTRIBUTE_COLUMNS)
         with db_connection() as conn:
             c = conn.cursor()
-            c.execute('''INSERT INTO submissions (user_id, data)
-                         VALUES (?, ?)''',
-                     (user_id, json.dumps(data)))
+            c.execute(f'''INSERT INTO submissions (user_id, data, {columns})
+                          VALUES (?, ?{", ?" * len(ITEM_ATTRIBUTE_COLUMNS)})''',
+                     (user_id, json.dumps(data), *(attributes[name] for name in ITEM_ATTRIBUTE_COLUMNS)))
             submission_id = c.lastrowid
             conn.commit()
             return submission_id
@@ -1067,7 +2530,7 @@ def save_temp_data(user_id, data):
                      (user_id, json.dumps(data)))
             conn.commit()
     except Exception as e:
-        debug_log(f"Temp data save failed: {str(e)}")
+        debug_log(f"Temp data save failed: {str(e)}", logging.WARNING)
         raise
 
 def load_temp_data(user_id):
@@ -1078,7 +2541,7 @@ def load_temp_data(user_id):
             result = c.fetchone()
             return json.loads(result[0]) if result else {}
     except Exception as e:
-        debug_log(f"Temp data load failed: {str(e)}")
+        debug_log(f"Temp data load failed: {str(e)}", logging.WARNING)
         return {}
 
 def cleanup_temp_data(user_id):
@@ -1087,7 +2550,7 @@ def cleanup_temp_data(user_id):
             conn.execute('''DELETE FROM temp_data WHERE user_id=?''', (user_id,))
             conn.commit()
     except Exception as e:
-        debug_log(f"Cleanup failed: {str(e)}")
+        debug_log(f"Cleanup failed: {str(e)}", logging.WARNING)
 
 def get_user_active_bids(user_id):
     try:
@@ -1250,58 +2713,50 @@ def format_tm_auction_item(data, auction_id=None):
 
     return "\n".join(lines)
 
-def increment_win(user_id, username):
-    try:
-        conn = leaderboard_connection()
-        c = conn.cursor()
-        c.execute('''INSERT INTO leaderboard (user_id, username, total_wins)
+def bump_leaderboard(conn, user_id, username, column):
+    """Add one win or sale on an open connection; the caller commits"""
+    if column not in ('total_wins', 'total_sales'):
+        raise ValueError(f"Unknown leaderboard column: {column}")
+    conn.execute(f'''INSERT INTO leaderboard (user_id, username, {column})
                      VALUES (?, ?, 1)
                      ON CONFLICT(user_id) DO UPDATE SET
-                     total_wins = total_wins + 1,
+                     {column} = {column} + 1,
                      username = excluded.username,
                      updated_at = CURRENT_TIMESTAMP''',
-                  (user_id, username or "Unknown"))
-        conn.commit()
-        conn.close()
+                 (user_id, username or "Unknown"))
+
+def increment_win(user_id, username):
+    try:
+        with leaderboard_connection() as conn:
+            bump_leaderboard(conn, user_id, username, 'total_wins')
     except Exception as e:
         debug_log(f"Error incrementing win: {str(e)}")
 
 def increment_sale(user_id, username):
     try:
-        conn = leaderboard_connection()
-        c = conn.cursor()
-        c.execute('''INSERT INTO leaderboard (user_id, username, total_sales)
-                     VALUES (?, ?, 1)
-                     ON CONFLICT(user_id) DO UPDATE SET
-                     total_sales = total_sales + 1,
-                     username = excluded.username,
-                     updated_at = CURRENT_TIMESTAMP''',
-                  (user_id, username or "Unknown"))
-        conn.commit()
-        conn.close()
+        with leaderboard_connection() as conn:
+            bump_leaderboard(conn, user_id, username, 'total_sales')
     except Exception as e:
         debug_log(f"Error incrementing sale: {str(e)}")
 
 def get_top_buyers(limit=5):
     try:
-        conn = leaderboard_connection()
-        c = conn.cursor()
-        c.execute("SELECT user_id, username, total_wins FROM leaderboard WHERE total_wins > 0 ORDER BY total_wins DESC, updated_at ASC LIMIT ?", (limit,))
-        rows = c.fetchall()
-        conn.close()
-        return rows
+        with leaderboard_connection() as conn:
+            c = conn.cursor()
+            c.execute("SELECT user_id, username, total_wins FROM leaderboard WHERE total_wins > 0 ORDER BY total_wins DESC, updated_at ASC LIMIT ?", (limit,))
+            rows = c.fetchall()
+            return rows
     except Exception as e:
         debug_log(f"Error fetching top buyers: {str(e)}")
         return []
 
 def get_top_sellers(limit=5):
     try:
-        conn = leaderboard_connection()
-        c = conn.cursor()
-        c.execute("SELECT user_id, username, total_sales FROM leaderboard WHERE total_sales > 0 ORDER BY total_sales DESC, updated_at ASC LIMIT ?", (limit,))
-        rows = c.fetchall()
-        conn.close()
-        return rows
+        with leaderboard_connection() as conn:
+            c = conn.cursor()
+            c.execute("SELECT user_id, username, total_sales FROM leaderboard WHERE total_sales > 0 ORDER BY total_sales DESC, updated_at ASC LIMIT ?", (limit,))
+            rows = c.fetchall()
+            return rows
     except Exception as e:
         debug_log(f"Error fetching top sellers: {str(e)}")
         return []
@@ -1309,6 +2764,7 @@ def get_top_sellers(limit=5):
 
 def require_verification(func):
     """Decorator to require verification for all commands"""
+    @functools.wraps(func)
     def wrapper(update: Update, context: CallbackContext):
         user_id = update.effective_user.id
         
@@ -1360,6 +2816,8 @@ def start(update: Update, context: CallbackContext):
         update.message.reply_text("❌ Please use this bot in private messages (DM) only!")
         return
 
+    mark_reachable(update.effective_user.id)
+
     # Handle deep links for bidding
     if context.args and context.args[0].startswith('bid_'):
         try:
@@ -1565,7 +3023,7 @@ def handle_verification_request_button(update: Update, context: CallbackContext)
     
     # Check if already has pending request
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
             c.execute('SELECT 1 FROM verification_requests WHERE user_id=?', (user.id,))
             if c.fetchone():
@@ -1582,7 +3040,7 @@ def handle_verification_request_button(update: Update, context: CallbackContext)
     
     # Process verification request
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
             c.execute('''INSERT INTO verification_requests
                         (user_id, username)
@@ -1653,7 +3111,7 @@ def handle_verification_request_button(update: Update, context: CallbackContext)
                 debug_log(f"Failed to send success message: {str(send_error)}")
 
     except Exception as e:
-        debug_log(f"Verification request error: {str(e)}")
+        debug_log(f"Verification request error: {str(e)}", logging.WARNING)
         # Handle error message based on message type
         error_message = "❌ Failed to send verification request. Please try again."
         try:
@@ -1727,183 +3185,311 @@ def start_auction(update: Update, context: CallbackContext):
         conn.commit()
     update.message.reply_text("✅ Auctions are now OPEN")
 
-def send_win_notifications(context):
-    try:
-        with db_connection() as conn:
-            c = conn.cursor()
-            c.execute('''SELECT a.auction_id, a.item_text, a.channel_message_id, 
-                                a.seller_id, a.seller_name, a.base_price,
-                                b.bidder_id, b.bidder_name, b.amount
-                         FROM auctions a
-                         JOIN bids b ON a.auction_id = b.auction_id
-                         WHERE a.auction_status = 'active'
-                         AND b.amount = (
-                             SELECT MAX(amount) 
-                             FROM bids 
-                             WHERE auction_id = a.auction_id AND is_active = 1
-                         )
-                         AND b.is_active = 1''')
-            winning_bids = c.fetchall()
+# End-of-auction settlement. /endauction closes bidding, snapshots every
+# active auction into auction_settlements and hands the rest to a background
+# job. Each auction goes through four recorded steps (notify buyer, notify
+# seller, credit the leaderboard, remove the bid buttons), so a job that is
+# interrupted resumes without repeating a DM or counting a win twice.
+SETTLEMENT_BATCH_SIZE = 100
+SETTLEMENT_MAX_PASSES = 3
+SETTLEMENT_PROGRESS_SECONDS = 5
 
-        try:
-            channel_entity = context.bot.get_chat(CHANNEL_ID)
-            channel_username = channel_entity.username
-            if not channel_username:
-                channel_username = f"c/{str(CHANNEL_ID).replace('-100', '')}"
-        except:
-            channel_username = None
+STEP_PENDING = 0
+STEP_DONE = 1
+STEP_SKIPPED = 2  # nothing to do, or it failed for good (e.g. the user blocked the bot)
 
-        notifications_sent = 0
-        notifications_failed = 0
-        seller_notifications_sent = 0
-        seller_notifications_failed = 0
+settlement_threads = {}  # job_id -> runner thread
+settlement_threads_lock = threading.Lock()
 
-        for bid in winning_bids:
-            auction_id, item_text, channel_msg_id, seller_id, seller_name, base_price, bidder_id, bidder_name, amount = bid
-            
-            item_name = extract_item_name(item_text)
-            
-            if channel_username and channel_msg_id:
-                message_link = f"https://t.me/{channel_username}/{channel_msg_id}"
-                item_display = f'<a href="{message_link}">{html.escape(item_name)}</a>'
-            else:
-                item_display = html.escape(item_name)
+def build_settlement_messages(row):
+    """Buyer and seller DMs for a settled auction"""
+    item_name = extract_item_name(row['item_text'])
 
-            formatted_bid = format_bid_amount(amount)
-            formatted_base = format_bid_amount(base_price)
+    message_link = channel_post_link(row['channel_message_id'])
+    if message_link:
+        item_display = f'<a href="{message_link}">{html.escape(item_name)}</a>'
+    else:
+        item_display = html.escape(item_name)
+
+    formatted_bid = format_bid_amount(row['amount'])
+    formatted_base = format_bid_amount(row['base_price'])
+
+    buyer_message = (
+        f"🎉 <b>You Won the Auction!</b> 🎉\n\n"
+        f"🛒 <b>Item Purchased:</b> {item_display}\n"
+        f"🏷️ <b>Item ID:</b> #{row['auction_id']}\n"
+        f"💰 <b>Your Winning Bid:</b> {formatted_bid} pd\n"
+        f"👤 <b>Seller:</b> {html.escape(row['seller_name'] or 'Unknown')}\n\n"
+        f"<i>Please contact the seller to complete the transaction.</i>"
+    )
 
-            # Send notification to BUYER (winner)
-            buyer_message = (
-                f"🎉 <b>You Won the Auction!</b> 🎉\n\n"
-                f"🛒 <b>Item Purchased:</b> {item_display}\n"
-                f"🏷️ <b>Item ID:</b> #{auction_id}\n"
-                f"💰 <b>Your Winning Bid:</b> {formatted_bid} pd\n"
-                f"👤 <b>Seller:</b> {html.escape(seller_name or 'Unknown')}\n\n"
-                f"<i>Please contact the seller to complete the transaction.</i>"
-            )
+    seller_message = (
+        f"💰 <b>Your Item Sold!</b> 💰\n\n"
+        f"🛒 <b>Item Sold:</b> {item_display}\n"
+        f"🏷️ <b>Item ID:</b> #{row['auction_id']}\n"
+        f"💵 <b>Sale Price:</b> {formatted_bid} pd\n"
+        f"📊 <b>Base Price:</b> {formatted_base} pd\n"
+        f"👤 <b>Buyer:</b> {html.escape(row['winner_name'] or 'Unknown')}\n\n"
+        f"<i>Please contact the buyer to complete the transaction.</i>"
+    )
+    return buyer_message, seller_message
 
-            try:
-                context.bot.send_message(
-                    chat_id=bidder_id,
-                    text=buyer_message,
-                    parse_mode='HTML',
-                    disable_web_page_preview=False
-                )
-                notifications_sent += 1
-                debug_log(f"Sent win notification to buyer {bidder_id} for auction {auction_id}")
-            except telegram.error.Unauthorized:
-                debug_log(f"Buyer {bidder_id} blocked the bot - cannot send win notification")
-                notifications_failed += 1
-            except Exception as e:
-                debug_log(f"Failed to send win notification to buyer {bidder_id}: {str(e)}")
-                notifications_failed += 1
+def save_settlement_step(auction_id, step, state, error=None):
+    with db_connection() as conn:
+        conn.execute(f"UPDATE auction_settlements SET {step} = ?, last_error = COALESCE(?, last_error) WHERE auction_id = ?",
+                     (state, error, auction_id))
+        conn.commit()
 
-            # Send notification to SELLER
-            if seller_id:
-                seller_message = (
-                    f"💰 <b>Your Item Sold!</b> 💰\n\n"
-                    f"🛒 <b>Item Sold:</b> {item_display}\n"
-                    f"🏷️ <b>Item ID:</b> #{auction_id}\n"
-                    f"💵 <b>Sale Price:</b> {formatted_bid} pd\n"
-                    f"📊 <b>Base Price:</b> {formatted_base} pd\n"
-                    f"👤 <b>Buyer:</b> {html.escape(bidder_name or 'Unknown')}\n\n"
-                    f"<i>Please contact the buyer to complete the transaction.</i>"
-                )
+def notify_settlement_party(context, batch, user_id, message, role, auction_id, step):
+    """Queue the buyer or seller DM; its outcome is saved to step once it has been sent"""
+    if not user_id:
+        save_settlement_step(auction_id, step, STEP_SKIPPED)
+        return
+    if not is_reachable(user_id):
+        debug_log(f"{role.capitalize()} {user_id} is unreachable - skipping notification for auction {auction_id}")
+        save_settlement_step(auction_id, step, STEP_SKIPPED, "unreachable")
+        return
 
-                try:
-                    context.bot.send_message(
-                        chat_id=seller_id,
-                        text=seller_message,
-                        parse_mode='HTML',
-                        disable_web_page_preview=False
-                    )
-                    seller_notifications_sent += 1
-                    debug_log(f"Sent sale notification to seller {seller_id} for auction {auction_id}")
-                except telegram.error.Unauthorized:
-                    debug_log(f"Seller {seller_id} blocked the bot - cannot send sale notification")
-                    seller_notifications_failed += 1
-                except Exception as e:
-                    debug_log(f"Failed to send sale notification to seller {seller_id}: {str(e)}")
-                    seller_notifications_failed += 1
+    def sent(result, error):
+        if error is None:
+            debug_log(f"Sent {role} notification", logging.DEBUG, user_id=user_id, auction_id=auction_id)
+            save_settlement_step(auction_id, step, STEP_DONE)
+            return
+        debug_log(f"Failed to send {role} notification to {user_id} for auction {auction_id}: {str(error)}")
+        save_settlement_step(auction_id, step, STEP_PENDING if is_transient_telegram_error(error) else STEP_SKIPPED,
+                             str(error))
 
-            time.sleep(0.2)  # Small delay to avoid rate limits
+    batch.send(sent, lambda: context.bot.send_message(
+        chat_id=user_id,
+        text=message,
+        parse_mode='HTML',
+        disable_web_page_preview=False
+    ))
 
-        debug_log(f"Win notifications: {notifications_sent} buyers notified, {notifications_failed} failed")
-        debug_log(f"Sale notifications: {seller_notifications_sent} sellers notified, {seller_notifications_failed} failed")
-        
-        return notifications_sent, notifications_failed, seller_notifications_sent, seller_notifications_failed
+def credit_settlement_leaderboard(row):
+    """Credit the win and sale exactly once, guarded by the leaderboard_updated step"""
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('''UPDATE auction_settlements SET leaderboard_updated = ?
+                     WHERE auction_id = ? AND leaderboard_updated = ?''',
+                  (STEP_DONE if row['winner_id'] else STEP_SKIPPED, row['auction_id'], STEP_PENDING))
+        if c.rowcount and row['winner_id']:
+            bump_leaderboard(conn, row['winner_id'], row['winner_name'] or f"User_{row['winner_id']}", 'total_wins')
+            if row['seller_id']:
+                bump_leaderboard(conn, row['seller_id'], row['seller_name'] or f"User_{row['seller_id']}", 'total_sales')
+        conn.commit()
+
+def remove_settlement_buttons(context, batch, row):
+    """Queue the edit that strips the bid buttons; its outcome is saved once it has been made"""
+    auction_id = row['auction_id']
+    if not row['channel_message_id']:
+        save_settlement_step(auction_id, 'buttons_removed', STEP_SKIPPED)
+        return
 
+    def removed(result, error):
+        if error is None or (isinstance(error, telegram.error.BadRequest) and "Message is not modified" in str(error)):
+            save_settlement_step(auction_id, 'buttons_removed', STEP_DONE)
+            return
+        if isinstance(error, telegram.error.BadRequest):
+            if "message to edit not found" in str(error).lower():
+                debug_log(f"Message {row['channel_message_id']} not found for auction {auction_id}")
+            else:
+                debug_log(f"Couldn't remove buttons from auction {auction_id}: {str(error)}")
+            state = STEP_SKIPPED
+        else:
+            debug_log(f"Error removing buttons from auction {auction_id}: {str(error)}")
+            state = STEP_PENDING if is_transient_telegram_error(error) else STEP_SKIPPED
+        save_settlement_step(auction_id, 'buttons_removed', state, str(error))
+
+    # A caption edit queued before the auction ended still carries the bid buttons
+    drop_post_update(CHANNEL_ID, row['channel_message_id'])
+    batch.send(removed, lambda: context.bot.edit_message_reply_markup(
+        chat_id=CHANNEL_ID,
+        message_id=row['channel_message_id'],
+        reply_markup=None
+    ))
+
+def settle_auction(context, batch, row):
+    """Queue the steps of one auction that haven't completed yet"""
+    auction_id = row['auction_id']
+    try:
+        buyer_message, seller_message = build_settlement_messages(row)
+
+        if row['notified_buyer'] == STEP_PENDING:
+            notify_settlement_party(context, batch, row['winner_id'], buyer_message, 'buyer', auction_id,
+                                    'notified_buyer')
+
+        if row['notified_seller'] == STEP_PENDING:
+            seller_id = row['seller_id'] if row['winner_id'] else None
+            notify_settlement_party(context, batch, seller_id, seller_message, 'seller', auction_id,
+                                    'notified_seller')
+
+        if row['leaderboard_updated'] == STEP_PENDING:
+            credit_settlement_leaderboard(row)
+
+        if row['buttons_removed'] == STEP_PENDING:
+            remove_settlement_buttons(context, batch, row)
     except Exception as e:
-        debug_log(f"Error in send_win_notifications: {str(e)}")
-        return 0, 0, 0, 0
+        debug_log(f"Error settling auction {auction_id}: {str(e)}")
 
-@admin_only
-def end_auction(update: Update, context: CallbackContext):
-    try:
-        with db_connection() as conn:
-            conn.execute("UPDATE system_status SET auctions_open=0 WHERE id=1")
-            conn.commit()
+def mark_auctions_settled(job_id):
+    """Stamp settled_at on every auction of the job whose steps have all finished"""
+    with db_connection() as conn:
+        conn.execute('''UPDATE auction_settlements SET settled_at = CURRENT_TIMESTAMP
+                        WHERE job_id = ? AND settled_at IS NULL
+                        AND notified_buyer != 0 AND notified_seller != 0
+                        AND leaderboard_updated != 0 AND buttons_removed != 0''', (job_id,))
+        conn.commit()
 
-        update.message.reply_text("📤 Sending win and sale notifications...")
-        buyer_notifications_sent, buyer_notifications_failed, seller_notifications_sent, seller_notifications_failed = send_win_notifications(context)
+def get_settlement_summary(job_id):
+    with db_connection() as conn:
+        return conn.execute('''SELECT
+                COUNT(*) AS total,
+                COUNT(settled_at) AS settled,
+                SUM(winner_id IS NOT NULL AND notified_buyer = 1) AS buyers_sent,
+                SUM(winner_id IS NOT NULL AND notified_buyer = 2) AS buyers_failed,
+                SUM(winner_id IS NOT NULL AND seller_id IS NOT NULL AND notified_seller = 1) AS sellers_sent,
+                SUM(winner_id IS NOT NULL AND seller_id IS NOT NULL AND notified_seller = 2) AS sellers_failed,
+                SUM(winner_id IS NOT NULL AND leaderboard_updated = 1) AS buyers_credited,
+                SUM(winner_id IS NOT NULL AND seller_id IS NOT NULL AND leaderboard_updated = 1) AS sellers_credited,
+                SUM(buttons_removed = 1) AS buttons_removed
+            FROM auction_settlements WHERE job_id = ?''', (job_id,)).fetchone()
+
+def update_settlement_status(context, job, text):
+    if not job['status_chat_id'] or not job['status_message_id']:
+        return
+    try:
+        context.bot.edit_message_text(
+            chat_id=job['status_chat_id'],
+            message_id=job['status_message_id'],
+            text=text,
+            parse_mode='HTML'
+        )
+    except telegram.error.BadRequest as e:
+        if "Message is not modified" not in str(e):
+            debug_log(f"Couldn't update settlement status: {str(e)}")
+    except Exception as e:
+        debug_log(f"Couldn't update settlement status: {str(e)}")
 
-        # MARK AUCTIONS AS ENDED
+def run_settlement_job(context, job_id):
+    try:
         with db_connection() as conn:
-            # Update all active auctions to ended status
-            conn.execute(
-                "UPDATE auctions SET auction_status = 'ended', is_active = 0 WHERE auction_status = 'active'"
-            )
-            ended_count = conn.cursor().rowcount
-            conn.commit()
-
-        updated_buyers = 0
-        updated_sellers = 0
+            job = conn.execute("SELECT * FROM settlement_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if not job or job['status'] != 'running':
+            return
 
-        # Get ended auctions to update leaderboards
-        with db_connection() as conn:
-            ended_auctions = conn.execute(
-                "SELECT * FROM auctions WHERE auction_status = 'ended'"
-            ).fetchall()
+        refresh_channel_info(context.bot)
+        last_progress = 0
 
-        for auction in ended_auctions:
+        for attempt in range(SETTLEMENT_MAX_PASSES):
             with db_connection() as conn:
-                winner = conn.execute(
-                    "SELECT bidder_id, bidder_name FROM bids WHERE auction_id = ? AND is_active = 1 ORDER BY amount DESC LIMIT 1",
-                    (auction["auction_id"],)
-                ).fetchone()
-
-            if winner and winner["bidder_id"]:
-                winner_id = winner["bidder_id"]
-                winner_username = winner["bidder_name"] or f"User_{winner_id}"
+                rows = conn.execute('''SELECT s.*, a.item_text, a.channel_message_id, a.base_price
+                                       FROM auction_settlements s
+                                       JOIN auctions a ON a.auction_id = s.auction_id
+                                       WHERE s.job_id = ? AND s.settled_at IS NULL''', (job_id,)).fetchall()
+            if not rows:
+                break
+            if attempt:
+                # Whatever is left failed with a transient error; give Telegram a moment
+                time.sleep(5 * attempt)
+
+            with outbound_priority(PRIORITY_LOW):
+                for start in range(0, len(rows), SETTLEMENT_BATCH_SIZE):
+                    # The sends go out through the outbound queue while this thread waits once per batch
+                    batch = OutboundBatch()
+                    for row in rows[start:start + SETTLEMENT_BATCH_SIZE]:
+                        settle_auction(context, batch, row)
+                    batch.wait()
+                    mark_auctions_settled(job_id)
+
+                    if time.monotonic() - last_progress >= SETTLEMENT_PROGRESS_SECONDS:
+                        last_progress = time.monotonic()
+                        summary = get_settlement_summary(job_id)
+                        update_settlement_status(context, job, (
+                            "📤 <b>Settling auctions...</b>\n\n"
+                            f"🏁 <b>Settled:</b> {summary['settled']} of {summary['total']}\n"
+                            f"📨 <b>Buyers notified:</b> {summary['buyers_sent'] or 0}\n"
+                            f"📨 <b>Sellers notified:</b> {summary['sellers_sent'] or 0}"
+                        ))
+
+        summary = get_settlement_summary(job_id)
+        unsettled = summary['total'] - summary['settled']
+        if not unsettled:
+            with db_connection() as conn:
+                conn.execute('''UPDATE settlement_jobs SET status = 'completed', finished_at = CURRENT_TIMESTAMP
+                                WHERE job_id = ?''', (job_id,))
+                conn.commit()
 
-                seller_id = auction["seller_id"]
-                seller_username = auction["seller_name"] or f"User_{seller_id}" if seller_id else "Unknown"
+        response = (
+            "✅ Auction bidding is now CLOSED\n\n"
+            f"📨 <b>Buyer Notifications:</b> {summary['buyers_sent'] or 0} sent, {summary['buyers_failed'] or 0} failed\n"
+            f"📨 <b>Seller Notifications:</b> {summary['sellers_sent'] or 0} sent, {summary['sellers_failed'] or 0} failed\n"
+            f"👥 <b>Leaderboard:</b> {summary['buyers_credited'] or 0} buyers, {summary['sellers_credited'] or 0} sellers updated\n"
+            f"🔒 <b>Buttons removed from:</b> {summary['buttons_removed'] or 0} auctions\n"
+            f"🏁 <b>Auctions ended:</b> {job['total']}"
+        )
+        if unsettled:
+            response += f"\n\n⚠️ {unsettled} auctions are not fully settled yet; they will be retried on the next restart."
+        update_settlement_status(context, job, response)
+        debug_log(f"Settlement #{job_id} finished with {unsettled} auctions unsettled", logging.INFO)
 
-                try:
-                    increment_win(winner_id, winner_username)
-                    updated_buyers += 1
-                except Exception as e:
-                    debug_log(f"Failed to update buyer leaderboard for user {winner_id}: {str(e)}")
+    except Exception as e:
+        debug_log(f"Settlement #{job_id} error: {str(e)}", logging.WARNING)
+    finally:
+        with settlement_threads_lock:
+            settlement_threads.pop(job_id, None)
+
+def start_settlement_job(context, job_id):
+    with settlement_threads_lock:
+        if job_id in settlement_threads:
+            return
+        thread = threading.Thread(target=run_settlement_job, args=(context, job_id),
+                                  name=f"settlement-{job_id}", daemon=True)
+        settlement_threads[job_id] = thread
+    thread.start()
 
-                if seller_id:
-                    try:
-                        increment_sale(seller_id, seller_username)
-                        updated_sellers += 1
-                    except Exception as e:
-                        debug_log(f"Failed to update seller leaderboard for user {seller_id}: {str(e)}")
+def resume_settlement_jobs(dispatcher):
+    """Restart settlements that were still running when the bot stopped"""
+    try:
+        with db_connection() as conn:
+            job_ids = [row[0] for row in conn.execute(
+                "SELECT job_id FROM settlement_jobs WHERE status = 'running'")]
+        for job_id in job_ids:
+            debug_log(f"Resuming settlement #{job_id}", logging.INFO)
+            start_settlement_job(CallbackContext(dispatcher), job_id)
+    except Exception as e:
+        debug_log(f"Error resuming settlements: {str(e)}")
 
-        removed_buttons_count = remove_bid_buttons_from_all_auctions(context)
+@admin_only
+def end_auction(update: Update, context: CallbackContext):
+    try:
+        status_message = update.message.reply_text("📤 Sending win and sale notifications...")
 
-        response = (
-            "✅ Auction bidding is now CLOSED\n\n"
-            f"📨 <b>Buyer Notifications:</b> {buyer_notifications_sent} sent, {buyer_notifications_failed} failed\n"
-            f"📨 <b>Seller Notifications:</b> {seller_notifications_sent} sent, {seller_notifications_failed} failed\n"
-            f"👥 <b>Leaderboard:</b> {updated_buyers} buyers, {updated_sellers} sellers updated\n"
-            f"🔒 <b>Buttons removed from:</b> {removed_buttons_count} auctions\n"
-            f"🏁 <b>Auctions ended:</b> {ended_count}"
-        )
+        # Close bidding, snapshot the winners and end the auctions in one
+        # transaction; the settlement job does the rest in the background.
+        # Auctions settled by an earlier job keep their row (INSERT OR IGNORE)
+        # so they are never notified or credited twice.
+        with db_connection() as conn:
+            c = conn.cursor()
+            c.execute("UPDATE system_status SET auctions_open=0 WHERE id=1")
+            c.execute('''INSERT INTO settlement_jobs (admin_id, status_chat_id, status_message_id)
+                         VALUES (?, ?, ?)''',
+                      (update.effective_user.id, status_message.chat_id, status_message.message_id))
+            job_id = c.lastrowid
+            c.execute('''INSERT OR IGNORE INTO auction_settlements
+                         (auction_id, job_id, winner_id, winner_name, seller_id, seller_name, amount)
+                         SELECT a.auction_id, ?, b.bidder_id, b.bidder_name, a.seller_id, a.seller_name, b.amount
+                         FROM auctions a
+                         LEFT JOIN bids b ON b.bid_id = a.winning_bid_id
+                         WHERE a.auction_status = 'active' ''', (job_id,))
+            c.execute(
+                "UPDATE auctions SET auction_status = 'ended', is_active = 0 WHERE auction_status = 'active'"
+            )
+            ended_count = c.rowcount
+            c.execute("UPDATE settlement_jobs SET total = ? WHERE job_id = ?", (ended_count, job_id))
+            conn.commit()
 
-        update.message.reply_text(response, parse_mode='HTML')
+        start_settlement_job(context, job_id)
 
     except Exception as e:
         debug_log(f"Error in end_auction: {str(e)}")
@@ -1918,14 +3504,8 @@ def send_individual_auction_completion(context, auction_id):
                                 a.seller_id, a.seller_name, a.base_price,
                                 b.bidder_id, b.bidder_name, b.amount
                          FROM auctions a
-                         JOIN bids b ON a.auction_id = b.auction_id
-                         WHERE a.auction_id = ?
-                         AND b.amount = (
-                             SELECT MAX(amount) 
-                             FROM bids 
-                             WHERE auction_id = a.auction_id AND is_active = 1
-                         )
-                         AND b.is_active = 1''', (auction_id,))
+                         JOIN bids b ON b.bid_id = a.winning_bid_id
+                         WHERE a.auction_id = ?''', (auction_id,))
             
             auction_data = c.fetchone()
             
@@ -1937,16 +3517,8 @@ def send_individual_auction_completion(context, auction_id):
         
         item_name = extract_item_name(item_text)
         
-        try:
-            channel_entity = context.bot.get_chat(CHANNEL_ID)
-            channel_username = channel_entity.username
-            if not channel_username:
-                channel_username = f"c/{str(CHANNEL_ID).replace('-100', '')}"
-        except:
-            channel_username = None
-
-        if channel_username and channel_msg_id:
-            message_link = f"https://t.me/{channel_username}/{channel_msg_id}"
+        message_link = channel_post_link(channel_msg_id, context.bot)
+        if message_link:
             item_display = f'<a href="{message_link}">{html.escape(item_name)}</a>'
         else:
             item_display = html.escape(item_name)
@@ -2053,40 +3625,6 @@ def notify_auction_completion(update: Update, context: CallbackContext):
         debug_log(f"Error in notify_auction_completion: {str(e)}")
         update.message.reply_text("❌ Error sending notifications. Check logs.")
 
-def remove_bid_buttons_from_all_auctions(context):
-    try:
-        with db_connection() as conn:
-            active_auctions = conn.execute(
-                "SELECT auction_id, channel_message_id FROM auctions WHERE auction_status = 'active'"
-            ).fetchall()
-
-        removed_count = 0
-        
-        for auction in active_auctions:
-            try:
-                if auction['channel_message_id']:
-                    context.bot.edit_message_reply_markup(
-                        chat_id=CHANNEL_ID,
-                        message_id=auction['channel_message_id'],
-                        reply_markup=None
-                    )
-                    removed_count += 1
-            except telegram.error.BadRequest as e:
-                if "Message is not modified" in str(e):
-                    removed_count += 1
-                elif "message to edit not found" in str(e):
-                    debug_log(f"Message {auction['channel_message_id']} not found for auction {auction['auction_id']}")
-                else:
-                    debug_log(f"Couldn't remove buttons from auction {auction['auction_id']}: {str(e)}")
-            except Exception as e:
-                debug_log(f"Error removing buttons from auction {auction['auction_id']}: {str(e)}")
-
-        return removed_count
-        
-    except Exception as e:
-        debug_log(f"Error in remove_bid_buttons_from_all_auctions: {str(e)}")
-        return 0
-
 def ensure_all_auctions_active():
     try:
         with db_connection() as conn:
@@ -2108,25 +3646,27 @@ def verify_user(update: Update, context: CallbackContext):
     admin_id = update.effective_user.id
 
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
 
-            c.execute('SELECT 1 FROM verified_users WHERE user_id=?', (target_user.id,))
-            if c.fetchone():
-                update.message.reply_text("⚠️ User is already verified")
-                return
-
             # Remove from verification requests if exists
             c.execute('DELETE FROM verification_requests WHERE user_id=?', (target_user.id,))
-            
-            c.execute('''INSERT INTO verified_users
+
+            # The insert is the check: an admin pressing Verify in another lane
+            # may have verified the user since this command arrived
+            c.execute('''INSERT OR IGNORE INTO verified_users
                         (user_id, username, verified_by)
                         VALUES (?, ?, ?)''',
                     (target_user.id,
                      target_user.username or target_user.first_name,
                      admin_id))
+            if c.rowcount != 1:
+                conn.commit()
+                update.message.reply_text("⚠️ User is already verified")
+                return
 
             conn.commit()
+            set_cached_verified(target_user.id, True)
 
             # Update all admin messages if this was a pending request
             update_all_admin_verification_messages(context, target_user.id, 'verified', admin_id)
@@ -2149,7 +3689,7 @@ def verify_user(update: Update, context: CallbackContext):
             update.message.reply_text(f"✅ Verified @{target_user.username or target_user.id}")
 
     except Exception as e:
-        debug_log(f"Verification error: {str(e)}")
+        debug_log(f"Verification error: {str(e)}", logging.WARNING)
         update.message.reply_text("❌ Failed to verify user")
 
 def request_verification(update: Update, context: CallbackContext):
@@ -2157,7 +3697,7 @@ def request_verification(update: Update, context: CallbackContext):
     user = update.effective_user
 
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
 
             c.execute('SELECT 1 FROM verified_users WHERE user_id=?', (user.id,))
@@ -2218,7 +3758,7 @@ def request_verification(update: Update, context: CallbackContext):
         )
 
     except Exception as e:
-        debug_log(f"Verification request error: {str(e)}")
+        debug_log(f"Verification request error: {str(e)}", logging.WARNING)
         update.message.reply_text("❌ Failed to process verification request")
 
 def handle_admin_verification(update: Update, context: CallbackContext):
@@ -2240,35 +3780,45 @@ def handle_admin_verification(update: Update, context: CallbackContext):
     
     # Check if user is still pending verification
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
-            
-            # Check if already verified
-            c.execute('SELECT 1 FROM verified_users WHERE user_id=?', (user_id,))
-            if c.fetchone():
-                query.edit_message_text("⚠️ User is already verified!")
-                return
-            
-            # Check if request still exists
+
+            # Claim the request under SQLite's write lock. Admins run in separate
+            # lanes, so two of them can press these buttons at once; only the one
+            # whose DELETE removes the request goes on to DM the user and edit
+            # the other admins' messages.
+            c.execute("BEGIN IMMEDIATE")
             c.execute('SELECT username FROM verification_requests WHERE user_id=?', (user_id,))
             request_data = c.fetchone()
-            
-            if not request_data:
-                query.edit_message_text("❌ Verification request not found or already processed!")
+            if request_data:
+                c.execute('DELETE FROM verification_requests WHERE user_id=?', (user_id,))
+
+            if not request_data or c.rowcount != 1:
+                already_verified = c.execute('SELECT 1 FROM verified_users WHERE user_id=?',
+                                             (user_id,)).fetchone()
+                conn.rollback()
+                if already_verified:
+                    query.edit_message_text("⚠️ User is already verified!")
+                else:
+                    query.edit_message_text("❌ Verification request not found or already processed!")
                 return
             
             username = request_data['username']
             
             if action == 'verify':
-                # Verify the user
-                c.execute('''INSERT INTO verified_users
+                # Verify the user; /verify may have got there first
+                c.execute('''INSERT OR IGNORE INTO verified_users
                             (user_id, username, verified_by)
                             VALUES (?, ?, ?)''',
                          (user_id, username, admin_id))
-                
-                # Remove from verification requests
-                c.execute('DELETE FROM verification_requests WHERE user_id=?', (user_id,))
+                newly_verified = c.rowcount == 1
                 conn.commit()
+                set_cached_verified(user_id, True)
+
+                if not newly_verified:
+                    update_all_admin_verification_messages(context, user_id, 'verified', admin_id)
+                    query.edit_message_text("⚠️ User is already verified!")
+                    return
                 
                 # Update all admin messages
                 update_all_admin_verification_messages(context, user_id, 'verified', admin_id)
@@ -2290,8 +3840,7 @@ def handle_admin_verification(update: Update, context: CallbackContext):
                 query.edit_message_text(f"✅ Verified @{username}")
                 
             else:  # reject
-                # Remove from verification requests
-                c.execute('DELETE FROM verification_requests WHERE user_id=?', (user_id,))
+                # The claim above already removed the request
                 conn.commit()
                 
                 # Update all admin messages
@@ -2345,9 +3894,6 @@ def notify_all_admins_verification_action(context, user_id, username, action, ad
                     notifications_sent += 1
                     debug_log(f"Sent verification {action} notification to admin {admin_id}")
                 
-                # Small delay to avoid rate limits
-                time.sleep(0.1)
-                
             except Exception as e:
                 debug_log(f"Failed to send verification {action} notification to admin {admin_id}: {str(e)}")
                 notifications_failed += 1
@@ -2370,7 +3916,7 @@ def handle_cancel_rejection(update: Update, context: CallbackContext):
     
     # Restore original message
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
             c.execute('SELECT username FROM verification_requests WHERE user_id=?', (user_id,))
             request_data = c.fetchone()
@@ -2461,10 +4007,17 @@ def handle_submission_rejection_reason(update: Update, context: CallbackContext)
             delete_rejection_context(submission_id)
             return
         
-        # Update database - mark submission as rejected
+        # Update database - mark submission as rejected, unless another admin
+        # approved it in the meantime
         with db_connection() as conn:
-            conn.execute("UPDATE submissions SET status='rejected' WHERE submission_id=?", (submission_id,))
+            claimed = conn.execute("UPDATE submissions SET status='rejected' WHERE submission_id=? AND status='pending'",
+                                   (submission_id,)).rowcount
             conn.commit()
+
+        if claimed != 1:
+            update.message.reply_text("❌ Submission not found or already processed!")
+            delete_rejection_context(submission_id)
+            return
         
         # Update user stats
         update_submission_stats(submission['user_id'], 'rejected')
@@ -2542,7 +4095,7 @@ def handle_submission_rejection_reason(update: Update, context: CallbackContext)
     except Exception as e:
         debug_log(f"❌ Rejection error: {e}")
         import traceback
-        debug_log(f"Traceback: {traceback.format_exc()}")
+        debug_log(f"Traceback: {traceback.format_exc()}", logging.WARNING)
         
         # Send error message
         try:
@@ -2653,16 +4206,16 @@ def update_all_admin_verification_messages(context, user_id, status, action_admi
     """Update verification request messages for all admins"""
     try:
         request_key = f'verification_request_{user_id}'
-        
-        if request_key not in context.bot_data:
+
+        # pop() so exactly one caller takes the entry even across lanes
+        request_data = context.bot_data.pop(request_key, None)
+        if request_data is None:
             return
-        
-        request_data = context.bot_data[request_key]
+
         admin_messages = request_data['admin_messages']
         user_data = request_data['request_data']
         
-        action_admin = context.bot.get_chat(action_admin_id)
-        admin_name = f"@{action_admin.username}" if action_admin.username else action_admin.first_name
+        admin_name = user_display_name(get_user_info(context.bot, action_admin_id))
         
         status_text = "✅ VERIFIED" if status == 'verified' else "❌ REJECTED"
         
@@ -2684,9 +4237,6 @@ def update_all_admin_verification_messages(context, user_id, status, action_admi
             except Exception as e:
                 debug_log(f"Failed to update message for admin {admin_id}: {str(e)}")
         
-        # Clean up
-        del context.bot_data[request_key]
-        
     except Exception as e:
         debug_log(f"Error updating admin messages: {str(e)}")
 
@@ -2695,7 +4245,7 @@ def update_all_admin_verification_messages(context, user_id, status, action_admi
 @admin_only
 def list_verified_users(update: Update, context: CallbackContext):
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             total_users = conn.execute('SELECT COUNT(*) FROM verified_users').fetchone()[0]
             
             if total_users == 0:
@@ -2718,7 +4268,7 @@ def list_verified_users(update: Update, context: CallbackContext):
 
 def display_verified_users_page(update, context, page):
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             offset = (page - 1) * 20
             
             users = conn.execute('''SELECT user_id, username, verified_at 
@@ -2813,7 +4363,7 @@ def handle_verified_pagination(update: Update, context: CallbackContext):
         
         if 'verified_users_pagination' not in context.user_data:
             try:
-                with db_connection('verified_users.db') as conn:
+                with db_connection() as conn:
                     total_users = conn.execute('SELECT COUNT(*) FROM verified_users').fetchone()[0]
                     total_pages = (total_users + 19) // 20
                     context.user_data['verified_users_pagination'] = {
@@ -2859,7 +4409,7 @@ def remove_verification(update: Update, context: CallbackContext):
         return
 
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
             c.execute('SELECT username FROM verified_users WHERE user_id=?', (user_id,))
             user_data = c.fetchone()
@@ -2874,6 +4424,7 @@ def remove_verification(update: Update, context: CallbackContext):
 
             conn.execute("DELETE FROM verification_requests WHERE user_id=?", (user_id,))
             conn.commit()
+            set_cached_verified(user_id, False)
 
         update.message.reply_text(f"✅ Verification removed for user: {db_username} (ID: {user_id})")
 
@@ -2895,21 +4446,300 @@ def remove_verification(update: Update, context: CallbackContext):
         debug_log(f"Error removing verification: {str(e)}")
         update.message.reply_text("❌ Failed to remove verification. Check logs for details.")
 
+# Process-wide authorization cache. Loaded once from the database and kept
+# current by every function that writes verified_users, bans or bot_admins,
+# so authorizing an update is a set lookup instead of a query.
+AUTH_CACHE = {'verified': set(), 'banned': set(), 'loaded': False}
+auth_cache_lock = threading.Lock()
+
+# user_id -> username waiting to be written to verified_users.last_active
+pending_last_active = {}
+pending_last_active_lock = threading.Lock()
+LAST_ACTIVE_FLUSH_SECONDS = 5
+
+def load_auth_cache():
+    """(Re)load the verified, banned and admin ids from the database"""
+    with db_connection() as conn:
+        verified = {row['user_id'] for row in conn.execute('SELECT user_id FROM verified_users')}
+        banned = {row['user_id'] for row in conn.execute('SELECT user_id FROM user_profiles WHERE is_banned = 1')}
+
+    admins = load_admins()
+    with auth_cache_lock:
+        AUTH_CACHE['verified'] = verified
+        AUTH_CACHE['banned'] = banned
+        AUTH_CACHE['loaded'] = True
+        # Keep the same list object - other code holds references to it
+        ADMINS[:] = admins
+    debug_log(f"Auth cache loaded: {len(verified)} verified, {len(banned)} banned, {len(admins)} admins", logging.INFO)
+
+def ensure_auth_cache():
+    if not AUTH_CACHE['loaded']:
+        load_auth_cache()
+
+def set_cached_verified(user_id, verified):
+    with auth_cache_lock:
+        if verified:
+            AUTH_CACHE['verified'].add(user_id)
+        else:
+            AUTH_CACHE['verified'].discard(user_id)
+
+def set_cached_banned(user_id, banned):
+    with auth_cache_lock:
+        if banned:
+            AUTH_CACHE['banned'].add(user_id)
+        else:
+            AUTH_CACHE['banned'].discard(user_id)
+
 def check_verification_status(user_id):
     try:
-        with db_connection('verified_users.db') as conn:
-            return conn.execute('''SELECT 1 FROM verified_users
-                                 WHERE user_id=?''', (user_id,)).fetchone() is not None
+        ensure_auth_cache()
+        return user_id in AUTH_CACHE['verified']
     except Exception as e:
         debug_log(f"Verification check error: {str(e)}")
         return False
 
+def get_user_access(user_id):
+    """Answer "is this user an admin / verified / banned" from the auth cache"""
+    ensure_auth_cache()
+    return {
+        'admin': user_id in ADMINS,
+        'verified': user_id in AUTH_CACHE['verified'],
+        'banned': user_id in AUTH_CACHE['banned']
+    }
+
+# Display info and profile photo of Telegram users we show to others. Fed from
+# effective_user on every incoming update (remember_update_user runs ahead of the
+# handlers), so getChat / getUserProfilePhotos only go out on a miss or once an
+# entry is older than USER_INFO_TTL_SECONDS.
+USER_INFO_CACHE_SIZE = int(os.getenv("USER_INFO_CACHE_SIZE", "20000"))
+USER_INFO_TTL_SECONDS = float(os.getenv("USER_INFO_TTL_SECONDS", "21600"))
+
+UserInfo = namedtuple('UserInfo', ['first_name', 'last_name', 'username'])
+user_info_cache = OrderedDict()  # user_id -> (expires_at, UserInfo)
+user_photo_cache = OrderedDict()  # user_id -> (expires_at, file_id or None when the user has no photo)
+user_info_lock = threading.Lock()
+
+def lru_get(cache, key):
+    with user_info_lock:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return entry
+
+def lru_put(cache, key, value):
+    with user_info_lock:
+        cache[key] = (time.monotonic() + USER_INFO_TTL_SECONDS, value)
+        cache.move_to_end(key)
+        while len(cache) > USER_INFO_CACHE_SIZE:
+            cache.popitem(last=False)
+
+def remember_user(user):
+    """Cache display info from a telegram User or private Chat"""
+    info = UserInfo(user.first_name, user.last_name, user.username)
+    entry = lru_get(user_info_cache, user.id)
+    if entry is None or entry[1] != info:
+        lru_put(user_info_cache, user.id, info)
+    return info
+
+def remember_update_user(update: Update, context: CallbackContext):
+    if update.effective_user:
+        remember_user(update.effective_user)
+
+def get_user_info(bot, user_id):
+    """UserInfo for user_id, asking getChat only on a cache miss. Raises what get_chat raises."""
+    entry = lru_get(user_info_cache, user_id)
+    if entry is not None:
+        return entry[1]
+    return remember_user(bot.get_chat(user_id))
+
+def user_display_name(info):
+    return f"@{info.username}" if info.username else info.first_name
+
+def get_profile_photo_id(bot, user_id):
+    """file_id of the user's current profile photo, or None if they have none"""
+    entry = lru_get(user_photo_cache, user_id)
+    if entry is not None:
+        return entry[1]
+    photos = bot.get_user_profile_photos(user_id, limit=1)
+    file_id = photos.photos[0][-1].file_id if photos and photos.total_count > 0 else None
+    lru_put(user_photo_cache, user_id, file_id)
+    return file_id
+
+def touch_last_active(user_id, username):
+    """Buffer a last_active bump; flush_last_active writes them in one batch"""
+    with pending_last_active_lock:
+        pending_last_active[user_id] = username
+
+def flush_last_active(context=None):
+    with pending_last_active_lock:
+        if not pending_last_active:
+            return 0
+        batch = list(pending_last_active.items())
+        pending_last_active.clear()
+
+    try:
+        with db_connection() as conn:
+            conn.executemany('''UPDATE verified_users SET
+                                last_active=CURRENT_TIMESTAMP,
+                                username=?
+                                WHERE user_id=?''',
+                             [(username, user_id) for user_id, username in batch])
+            conn.commit()
+        return len(batch)
+    except Exception as e:
+        debug_log(f"Error flushing last_active updates: {str(e)}")
+        # Put them back (unless a newer value arrived) and retry on the next tick
+        with pending_last_active_lock:
+            for user_id, username in batch:
+                pending_last_active.setdefault(user_id, username)
+        return 0
+
+# Recipient health. Chats that can never receive a message (the user blocked
+# the bot, deleted their account or never pressed Start) are recorded by
+# QueuedBot when a send fails and skipped by broadcasts and notifications
+# until the user sends /start again.
+UNREACHABLE_REASONS = {
+    'blocked': "Blocked the bot",
+    'deactivated': "Deleted account",
+    'not_started': "Never started the bot",
+}
+unreachable_users = set()
+unreachable_users_lock = threading.Lock()
+
+def classify_delivery_error(e):
+    """Why a send can never succeed, or None if the error may be temporary"""
+    message = str(e).lower()
+    if isinstance(e, telegram.error.Unauthorized):
+        if "deactivated" in message:
+            return 'deactivated'
+        if "initiate conversation" in message:
+            return 'not_started'
+        return 'blocked'
+    if isinstance(e, telegram.error.BadRequest) and "chat not found" in message:
+        return 'not_started'
+    return None
+
+def load_unreachable_users():
+    with db_connection() as conn:
+        users = {row[0] for row in conn.execute(
+            'SELECT user_id FROM recipient_health WHERE unreachable = 1')}
+    with unreachable_users_lock:
+        unreachable_users.clear()
+        unreachable_users.update(users)
+    debug_log(f"Loaded {len(users)} unreachable recipients", logging.INFO)
+
+def is_reachable(user_id):
+    return user_id not in unreachable_users
+
+def record_delivery_failure(chat_id, e):
+    reason = classify_delivery_error(e)
+    if not reason or not isinstance(chat_id, int) or chat_id <= 0:
+        return
+    try:
+        with db_connection() as conn:
+            conn.execute('''INSERT INTO recipient_health
+                            (user_id, reason, failures, unreachable, first_failed_at, last_failed_at)
+                            VALUES (?, ?, 1, 1, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                            ON CONFLICT(user_id) DO UPDATE SET
+                            reason = excluded.reason,
+                            failures = failures + 1,
+                            unreachable = 1,
+                            first_failed_at = COALESCE(first_failed_at, CURRENT_TIMESTAMP),
+                            last_failed_at = CURRENT_TIMESTAMP''',
+                         (chat_id, reason))
+            conn.commit()
+        with unreachable_users_lock:
+            unreachable_users.add(chat_id)
+        sampled_log('marked_unreachable', f"Marked recipient unreachable ({reason})", user_id=chat_id)
+    except Exception as db_error:
+        debug_log(f"Error recording delivery failure for {chat_id}: {str(db_error)}")
+
+def mark_reachable(user_id):
+    """Called when the user talks to the bot again"""
+    if user_id not in unreachable_users:
+        return
+    try:
+        with db_connection() as conn:
+            conn.execute('''UPDATE recipient_health
+                            SET unreachable = 0, reachable_at = CURRENT_TIMESTAMP
+                            WHERE user_id = ?''', (user_id,))
+            conn.commit()
+        with unreachable_users_lock:
+            unreachable_users.discard(user_id)
+        debug_log(f"User {user_id} is reachable again")
+    except Exception as e:
+        debug_log(f"Error marking {user_id} reachable: {str(e)}")
+
+@admin_only
+def unreachable_report(update: Update, context: CallbackContext):
+    """/unreachable - how many users can't be messaged, by reason"""
+    try:
+        with db_connection() as conn:
+            rows = conn.execute('''SELECT reason, COUNT(*) FROM recipient_health
+                                   WHERE unreachable = 1 GROUP BY reason''').fetchall()
+            verified_unreachable = conn.execute('''SELECT COUNT(*) FROM recipient_health r
+                                                   JOIN verified_users v ON v.user_id = r.user_id
+                                                   WHERE r.unreachable = 1''').fetchone()[0]
+
+        total = sum(row[1] for row in rows)
+        lines = ["📵 <b>Unreachable Users</b>\n"]
+        for reason, count in rows:
+            lines.append(f"• {UNREACHABLE_REASONS.get(reason, reason)}: {count}")
+        lines.append(f"\n👥 <b>Total:</b> {total} ({verified_unreachable} verified)")
+        lines.append("<i>Users are removed from this list when they send /start.</i>")
+
+        update.message.reply_text("\n".join(lines), parse_mode='HTML')
+    except Exception as e:
+        debug_log(f"Error in unreachable_report: {str(e)}")
+        update.message.reply_text("❌ Error building report.")
+
 def verified_only(func):
+    @functools.wraps(func)
     def wrapper(update: Update, context: CallbackContext):
         user = update.effective_user
 
+        try:
+            access = get_user_access(user.id)
+        except Exception as e:
+            debug_log(f"Verification check failed: {str(e)}")
+            # Show error with verification button as fallback
+            keyboard = [
+                [InlineKeyboardButton("🔐 Request Verification", callback_data="request_verification")]
+            ]
+            
+            error_response = [
+                "⚠️ <b>Temporary Verification Error</b>",
+                "",
+                "<code>There was an error checking your verification status.</code>",
+                "You can still request verification:"
+            ]
+            
+            if update.message:
+                try:
+                    # Try to send GIF with error message
+                    gif_url = "https://i.ibb.co/vxZLvHLJ/New-Project-19.gif"
+                    update.message.reply_animation(
+                        animation=gif_url,
+                        caption="\n".join(error_response),
+                        parse_mode='HTML',
+                        reply_markup=InlineKeyboardMarkup(keyboard)
+                    )
+                except Exception as gif_error:
+                    debug_log(f"Error sending GIF, falling back to text: {str(gif_error)}")
+                    # Fallback to text if GIF fails
+                    update.message.reply_text(
+                        "\n".join(error_response),
+                        parse_mode='HTML',
+                        reply_markup=InlineKeyboardMarkup(keyboard)
+                    )
+            return ConversationHandler.END if hasattr(update, 'message') else None
+
         # First check if user is banned (except admins)
-        if user.id not in ADMINS and is_user_banned(user.id):
+        if not access['admin'] and access['banned']:
             ban_info = get_ban_info(user.id)
             ban_reason = ban_info.get('ban_reason', 'No reason provided') if ban_info else 'No reason provided'
             banned_at = ban_info.get('banned_at') if ban_info else 'Unknown'
@@ -2940,98 +4770,41 @@ def verified_only(func):
             return ConversationHandler.END if hasattr(update, 'message') else None
 
         # Allow admins to use commands without verification
-        if user.id in ADMINS:
+        if access['admin']:
             return func(update, context)
 
-        try:
-            with db_connection('verified_users.db') as conn:
-                c = conn.cursor()
-
-                c.execute('''SELECT user_id FROM verified_users
-                            WHERE user_id=?''',
-                         (user.id,))
-                is_verified = c.fetchone()
-
-                if not is_verified:
-                    # Show verification request with button and GIF
-                    keyboard = [
-                        [InlineKeyboardButton("🔐 Request Verification", callback_data="request_verification")]
-                    ]
-                    
-                    gif_url = "https://i.ibb.co/vxZLvHLJ/New-Project-19.gif"
-                    
-                    response = [
-                        "🔒 <b>Verification Required</b>",
-                        "",
-                        "<code>To use this bot, you need to be verified first.</code>",
-                        "Click the button below to request verification:"
-                    ]
-                    
-                    # Check if this is a callback query or regular message
-                    if update.callback_query:
-                        try:
-                            update.callback_query.answer()
-                            update.callback_query.edit_message_text(
-                                "\n".join(response),
-                                parse_mode='HTML',
-                                reply_markup=InlineKeyboardMarkup(keyboard)
-                            )
-                        except Exception as e:
-                            debug_log(f"Error editing callback message: {str(e)}")
-                    elif update.message:
-                        try:
-                            # Try to send GIF with caption
-                            update.message.reply_animation(
-                                animation=gif_url,
-                                caption="\n".join(response),
-                                parse_mode='HTML',
-                                reply_markup=InlineKeyboardMarkup(keyboard)
-                            )
-                        except Exception as gif_error:
-                            debug_log(f"Error sending GIF, falling back to text: {str(gif_error)}")
-                            # Fallback to text if GIF fails
-                            update.message.reply_text(
-                                "\n".join(response),
-                                parse_mode='HTML',
-                                reply_markup=InlineKeyboardMarkup(keyboard)
-                            )
-                    
-                    return ConversationHandler.END if hasattr(update, 'message') else None
-
-                try:
-                    c.execute('''UPDATE verified_users SET
-                                last_active=CURRENT_TIMESTAMP,
-                                username=?
-                                WHERE user_id=?''',
-                             (user.username or user.first_name, user.id))
-                    conn.commit()
-                except sqlite3.OperationalError as e:
-                    debug_log(f"Optional columns not available: {str(e)}")
-                    conn.rollback()
-
-                return func(update, context)
-
-        except Exception as e:
-            debug_log(f"Verification check failed: {str(e)}")
-            # Show error with verification button as fallback
+        if not access['verified']:
+            # Show verification request with button and GIF
             keyboard = [
                 [InlineKeyboardButton("🔐 Request Verification", callback_data="request_verification")]
             ]
             
-            error_response = [
-                "⚠️ <b>Temporary Verification Error</b>",
+            gif_url = "https://i.ibb.co/vxZLvHLJ/New-Project-19.gif"
+            
+            response = [
+                "🔒 <b>Verification Required</b>",
                 "",
-                "<code>There was an error checking your verification status.</code>",
-                "You can still request verification:"
+                "<code>To use this bot, you need to be verified first.</code>",
+                "Click the button below to request verification:"
             ]
             
-            if update.message:
+            # Check if this is a callback query or regular message
+            if update.callback_query:
                 try:
-                    # Try to send GIF with error message
-                    gif_url = "https://i.ibb.co/vxZLvHLJ/New-Project-19.gif"
+                    update.callback_query.answer()
+                    update.callback_query.edit_message_text(
+                        "\n".join(response),
+                        parse_mode='HTML',
+                        reply_markup=InlineKeyboardMarkup(keyboard)
+                    )
+                except Exception as e:
+                    debug_log(f"Error editing callback message: {str(e)}")
+            elif update.message:
+                try:
+                    # Try to send GIF with caption
                     update.message.reply_animation(
                         animation=gif_url,
-                        caption="\n".join(error_response),
+                        caption="\n".join(response),
                         parse_mode='HTML',
                         reply_markup=InlineKeyboardMarkup(keyboard)
                     )
@@ -3039,24 +4812,29 @@ def verified_only(func):
                     debug_log(f"Error sending GIF, falling back to text: {str(gif_error)}")
                     # Fallback to text if GIF fails
                     update.message.reply_text(
-                        "\n".join(error_response),
+                        "\n".join(response),
                         parse_mode='HTML',
                         reply_markup=InlineKeyboardMarkup(keyboard)
                     )
+            
             return ConversationHandler.END if hasattr(update, 'message') else None
+
+        touch_last_active(user.id, user.username or user.first_name)
+        return func(update, context)
     return wrapper
 def cleanup_verification_requests():
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             conn.execute('''DELETE FROM verification_requests
                            WHERE request_date < datetime('now', '-30 days')''')
             conn.commit()
             debug_log("Cleaned up old verification requests")
     except Exception as e:
-        debug_log(f"Verification cleanup failed: {str(e)}")
+        debug_log(f"Verification cleanup failed: {str(e)}", logging.WARNING)
 
 def check_system_status(status_type, category=None):
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(update: Update, context: CallbackContext):
             # First check if submissions are globally open
             with db_connection() as conn:
@@ -3127,7 +4905,7 @@ def create_category_toggle_command(category, enable=True):
             
             # Log the action
             admin_name = update.effective_user.username or update.effective_user.first_name
-            debug_log(f"Admin {admin_name} {status} {category} submissions")
+            debug_log(f"Admin {admin_name} {status} {category} submissions", logging.INFO)
         else:
             update.message.reply_text(f"❌ Failed to update {display_name} submission settings.")
     
@@ -3194,67 +4972,233 @@ def start_add(update: Update, context: CallbackContext):
     )
     return SELECT_CATEGORY
 
-@admin_only
-def broadcast_message(update: Update, context: CallbackContext):
-    if not update.message.reply_to_message:
-        update.message.reply_text("❌ Please reply to a message with /broad to broadcast it")
+# Broadcasts are persisted jobs: broadcast_recipients holds one row per
+# verified user, a background thread queues copies for a batch of pending
+# rows (the outbound queue sets the pace) and marks them sent or failed once
+# the batch is through, so a restart resumes where it stopped instead of
+# re-sending to everyone.
+BROADCAST_BATCH_SIZE = 200
+BROADCAST_PROGRESS_SECONDS = 5
+
+broadcast_threads = {}  # job_id -> runner thread
+broadcast_cancel_events = {}  # job_id -> threading.Event set by /broad_cancel
+broadcast_threads_lock = threading.Lock()
+
+def get_broadcast_counts(conn, job_id):
+    counts = Counter()
+    for row in conn.execute('''SELECT status, COUNT(*) FROM broadcast_recipients
+                               WHERE job_id = ? GROUP BY status''', (job_id,)):
+        counts[row[0]] = row[1]
+    return counts
+
+def update_broadcast_status(context, job, text):
+    if not job['status_chat_id'] or not job['status_message_id']:
         return
+    try:
+        context.bot.edit_message_text(
+            chat_id=job['status_chat_id'],
+            message_id=job['status_message_id'],
+            text=text
+        )
+    except telegram.error.BadRequest as e:
+        if "Message is not modified" not in str(e):
+            debug_log(f"Couldn't update broadcast status: {str(e)}")
+    except Exception as e:
+        debug_log(f"Couldn't update broadcast status: {str(e)}")
 
-    message_to_broadcast = update.message.reply_to_message
-    admin = update.effective_user
-    total_sent = 0
-    total_failed = 0
-
-    update.message.reply_text("📤 Starting broadcast...")
+def copy_broadcast_message(context, job, batch, user_id, results):
+    """Queue the broadcast copy for one user; (user_id, status, error) lands in results once it is sent"""
+    if not is_reachable(user_id):
+        results.append((user_id, 'skipped', 'unreachable'))
+        return
 
-    try:
-        with db_connection('verified_users.db') as conn:
-            users = conn.execute('SELECT user_id FROM verified_users').fetchall()
-        
-        total_users = len(users)
+    def copied(result, error):
+        if error is None:
+            results.append((user_id, 'sent', None))
+            return
+        if isinstance(error, telegram.error.BadRequest):
+            error_msg = str(error).lower()
+            if "chat not found" in error_msg:
+                debug_log(f"User {user_id} has not started the bot")
+            elif "bot was blocked" in error_msg:
+                debug_log(f"User {user_id} blocked the bot")
+            else:
+                debug_log(f"Failed to send broadcast to user {user_id}: {str(error)}")
+        else:
+            debug_log(f"Error sending to user {user_id}: {str(error)}")
+        results.append((user_id, 'failed', str(error)))
 
-        send_broadcast_start_log(context, admin, message_to_broadcast, total_users)
+    batch.send(copied, lambda: context.bot.copy_message(
+        chat_id=user_id,
+        from_chat_id=job['from_chat_id'],
+        message_id=job['message_id']
+    ))
 
-        for user in users:
-            user_id = user['user_id']
-            try:
-                context.bot.copy_message(
-                    chat_id=user_id,
-                    from_chat_id=message_to_broadcast.chat.id,
-                    message_id=message_to_broadcast.message_id
-                )
+def run_broadcast_job(context, job_id, admin=None):
+    cancelled = broadcast_cancel_events[job_id]
+    try:
+        with db_connection() as conn:
+            job = conn.execute("SELECT * FROM broadcast_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if not job or job['status'] != 'running':
+            return
 
-                total_sent += 1
+        last_user_id = 0
+        last_progress = 0
+        with outbound_priority(PRIORITY_LOW):
+            while not cancelled.is_set():
+                with db_connection() as conn:
+                    batch = [row[0] for row in conn.execute(
+                        '''SELECT user_id FROM broadcast_recipients
+                           WHERE job_id = ? AND status = 'pending' AND user_id > ?
+                           ORDER BY user_id LIMIT ?''',
+                        (job_id, last_user_id, BROADCAST_BATCH_SIZE))]
+                if not batch:
+                    break
+                last_user_id = batch[-1]
 
-                time.sleep(0.1)
+                # Queue the whole batch, then wait for the outbound queue to work through it
+                results = []
+                sends = OutboundBatch()
+                for user_id in batch:
+                    if cancelled.is_set():
+                        break
+                    copy_broadcast_message(context, job, sends, user_id, results)
+                sends.wait()
 
-            except telegram.error.BadRequest as e:
-                error_msg = str(e).lower()
-                if "chat not found" in error_msg:
-                    debug_log(f"User {user_id} has not started the bot")
-                elif "bot was blocked" in error_msg:
-                    debug_log(f"User {user_id} blocked the bot")
-                else:
-                    debug_log(f"Failed to send broadcast to user {user_id}: {str(e)}")
-                total_failed += 1
-            except Exception as e:
-                debug_log(f"Error sending to user {user_id}: {str(e)}")
-                total_failed += 1
+                with db_connection() as conn:
+                    conn.executemany(
+                        '''UPDATE broadcast_recipients SET status = ?, error = ?
+                           WHERE job_id = ? AND user_id = ?''',
+                        [(status, error, job_id, user_id) for user_id, status, error in results])
+                    conn.commit()
+                    counts = get_broadcast_counts(conn, job_id)
+
+                if time.monotonic() - last_progress >= BROADCAST_PROGRESS_SECONDS:
+                    last_progress = time.monotonic()
+                    update_broadcast_status(context, job, (
+                        f"📤 Broadcasting...\n\n"
+                        f"✅ Sent: {counts['sent']}\n"
+                        f"❌ Failed: {counts['failed']}\n"
+                        f"⏳ Remaining: {counts['pending']} of {job['total']}"
+                    ))
+
+        final_status = 'cancelled' if cancelled.is_set() else 'completed'
+        with db_connection() as conn:
+            conn.execute('''UPDATE broadcast_jobs SET status = ?, finished_at = CURRENT_TIMESTAMP
+                            WHERE job_id = ?''', (final_status, job_id))
+            conn.commit()
+            counts = get_broadcast_counts(conn, job_id)
 
+        total_sent, total_failed, total_users = counts['sent'], counts['failed'], job['total']
         send_broadcast_completion_log(context, admin, total_sent, total_failed, total_users)
 
-        update.message.reply_text(
-            f"📊 Broadcast Complete!\n\n"
+        title = "🛑 Broadcast Cancelled!" if final_status == 'cancelled' else "📊 Broadcast Complete!"
+        update_broadcast_status(context, job, (
+            f"{title}\n\n"
             f"✅ Successfully sent to: {total_sent} users\n"
             f"❌ Failed to send to: {total_failed} users\n"
+            f"⏭️ Skipped (unreachable): {counts['skipped']} users\n"
             f"👥 Total users: {total_users}\n\n"
             f"📝 Check logs channel for detailed report."
-        )
+        ))
+        debug_log(f"Broadcast #{job_id} {final_status}: {total_sent} sent, {total_failed} failed", logging.INFO)
+
+    except Exception as e:
+        debug_log(f"Broadcast #{job_id} error: {str(e)}", logging.WARNING)
+    finally:
+        with broadcast_threads_lock:
+            broadcast_threads.pop(job_id, None)
+            broadcast_cancel_events.pop(job_id, None)
+
+def start_broadcast_job(context, job_id, admin=None):
+    with broadcast_threads_lock:
+        if job_id in broadcast_threads:
+            return
+        broadcast_cancel_events[job_id] = threading.Event()
+        thread = threading.Thread(target=run_broadcast_job, args=(context, job_id, admin),
+                                  name=f"broadcast-{job_id}", daemon=True)
+        broadcast_threads[job_id] = thread
+    thread.start()
+
+def resume_broadcast_jobs(dispatcher):
+    """Restart broadcasts that were still running when the bot stopped"""
+    try:
+        with db_connection() as conn:
+            job_ids = [row[0] for row in conn.execute(
+                "SELECT job_id FROM broadcast_jobs WHERE status = 'running'")]
+        for job_id in job_ids:
+            debug_log(f"Resuming broadcast #{job_id}", logging.INFO)
+            start_broadcast_job(CallbackContext(dispatcher), job_id)
+    except Exception as e:
+        debug_log(f"Error resuming broadcasts: {str(e)}")
+
+@admin_only
+def broadcast_message(update: Update, context: CallbackContext):
+    if not update.message.reply_to_message:
+        update.message.reply_text("❌ Please reply to a message with /broad to broadcast it")
+        return
+
+    message_to_broadcast = update.message.reply_to_message
+    admin = update.effective_user
+
+    status_message = update.message.reply_text("📤 Starting broadcast...")
+
+    try:
+        with db_connection() as conn:
+            c = conn.cursor()
+            c.execute('''INSERT INTO broadcast_jobs
+                         (admin_id, from_chat_id, message_id, status_chat_id, status_message_id)
+                         VALUES (?, ?, ?, ?, ?)''',
+                      (admin.id, message_to_broadcast.chat.id, message_to_broadcast.message_id,
+                       status_message.chat_id, status_message.message_id))
+            job_id = c.lastrowid
+            c.execute('''INSERT INTO broadcast_recipients (job_id, user_id)
+                         SELECT ?, v.user_id FROM verified_users v
+                         WHERE NOT EXISTS (SELECT 1 FROM recipient_health r
+                                           WHERE r.user_id = v.user_id AND r.unreachable = 1)''',
+                      (job_id,))
+            total_users = c.rowcount
+            c.execute("UPDATE broadcast_jobs SET total = ? WHERE job_id = ?", (total_users, job_id))
+            conn.commit()
+
+        send_broadcast_start_log(context, admin, message_to_broadcast, total_users)
+        start_broadcast_job(context, job_id, admin)
 
     except Exception as e:
-        debug_log(f"Broadcast error: {str(e)}")
+        debug_log(f"Broadcast error: {str(e)}", logging.WARNING)
         update.message.reply_text("❌ Error during broadcast. Check logs.")
 
+@admin_only
+def cancel_broadcast(update: Update, context: CallbackContext):
+    """/broad_cancel [job_id] - stop running broadcasts; users already reached are kept"""
+    try:
+        with db_connection() as conn:
+            if context.args:
+                job_ids = [int(context.args[0])]
+            else:
+                job_ids = [row[0] for row in conn.execute(
+                    "SELECT job_id FROM broadcast_jobs WHERE status = 'running'")]
+            conn.executemany(
+                '''UPDATE broadcast_jobs SET status = 'cancelled', finished_at = CURRENT_TIMESTAMP
+                   WHERE job_id = ? AND status = 'running' ''',
+                [(job_id,) for job_id in job_ids])
+            conn.commit()
+
+        with broadcast_threads_lock:
+            for job_id in job_ids:
+                if job_id in broadcast_cancel_events:
+                    broadcast_cancel_events[job_id].set()
+
+        if not job_ids:
+            update.message.reply_text("ℹ️ No broadcast is running.")
+        else:
+            update.message.reply_text(f"🛑 Cancelling broadcast {', '.join(f'#{j}' for j in job_ids)}")
+    except ValueError:
+        update.message.reply_text("❌ Usage: /broad_cancel [job_id]")
+    except Exception as e:
+        debug_log(f"Error cancelling broadcast: {str(e)}")
+        update.message.reply_text("❌ Error cancelling broadcast.")
+
 def detect_all_formatting(message):
     text = message.text or message.caption or ""
     formats = []
@@ -3706,7 +5650,7 @@ def handle_nature(update: Update, context: CallbackContext):
         update.message.reply_text(message, parse_mode='HTML')
         return GET_IVS
     except Exception as e:
-        debug_log(f"Nature handling failed: {str(e)}")
+        debug_log(f"Nature handling failed: {str(e)}", logging.WARNING)
         update.message.reply_text("❌ Error saving nature data. Please restart with /add")
         return ConversationHandler.END
     
@@ -3864,6 +5808,55 @@ def handle_base_price(update: Update, context: CallbackContext):
     else:
         return handle_pokemon_price(update, context)
 
+# The "Finalizing" GIF shown once a submission is saved. Each step is (seconds to
+# wait, caption to show next or None to delete the GIF); the steps run as
+# job_queue jobs so the dispatcher isn't held while the animation plays.
+FINALIZING_GIF_URL = "https://cdn.dribbble.com/userupload/21186314/file/original-b7b2a05537ad7bc140eae28e73aecdfd.gif"
+TM_FINALIZING_STEPS = [
+    (1, "★★ Finalizing your submission..."),
+    (1, "★★★ Finalizing your submission..."),
+    (1, "☆ ☆ ☆ Submission Complete!"),
+    (2, None),
+]
+POKEMON_FINALIZING_STEPS = [(5, None)]
+
+def play_finalizing_animation(update, context, caption, steps, follow_ups):
+    """Show the finalizing GIF, then send follow_ups ((text, parse_mode) pairs) once it is deleted"""
+    state = {'chat_id': update.message.chat_id, 'message_id': None, 'steps': list(steps), 'follow_ups': follow_ups}
+    try:
+        state['message_id'] = update.message.reply_animation(animation=FINALIZING_GIF_URL, caption=caption).message_id
+    except Exception as e:
+        debug_log(f"Couldn't send finalizing animation: {str(e)}")
+        state['steps'] = []
+    schedule_finalizing_step(context.job_queue, state)
+
+def schedule_finalizing_step(job_queue, state):
+    delay = state['steps'][0][0] if state['steps'] else 0
+    job_queue.run_once(run_finalizing_step, delay, context=state, name=f"finalizing_{state['chat_id']}")
+
+def run_finalizing_step(context: CallbackContext):
+    state = context.job.context
+    chat_id = state['chat_id']
+
+    if state['steps']:
+        _, caption = state['steps'].pop(0)
+        try:
+            if caption is not None:
+                context.bot.edit_message_caption(chat_id=chat_id, message_id=state['message_id'], caption=caption)
+            else:
+                context.bot.delete_message(chat_id=chat_id, message_id=state['message_id'])
+        except Exception as e:
+            debug_log(f"Finalizing animation step failed: {str(e)}")
+        if state['steps'] or caption is not None:
+            schedule_finalizing_step(context.job_queue, state)
+            return
+
+    for text, parse_mode in state['follow_ups']:
+        try:
+            context.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+        except Exception as e:
+            debug_log(f"Couldn't send submission follow-up: {str(e)}")
+
 def handle_tm_price(update: Update, context: CallbackContext):
     try:
         base_price = extract_base_price(update.message.text)
@@ -3881,68 +5874,6 @@ def handle_tm_price(update: Update, context: CallbackContext):
             update.message.reply_text(message, parse_mode='HTML')
             return GET_BASE_PRICE
         
-        progress_bar = "☑--☑--☑"  # All TM steps completed
-        
-        gif_url = "https://cdn.dribbble.com/userupload/21186314/file/original-b7b2a05537ad7bc140eae28e73aecdfd.gif"
-
-        # Send initial GIF with first star
-        gif_message = update.message.reply_animation(
-            animation=gif_url,
-            caption="★ Finalizing your submission..."
-        )
-
-        import time
-        time.sleep(1)
-        try:
-            context.bot.edit_message_caption(
-                chat_id=update.message.chat_id,
-                message_id=gif_message.message_id,
-                caption="★★ Finalizing your submission..."
-            )
-        except:
-            pass
-
-        import time
-        time.sleep(1)
-        try:
-            context.bot.edit_message_caption(
-                chat_id=update.message.chat_id,
-                message_id=gif_message.message_id,
-                caption="★★★ Finalizing your submission..."
-            )
-        except:
-            pass
-
-        import time
-        time.sleep(1)
-        try:
-            context.bot.edit_message_caption(
-                chat_id=update.message.chat_id,
-                message_id=gif_message.message_id,
-                caption="☆ ☆ ☆ Submission Complete!"
-            )
-        except:
-            pass
-
-        # Wait for 2 seconds on final state
-        time.sleep(2)
-        
-        # Delete the GIF message and show completion
-        context.bot.delete_message(
-            chat_id=update.message.chat_id,
-            message_id=gif_message.message_id
-        )
-        
-        # Show completion message
-        completion_message = (
-            "📝 <b>Pokémon Submission</b>\n\n"
-            "📊 Progress: ☑--☑--☑\n"
-            "✅ All steps completed!\n\n"
-        )
-        
-        update.message.reply_text(completion_message, parse_mode='HTML')
-
-
         seller_username = update.effective_user.username
         seller_first_name = update.effective_user.first_name
         seller_id = update.effective_user.id
@@ -3986,12 +5917,18 @@ def handle_tm_price(update: Update, context: CallbackContext):
             except Exception as e:
                 debug_log(f"Failed to alert admin {admin_id}: {str(e)}")
 
-        update.message.reply_text("✅ TM submitted for approval!")
+        completion_message = (
+            "📝 <b>Pokémon Submission</b>\n\n"
+            "📊 Progress: ☑--☑--☑\n"
+            "✅ All steps completed!\n\n"
+        )
+        play_finalizing_animation(update, context, "★ Finalizing your submission...", TM_FINALIZING_STEPS,
+                                  [(completion_message, 'HTML'), ("✅ TM submitted for approval!", None)])
         cleanup_temp_data(update.effective_user.id)
         return ConversationHandler.END
 
     except Exception as e:
-        debug_log(f"TM submission failed: {str(e)}")
+        debug_log(f"TM submission failed: {str(e)}", logging.WARNING)
         update.message.reply_text("❌ Submission error. Please try /add again.")
         return ConversationHandler.END
 
@@ -4013,36 +5950,6 @@ def handle_pokemon_price(update: Update, context: CallbackContext):
             return GET_BASE_PRICE
         
 
-        gif_url = "https://cdn.dribbble.com/userupload/21186314/file/original-b7b2a05537ad7bc140eae28e73aecdfd.gif"
-
-
-        # Show completion progress
-        progress_bar = "☑--☑--☑--☑--☑--☑--☑"  # All steps completed
-        
-        gif_message = update.message.reply_animation(
-            animation=gif_url,
-            caption="Finalizing your submission..."
-        )
-        
-        # Wait for 5 seconds
-        import time
-        time.sleep(5)
-        
-        # Delete the GIF message and show completion
-        context.bot.delete_message(
-            chat_id=update.message.chat_id,
-            message_id=gif_message.message_id
-        )
-        
-        # Show completion message
-        completion_message = (
-            "📝 <b>Pokémon Submission</b>\n\n"
-            "📊 Progress: ☑--☑--☑--☑--☑--☑--☑\n"
-            "✅ All steps completed!\n\n"
-        )
-        
-        update.message.reply_text(completion_message, parse_mode='HTML')
-
         user_data = context.user_data
         if not user_data:
             update.message.reply_text("❌ Session expired. Please start over with /add")
@@ -4126,11 +6033,17 @@ def handle_pokemon_price(update: Update, context: CallbackContext):
                     debug_log(f"Failed to send text-only to admin {admin_id}: {str(inner_e)}")
 
         if not admin_notification_sent:
-            debug_log(f"WARNING: Submission {submission_id} was not sent to any admin!")
+            debug_log(f"WARNING: Submission {submission_id} was not sent to any admin!", logging.WARNING)
             update.message.reply_text("❌ Could not send submission to admins. Please try again.")
             return ConversationHandler.END
 
-        update.message.reply_text("✅ Submission sent to admins for verification!")
+        completion_message = (
+            "📝 <b>Pokémon Submission</b>\n\n"
+            "📊 Progress: ☑--☑--☑--☑--☑--☑--☑\n"
+            "✅ All steps completed!\n\n"
+        )
+        play_finalizing_animation(update, context, "Finalizing your submission...", POKEMON_FINALIZING_STEPS,
+                                  [(completion_message, 'HTML'), ("✅ Submission sent to admins for verification!", None)])
         cleanup_temp_data(update.effective_user.id)
         return ConversationHandler.END
 
@@ -4211,10 +6124,16 @@ def handle_verification(update: Update, context: CallbackContext):
 
         with db_connection() as conn:
             status = 'processing' if action == 'verify' else 'rejected'
-            conn.execute("UPDATE submissions SET status=? WHERE submission_id=?",
-                        (status, submission_id))
+            # Only the admin whose update moves the submission off 'pending'
+            # lists it; another admin's lane may have claimed it since the check
+            claimed = conn.execute("UPDATE submissions SET status=? WHERE submission_id=? AND status='pending'",
+                                   (status, submission_id)).rowcount
             conn.commit()
 
+        if claimed != 1:
+            query.edit_message_text("⚠️ This submission was already processed by another admin!")
+            return
+
         if action == 'verify':
             update_submission_stats(submission['user_id'], 'approved')
         else:
@@ -4242,7 +6161,8 @@ def handle_verification(update: Update, context: CallbackContext):
                         photo_id=None,
                         base_price=submission_data['base_price'],
                         seller_id=submission['user_id'],
-                        seller_name=submission_data.get('seller_username', submission_data.get('seller_first_name', 'Unknown'))
+                        seller_name=submission_data.get('seller_username', submission_data.get('seller_first_name', 'Unknown')),
+                        attributes=extract_item_attributes(submission_data)
                     )
                 else:
                     new_auction_id = save_auction(
@@ -4250,7 +6170,8 @@ def handle_verification(update: Update, context: CallbackContext):
                         photo_id=submission_data['nature']['photo'],
                         base_price=submission_data['base_price'],
                         seller_id=submission['user_id'],
-                        seller_name=submission_data.get('seller_username', submission_data.get('seller_first_name', 'Unknown'))
+                        seller_name=submission_data.get('seller_username', submission_data.get('seller_first_name', 'Unknown')),
+                        attributes=extract_item_attributes(submission_data)
                     )
 
                 if not new_auction_id:
@@ -4262,7 +6183,8 @@ def handle_verification(update: Update, context: CallbackContext):
                     item_text = format_pokemon_auction_item(submission_data, new_auction_id)
 
                 with db_connection() as conn:
-                    conn.execute('''UPDATE auctions SET item_text=? WHERE auction_id=?''',
+                    conn.execute('''UPDATE auctions SET item_text=?, state_version=state_version + 1
+                                    WHERE auction_id=?''',
                                (item_text, new_auction_id))
                     conn.commit()
 
@@ -4364,9 +6286,6 @@ def handle_verification(update: Update, context: CallbackContext):
                     notifications_sent += 1
                     debug_log(f"Sent submission {action_type} notification to admin {other_admin_id}")
                     
-                    # Small delay to avoid rate limits
-                    time.sleep(0.1)
-                    
                 except Exception as e:
                     debug_log(f"Could not notify admin {other_admin_id} about submission action: {str(e)}")
                     notifications_failed += 1
@@ -4374,7 +6293,7 @@ def handle_verification(update: Update, context: CallbackContext):
         debug_log(f"Submission {action_type} notifications: {notifications_sent} sent, {notifications_failed} failed")
 
     except Exception as e:
-        debug_log(f"Verification failed: {str(e)}")
+        debug_log(f"Verification failed: {str(e)}", logging.WARNING)
         try:
             query.edit_message_text("❌ Processing failed. Check logs.")
         except:
@@ -4400,14 +6319,6 @@ def handle_bid_amount(update: Update, context: CallbackContext):
         return
 
     try:
-        with db_connection() as conn:
-            auctions_open = conn.execute("SELECT auctions_open FROM system_status WHERE id=1").fetchone()[0]
-            
-        if not auctions_open:
-            update.message.reply_text("❌ Auctions are currently closed. Bidding is not allowed.")
-            context.user_data.pop('bid_context', None)
-            return
-
         bid_text = update.message.text.replace(',', '').strip()
         bid_amount = parse_bid_amount(bid_text)
 
@@ -4418,186 +6329,155 @@ def handle_bid_amount(update: Update, context: CallbackContext):
             return
 
         bid_context = context.user_data['bid_context']
+        bidder_name = f"@{update.effective_user.username}" if update.effective_user.username else update.effective_user.first_name
 
-        auction = get_auction(bid_context['auction_id'])
-        if not auction:
-            update.message.reply_text("❌ This auction no longer exists.")
-            context.user_data.pop('bid_context', None)
-            return
-            
-
-        current_amount = auction.get('current_bid') or auction.get('base_price', 0)
-        min_bid = current_amount + get_min_increment(current_amount)
-
-
-        bid_amount_int = int(bid_amount)
-        current_amount_int = int(current_amount)
-        min_bid_int = int(min_bid)
-
-        debug_log(f"BID DEBUG: bid_amount_int={bid_amount_int}, current_amount_int={current_amount_int}, min_bid_int={min_bid_int}")
-
-        if bid_amount_int < min_bid_int:
-            current_formatted = format_bid_amount(current_amount)
-            min_formatted = format_bid_amount(min_bid)
-            increment_formatted = format_bid_amount(get_min_increment(current_amount))
-
-            debug_log(f"BID REJECTED: {bid_amount_int} < {min_bid_int}")
-
-            update.message.reply_text(
-                f"❌ Bid must be at least {min_formatted}\n"
-                f"Current bid: {current_formatted}\n"
-                f"Minimum increment: {increment_formatted}\n\n"
-                f"💡 Your bid: {format_bid_amount(bid_amount)}"
-            )
-            return
+        result = place_bid(bid_context['auction_id'], user_id, bidder_name, int(bid_amount))
+        finish_bid(update, context, bid_context, result, bid_amount, bidder_name)
 
-        bidder_name = f"@{update.effective_user.username}" if update.effective_user.username else update.effective_user.first_name
-        prev_bidder, auction_id = record_bid(
-            bid_context['auction_id'],
-            update.effective_user.id,
-            bidder_name,
-            bid_amount_int , 
-            context
+    except ValueError:
+        update.message.reply_text(
+            "❌ Please enter a valid bid amount!"
         )
+    except Exception as e:
+        debug_log(f"Error in handle_bid_amount: {str(e)}")
+        update.message.reply_text("❌ An error occurred. Your bid was recorded but the display may not update.")
+        context.user_data.pop('bid_context', None)
 
+def finish_bid(update: Update, context: CallbackContext, bid_context, result, bid_amount, bidder_name):
+    """Reply to the bidder and run the follow-ups for a place_bid() result"""
+    if result.status == BID_CLOSED:
+        if result.auction is None:
+            update.message.reply_text("❌ This auction no longer exists.")
+        else:
+            update.message.reply_text("❌ Auctions are currently closed. Bidding is not allowed.")
         context.user_data.pop('bid_context', None)
+        return
 
-        updated_auction = get_auction(bid_context['auction_id'])
-        if not updated_auction:
-            update.message.reply_text("❌ Error updating auction.")
-            return
+    if result.status == BID_TOO_LOW:
+        current_amount = result.auction.get('current_bid') or result.auction.get('base_price', 0)
+        debug_log(f"BID REJECTED: {int(bid_amount)} < {result.min_bid}")
 
-        caption = format_auction(updated_auction)
+        update.message.reply_text(
+            f"❌ Bid must be at least {format_bid_amount(result.min_bid)}\n"
+            f"Current bid: {format_bid_amount(current_amount)}\n"
+            f"Minimum increment: {format_bid_amount(get_min_increment(current_amount))}\n\n"
+            f"💡 Your bid: {format_bid_amount(bid_amount)}"
+        )
+        return
 
-        bot_username = context.bot.username
-        deep_link = f"https://t.me/{bot_username}?start=bid_{updated_auction['auction_id']}"
+    context.user_data.pop('bid_context', None)
+    auction = result.auction
+    user = update.effective_user
 
-        keyboard = [[
-            InlineKeyboardButton("🔄 Refresh", callback_data=f"refresh_{updated_auction['auction_id']}"),
-            InlineKeyboardButton("💰 Place Bid", url=deep_link)
-        ]]
+    # The bid is committed; everything that talks to Telegram on behalf of
+    # other chats runs on the side-effect pipeline
+    enqueue_side_effect('bid_log', send_bid_log, context, auction, user, auction['current_bid'], result.previous_bid)
+    update_auction_post(context, auction, bid_context['channel_msg_id'])
 
-        try:
-            if updated_auction.get('photo_id'):
-                context.bot.edit_message_caption(
-                    chat_id=CHANNEL_ID,
-                    message_id=bid_context['channel_msg_id'],
-                    caption=caption,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='HTML'
-                )
-            else:
-                context.bot.edit_message_text(
-                    chat_id=CHANNEL_ID,
-                    message_id=bid_context['channel_msg_id'],
-                    text=caption,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='HTML'
-                )
-        except Exception as e:
-            debug_log(f"Channel update failed: {str(e)}")
-            try:
-                plain_caption = caption.replace('<br>', '\n').replace('<a href="', '').replace('">', ' ').replace('</a>', '')
-                if updated_auction.get('photo_id'):
-                    context.bot.edit_message_caption(
-                        chat_id=CHANNEL_ID,
-                        message_id=bid_context['channel_msg_id'],
-                        caption=plain_caption,
-                        reply_markup=InlineKeyboardMarkup(keyboard)
-                    )
-                else:
-                    context.bot.edit_message_text(
-                        chat_id=CHANNEL_ID,
-                        message_id=bid_context['channel_msg_id'],
-                        text=plain_caption,
-                        reply_markup=InlineKeyboardMarkup(keyboard)
-                    )
-            except Exception as fallback_error:
-                debug_log(f"Fallback update failed: {str(fallback_error)}")
+    prev_bidder = result.previous_bid
+    if prev_bidder and prev_bidder[0] != user.id:
+        enqueue_side_effect('outbid_notification', send_outbid_notification,
+                            context, prev_bidder, bid_context['item_text'], auction['current_bid'], auction)
 
-        if prev_bidder and prev_bidder[0] != update.effective_user.id:
-            try:
-                send_outbid_notification(
-                    context,
-                    prev_bidder,
-                    bid_context['item_text'],
-                    bid_amount_int,
-                    auction_id
-                )
-            except Exception as e:
-                debug_log(f"Couldn't notify outbid user: {str(e)}")
+    formatted_bid = format_bid_amount(bid_amount)
+    update.message.reply_text(f"✅ Your bid of {formatted_bid} has been placed!")
 
-        formatted_bid = format_bid_amount(bid_amount)
-        update.message.reply_text(f"✅ Your bid of {formatted_bid} has been placed!")
+# Every write that changes what an auction's post shows (item text, current bid,
+# bidder) bumps auctions.state_version, so a rendered post can be cached and
+# compared by (auction_id, state_version) instead of by its caption.
+AUCTION_CAPTION_CACHE_SIZE = 2000
 
-    except ValueError:
-        update.message.reply_text(
-            "❌ Please enter a valid bid amount!"
-        )
-    except Exception as e:
-        debug_log(f"Error in handle_bid_amount: {str(e)}")
-        update.message.reply_text("❌ An error occurred. Your bid was recorded but the display may not update.")
-        context.user_data.pop('bid_context', None)
+auction_captions = OrderedDict()  # (auction_id, state_version) -> (caption, reply_markup)
+auction_captions_lock = threading.Lock()
+
+def auction_version(auction):
+    """(auction_id, state_version) for an auction row/dict, or None for a row without a version"""
+    if auction.get('state_version') is None:
+        return None
+    return auction['auction_id'], auction['state_version']
 
-def send_outbid_notification(context, prev_bidder, item_text, bid_amount, auction_id):
+def get_auction_version(auction_id):
+    """state_version of an active auction, or None if it isn't active"""
+    with db_connection() as conn:
+        row = conn.execute('''SELECT state_version FROM auctions WHERE auction_id=? AND auction_status='active' ''',
+                           (auction_id,)).fetchone()
+    return row['state_version'] if row else None
+
+def render_auction_post(bot, auction):
+    """Caption and keyboard for an auction's channel post"""
+    version = auction_version(auction)
+    if version is not None:
+        with auction_captions_lock:
+            rendered = auction_captions.get(version)
+            if rendered is not None:
+                auction_captions.move_to_end(version)
+                return rendered
+
+    caption = format_auction(auction)
+
+    deep_link = f"https://t.me/{bot.username}?start=bid_{auction['auction_id']}"
+
+    keyboard = [[
+        InlineKeyboardButton("🔄 Refresh", callback_data=f"refresh_{auction['auction_id']}"),
+        InlineKeyboardButton("💰 Place Bid", url=deep_link)
+    ]]
+    rendered = caption, InlineKeyboardMarkup(keyboard)
+
+    if version is not None:
+        with auction_captions_lock:
+            auction_captions[version] = rendered
+            while len(auction_captions) > AUCTION_CAPTION_CACHE_SIZE:
+                auction_captions.popitem(last=False)
+    return rendered
+
+def update_auction_post(context: CallbackContext, auction, channel_msg_id, on_failure=None):
+    """Schedule a re-render of an auction's channel post"""
+    caption, reply_markup = render_auction_post(context.bot, auction)
+    schedule_post_update(context.bot, CHANNEL_ID, channel_msg_id, caption, reply_markup, bool(auction.get('photo_id')),
+                         version=auction_version(auction), on_failure=on_failure)
+
+def send_outbid_notification(context, prev_bidder, item_text, bid_amount, auction):
+    """DM the outbid user (runs on the side-effect pipeline); auction is the state after the new bid.
+
+    The DM is queued detached, so a failed send reaches the pipeline, which retries transient errors.
+    """
     if not prev_bidder or not prev_bidder[0]:
         return
 
     outbid_user_id = prev_bidder[0]
+    if not is_reachable(outbid_user_id):
+        return
 
-    try:
-        auction = get_auction(auction_id)
-        if not auction:
-            return
-
-        item_name = extract_item_name(item_text)
-
-        current_bidder_name = get_current_bidder_name(auction_id) or "Unknown"
-        current_bidder_name = current_bidder_name.replace('\\', '')
-
-        try:
-            channel_entity = context.bot.get_chat(CHANNEL_ID)
-            channel_username = channel_entity.username
-        except:
-            channel_username = None
+    item_name = extract_item_name(item_text)
 
-        message_link = None
-        if channel_username and auction.get('channel_message_id'):
-            message_link = f"https://t.me/{channel_username}/{auction['channel_message_id']}"
-        else:
-            try:
-                message_link = f"https://t.me/c/{str(CHANNEL_ID).replace('-100', '')}/{auction['channel_message_id']}"
-            except:
-                pass
+    current_bidder_name = auction.get('current_bidder') or "Unknown"
+    current_bidder_name = current_bidder_name.replace('\\', '')
 
-        formatted_bid = format_bid_amount(bid_amount)
+    message_link = channel_post_link(auction.get('channel_message_id'), context.bot)
 
-        if message_link:
-            message = (
-                f"Oof, You have been outbid on <a href='{message_link}'>{html.escape(item_name)}</a> 😬\n"
-                f"<b>{html.escape(current_bidder_name)}</b> just showed you how it's really done 👑\n"
-                f"<blockquote><b><i>New bid: {formatted_bid} 💸</i></b></blockquote>\n"
-                f"Gonna let them get away with that 🤨, or are you still in this fight? 🥊"
-            )
-        else:
-            message = (
-                f"Oof, You have been outbid on {html.escape(item_name)} 😬\n"
-                f"<b>{html.escape(current_bidder_name)}</b> just showed you how it's really done 👑\n"
-                f"<blockquote><b><i>New bid: {formatted_bid} 💸</i></b></blockquote>\n"
-                f"Gonna let them get away with that 🤨, or are you still in this fight? 🥊"
-            )
+    formatted_bid = format_bid_amount(bid_amount)
 
-        context.bot.send_message(
-            chat_id=outbid_user_id,
-            text=message,
-            parse_mode='HTML',
-            disable_web_page_preview=False
+    if message_link:
+        message = (
+            f"Oof, You have been outbid on <a href='{message_link}'>{html.escape(item_name)}</a> 😬\n"
+            f"<b>{html.escape(current_bidder_name)}</b> just showed you how it's really done 👑\n"
+            f"<blockquote><b><i>New bid: {formatted_bid} 💸</i></b></blockquote>\n"
+            f"Gonna let them get away with that 🤨, or are you still in this fight? 🥊"
+        )
+    else:
+        message = (
+            f"Oof, You have been outbid on {html.escape(item_name)} 😬\n"
+            f"<b>{html.escape(current_bidder_name)}</b> just showed you how it's really done 👑\n"
+            f"<blockquote><b><i>New bid: {formatted_bid} 💸</i></b></blockquote>\n"
+            f"Gonna let them get away with that 🤨, or are you still in this fight? 🥊"
         )
 
-    except telegram.error.Unauthorized:
-        debug_log(f"User {outbid_user_id} blocked the bot")
-    except Exception as e:
-        debug_log(f"Error sending outbid notification: {str(e)}")
+    context.bot.send_message(
+        chat_id=outbid_user_id,
+        text=message,
+        parse_mode='HTML',
+        disable_web_page_preview=False
+    )
 
 def extract_item_name(item_text):
     if not item_text:
@@ -4758,14 +6638,19 @@ def handle_refresh_button(update: Update, context: CallbackContext):
     query = update.callback_query
 
     try:
-        try:
-            query.answer("🔄 Refreshing...")
-        except Exception as e:
-            debug_log(f"Couldn't answer refresh callback: {str(e)}")
-
-        time.sleep(0.3)
-
+        # A callback query can only be answered once, so every path below answers with its outcome
         auction_id = int(query.data.split('_')[1])
+        chat_id = query.message.chat.id
+        message_id = query.message.message_id
+
+        # The post was last edited from this exact auction state: nothing to render or send
+        state_version = get_auction_version(auction_id)
+        if state_version is not None and post_shows_version(chat_id, message_id, (auction_id, state_version)):
+            try:
+                query.answer("✅ Already up to date!")
+            except:
+                pass
+            return
 
         auction = get_auction(auction_id)
 
@@ -4776,66 +6661,30 @@ def handle_refresh_button(update: Update, context: CallbackContext):
                 pass
             return
 
-        caption = format_auction(auction)
-
-        bot_username = context.bot.username
-        deep_link = f"https://t.me/{bot_username}?start=bid_{auction_id}"
-
-        keyboard = [[
-            InlineKeyboardButton(
-                "🔄 Refresh",
-                callback_data=f"refresh_{auction_id}"
-            ),
-            InlineKeyboardButton(
-                "💰 Place Bid",
-                url=deep_link
-            )
-        ]]
-
-        try:
-            if auction.get('photo_id'):
-                context.bot.edit_message_caption(
-                    chat_id=query.message.chat.id,
-                    message_id=query.message.message_id,
-                    caption=caption,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='HTML'
-                )
-            else:
-                context.bot.edit_message_text(
-                    chat_id=query.message.chat.id,
-                    message_id=query.message.message_id,
-                    text=caption,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='HTML'
-                )
+        caption, reply_markup = render_auction_post(context.bot, auction)
+        version = auction_version(auction)
 
+        if is_post_current(chat_id, message_id, caption, reply_markup):
+            remember_post_render((chat_id, message_id), caption, reply_markup, version)
             try:
-                query.answer("✅ Refreshed!")
+                query.answer("✅ Already up to date!")
             except:
                 pass
+            return
 
-        except telegram.error.BadRequest as e:
-            if "Message is not modified" in str(e):
-                try:
-                    query.answer("✅ Already up to date!")
-                except:
-                    pass
-            else:
-                debug_log(f"Couldn't refresh auction message: {str(e)}")
-                try:
-                    query.answer("❌ Refresh failed", show_alert=True)
-                except:
-                    pass
-        except Exception as e:
-            debug_log(f"Error refreshing auction: {str(e)}")
-            try:
-                query.answer("❌ Refresh failed", show_alert=True)
-            except:
-                pass
+        schedule_post_update(context.bot, chat_id, message_id, caption, reply_markup,
+                             bool(auction.get('photo_id')), delay=0, version=version)
+        try:
+            query.answer("🔄 Refresh queued")
+        except:
+            pass
 
     except Exception as e:
         debug_log(f"Error in handle_refresh_button: {str(e)}")
+        try:
+            query.answer("❌ Couldn't refresh, please try again")
+        except Exception:
+            pass
 
 @admin_only
 def remove_item(update: Update, context: CallbackContext):
@@ -4945,103 +6794,144 @@ def remove_item(update: Update, context: CallbackContext):
         debug_log(f"Error in /removeitem: {str(e)}")
         update.message.reply_text("❌ Error removing item. Please check the item ID and try again.")
 
-def get_active_auctions_by_category():
-    try:
-        with db_connection() as conn:
-            c = conn.cursor()
-            c.execute('''SELECT a.*, s.data
-                         FROM auctions a
-                         LEFT JOIN submissions s ON a.channel_message_id = s.channel_message_id
-                         WHERE a.auction_status = 'active' 
-                         ORDER BY a.created_at DESC''')
-            auctions = c.fetchall()
-
-            categorized = {
-                'nonlegendary': [],
-                'shiny': [],
-                'legendary': [],
-                'tms': []
-            }
-
-            for auction in auctions:
-                submission_data = json.loads(auction['data']) if auction['data'] else {}
-                category = submission_data.get('category', 'nonlegendary')
-
-                if category == 'legendary':
-                    categorized['legendary'].append(auction)
-                elif category == 'shiny':
-                    categorized['shiny'].append(auction)
-                elif category == 'tms':
-                    categorized['tms'].append(auction)
-                else:
-                    categorized['nonlegendary'].append(auction)
+ITEMS_PAGE_SIZE = 20
+ITEMS_BUTTON_LABELS = {'legendary': "6L", 'nonlegendary': "0L", 'shiny': "Shiny", 'tms': "TM"}
 
-            return categorized
+def get_active_category_counts():
+    """{category: number of active auctions}, every category present"""
+    counts = dict.fromkeys(ITEMS_CATEGORIES, 0)
+    with db_connection() as conn:
+        for category, count in conn.execute('''SELECT category, COUNT(*) FROM auctions
+                                               WHERE auction_status = 'active'
+                                               GROUP BY category'''):
+            counts[category if category in counts else 'nonlegendary'] += count
+    return counts
+
+def get_items_page(category, sort='new', cursor=None, backwards=False, limit=ITEMS_PAGE_SIZE):
+    """One /items page of active auctions in category, by keyset on (sort key, auction_id).
+
+    cursor is the (sort_key, auction_id) of the row the page continues from: the last row
+    shown when paging forward, the first when paging back. Returns (rows, more) where more
+    says whether there are rows beyond this page in the direction travelled.
+    """
+    key = ITEMS_SORTS[sort][0]
+    order = 'ASC' if backwards else 'DESC'
+    params = [category]
+    after = ''
+    if cursor:
+        after = f"AND ({key}, auction_id) {'>' if backwards else '<'} (?, ?)"
+        params.extend(cursor)
+    params.append(limit + 1)
 
-    except Exception as e:
-        debug_log(f"Error getting auctions: {str(e)}")
+    with db_connection() as conn:
+        rows = conn.execute(f'''SELECT auction_id, item_text, channel_message_id, current_bid, base_price,
+                                       bid_count, category, pokemon_name, nature, tm_name, {key} AS sort_key
+                                FROM auctions
+                                WHERE auction_status = 'active' AND category = ? {after}
+                                ORDER BY {key} {order}, auction_id {order}
+                                LIMIT ?''', params).fetchall()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+    return rows, more
+
+def encode_items_key(sort, value):
+    if sort == 'new':
+        return str(value)
+    if sort == 'price' and value != int(value):
+        return repr(float(value))
+    return str(int(value or 0))
+
+def decode_items_key(sort, text):
+    if sort == 'new':
+        return text
+    if sort == 'price':
+        return float(text)
+    return int(text)
+
+def items_callback(category, sort, direction=None, pos=0, row=None):
+    """callback_data for an /items button; pages carry their keyset cursor (stays under Telegram's 64 bytes)"""
+    if direction is None:
+        return f"items_{category}_{sort}"
+    return f"items_{category}_{sort}_{direction}_{pos}_{encode_items_key(sort, row['sort_key'])}_{row['auction_id']}"
+
+def parse_items_callback(data):
+    """(category, sort, direction, pos, cursor) from callback data; also accepts the old items_<category>"""
+    parts = data.split('_', 6)
+    category = parts[1] if len(parts) > 1 and parts[1] in ITEMS_CATEGORIES else 'legendary'
+    sort = parts[2] if len(parts) > 2 and parts[2] in ITEMS_SORTS else 'new'
+    if len(parts) < 7:
+        return category, sort, None, 0, None
+    return category, sort, parts[3], int(parts[4]), (decode_items_key(sort, parts[5]), int(parts[6]))
+
+def render_items_page(bot, category, sort='new', direction=None, pos=0, cursor=None):
+    """(text, keyboard) for one /items page, or None when nothing is up for auction"""
+    counts = get_active_category_counts()
+    if not any(counts.values()):
         return None
 
-@verified_only
-def handle_items(update: Update, context: CallbackContext):
-    try:
-        categorized = get_active_auctions_by_category()
-        if not categorized:
-            update.message.reply_text("ℹ️ No active auctions currently.")
-            return
+    backwards = direction == 'p'
+    rows, more = get_items_page(category, sort, cursor, backwards)
+    if backwards:
+        pos = max(0, pos - len(rows))
+        has_prev, has_next = more, True
+    else:
+        has_prev, has_next = pos > 0, more
 
-        try:
-            channel_entity = context.bot.get_chat(CHANNEL_ID)
-            channel_username = channel_entity.username
-            if not channel_username:
-                channel_username = f"c/{str(CHANNEL_ID).replace('-100', '')}"
-        except:
-            channel_username = None
+    total = counts[category]
+    response = [f"<b>{get_category_display_name(category)} Items</b> ({total})",
+                " · ".join(f"{ITEMS_BUTTON_LABELS[cat]}: {counts[cat]}" for cat in ITEMS_CATEGORIES)]
 
-        category_to_show = 'legendary'
-        items_to_display = categorized.get(category_to_show, [])
+    if not rows:
+        response.append("\nNo items in this category.")
+    else:
+        response.append(f"Sorted by {ITEMS_SORTS[sort][1]} · {pos + 1}–{pos + len(rows)} of {total}\n")
+        refresh_channel_info(bot)
+        for i, auction in enumerate(rows, pos + 1):
+            line = f"{i}. {format_item_for_list(auction)}"
+            if sort == 'price':
+                line += f" · {format_bid_amount(auction['sort_key'])}"
+            elif sort == 'bids':
+                line += f" · {auction['bid_count']} bids"
+            response.append(line)
 
-        if not items_to_display:
-            for cat in ['legendary', 'nonlegendary', 'shiny', 'tms']:
-                if categorized.get(cat):
-                    category_to_show = cat
-                    items_to_display = categorized.get(cat, [])
-                    break
+    keyboard = [
+        [InlineKeyboardButton(f"{ITEMS_BUTTON_LABELS[cat]} ({counts[cat]})", callback_data=items_callback(cat, sort))
+         for cat in ITEMS_CATEGORIES],
+        [InlineKeyboardButton(("• " if key == sort else "") + label, callback_data=items_callback(category, key))
+         for key, (_, label) in ITEMS_SORTS.items()],
+    ]
+    paging = []
+    if rows and has_prev:
+        paging.append(InlineKeyboardButton("◀️ Prev", callback_data=items_callback(category, sort, 'p', pos, rows[0])))
+    if rows and has_next:
+        paging.append(InlineKeyboardButton("Next ▶️", callback_data=items_callback(
+            category, sort, 'n', pos + len(rows), rows[-1])))
+    if paging:
+        keyboard.append(paging)
 
-        response = [f"<b>{get_category_display_name(category_to_show)} Items</b>"]
+    return "\n".join(response), InlineKeyboardMarkup(keyboard)
 
-        if not items_to_display:
-            response.append("\nNo items in this category.")
-        else:
-            for i, auction in enumerate(items_to_display, 1):
-                item_display = format_item_for_list(auction, channel_username)
-                response.append(f"{i}. {item_display}")
+@verified_only
+def handle_items(update: Update, context: CallbackContext):
+    try:
+        counts = get_active_category_counts()
+        category_to_show = next((cat for cat in ITEMS_CATEGORIES if counts[cat]), 'legendary')
 
-        keyboard = [
-            [
-                InlineKeyboardButton("6L", callback_data="items_legendary"),
-                InlineKeyboardButton("0L", callback_data="items_nonlegendary"),
-                InlineKeyboardButton("Shiny", callback_data="items_shiny"),
-                InlineKeyboardButton("TM", callback_data="items_tms")
-            ]
-        ]
+        page = render_items_page(context.bot, category_to_show)
+        if not page:
+            update.message.reply_text("ℹ️ No active auctions currently.")
+            return
 
-        try:
-            update.message.reply_text(
-                "\n".join(response),
-                parse_mode='HTML',
-                disable_web_page_preview=True,
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
-        except telegram.error.RetryAfter as e:
-            debug_log(f"Flood control in /items, waiting {e.retry_after} seconds")
-            time.sleep(e.retry_after)
-            update.message.reply_text(
-                "\n".join(response),
-                parse_mode='HTML',
-                disable_web_page_preview=True,
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
+        text, reply_markup = page
+        update.message.reply_text(
+            text,
+            parse_mode='HTML',
+            disable_web_page_preview=True,
+            reply_markup=reply_markup
+        )
 
     except Exception as e:
         debug_log(f"Error in /items: {str(e)}")
@@ -5059,28 +6949,25 @@ def get_category_display_name(category):
     }
     return display_names.get(category, category.title())
 
-def format_item_for_list(auction_row, channel_username):
+def format_item_for_list(auction_row):
     auction = dict(auction_row)
-    data_str = auction.get('data', '{}')
-    try:
-        submission_data = json.loads(data_str) if data_str else {}
-    except:
-        submission_data = {}
 
-    if submission_data.get('category') == 'tms':
-        item_text = auction.get('item_text', '')
-        tm_match = re.search(r'TM\d+', item_text)
-        tm_name = tm_match.group(0) if tm_match else "TM"
+    if auction.get('category') == 'tms':
+        tm_name = auction.get('tm_name')
+        if not tm_name:
+            tm_match = TM_NAME_RE.search(auction.get('item_text') or '')
+            tm_name = tm_match.group(0) if tm_match else "TM"
         display_name = f"{tm_name} 💿"
     else:
-        pokemon_name = submission_data.get('pokemon_name', 'Unknown Pokémon')
-        item_text = auction.get('item_text', '')
-        nature_match = re.search(r'Nature:\s*([A-Za-z]+)', item_text)
-        nature = nature_match.group(1) if nature_match else "Unknown"
+        pokemon_name = auction.get('pokemon_name') or 'Unknown Pokémon'
+        nature = auction.get('nature')
+        if not nature:
+            nature_match = NATURE_RE.search(auction.get('item_text') or '')
+            nature = nature_match.group(1) if nature_match else "Unknown"
         display_name = f"{pokemon_name}-{nature}"
 
-    if channel_username and auction.get('channel_message_id'):
-        message_link = f"https://t.me/{channel_username}/{auction['channel_message_id']}"
+    message_link = channel_post_link(auction.get('channel_message_id'))
+    if message_link:
         return f'<a href="{message_link}">{display_name}</a>'
     else:
         return display_name
@@ -5094,50 +6981,23 @@ def handle_items_category_switch(update: Update, context: CallbackContext):
         debug_log(f"Error answering callback: {str(e)}")
 
     try:
-        category = query.data.split('_')[1]  
+        category, sort, direction, pos, cursor = parse_items_callback(query.data)
 
-        categorized = get_active_auctions_by_category()
-        if not categorized:
+        page = render_items_page(context.bot, category, sort, direction, pos, cursor)
+        if not page:
             try:
                 query.edit_message_text("ℹ️ No active auctions currently.")
             except Exception as e:
                 debug_log(f"Error editing message for no auctions: {str(e)}")
             return
 
-        items_to_display = categorized.get(category, [])
-
-        response = [f"<b>{get_category_display_name(category)} Items</b>"]
-
-        if not items_to_display:
-            response.append("\nNo items in this category.")
-        else:
-            try:
-                channel_entity = context.bot.get_chat(CHANNEL_ID)
-                channel_username = channel_entity.username
-                if not channel_username:
-                    channel_username = f"c/{str(CHANNEL_ID).replace('-100', '')}"
-            except:
-                channel_username = None
-
-            for i, auction in enumerate(items_to_display, 1):
-                item_display = format_item_for_list(auction, channel_username)
-                response.append(f"{i}. {item_display}")
-
-        keyboard = [
-            [
-                InlineKeyboardButton("6L", callback_data="items_legendary"),
-                InlineKeyboardButton("0L", callback_data="items_nonlegendary"),
-                InlineKeyboardButton("Shiny", callback_data="items_shiny"),
-                InlineKeyboardButton("TM", callback_data="items_tms")
-            ]
-        ]
-
+        text, reply_markup = page
         try:
             query.edit_message_text(
-                "\n".join(response),
+                text,
                 parse_mode='HTML',
                 disable_web_page_preview=True,
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                reply_markup=reply_markup
             )
         except telegram.error.BadRequest as e:
             if "Message is not modified" in str(e):
@@ -5147,22 +7007,13 @@ def handle_items_category_switch(update: Update, context: CallbackContext):
                 debug_log("Message to edit not found - sending new message")
                 context.bot.send_message(
                     chat_id=query.message.chat_id,
-                    text="\n".join(response),
+                    text=text,
                     parse_mode='HTML',
                     disable_web_page_preview=True,
-                    reply_markup=InlineKeyboardMarkup(keyboard)
+                    reply_markup=reply_markup
                 )
             else:
                 raise
-        except telegram.error.RetryAfter as e:
-            debug_log(f"Flood control, retrying after {e.retry_after} seconds")
-            time.sleep(e.retry_after)
-            query.edit_message_text(
-                "\n".join(response),
-                parse_mode='HTML',
-                disable_web_page_preview=True,
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
 
     except Exception as e:
         debug_log(f"Error in category switch: {str(e)}")
@@ -5179,7 +7030,8 @@ def get_user_approved_items(user_id):
     try:
         with db_connection() as conn:
             c = conn.cursor()
-            c.execute('''SELECT s.*, a.auction_status 
+            c.execute('''SELECT s.submission_id, s.channel_message_id, s.category, s.pokemon_name, s.tm_name,
+                                a.auction_status
                          FROM submissions s
                          LEFT JOIN auctions a ON s.channel_message_id = a.channel_message_id
                          WHERE s.user_id=? AND s.status='approved'
@@ -5199,13 +7051,7 @@ def handle_myitems(update: Update, context: CallbackContext):
             update.message.reply_text("📭 You don't have any approved items in auctions yet.")
             return
 
-        try:
-            channel_entity = context.bot.get_chat(CHANNEL_ID)
-            channel_username = channel_entity.username
-            if not channel_username:
-                channel_username = f"c/{str(CHANNEL_ID).replace('-100', '')}"
-        except:
-            channel_username = None
+        refresh_channel_info(context.bot)
 
         response = ["<b>📋 Your Auction Items</b>"]
 
@@ -5214,20 +7060,11 @@ def handle_myitems(update: Update, context: CallbackContext):
 
         for item in items:
             try:
-                data = json.loads(item['data']) if isinstance(item['data'], str) else item['data'] or {}
-                category = data.get('category', 'unknown')
+                category = item['category'] or 'unknown'
+                name = get_item_name(item)
 
-                if category.lower() == 'tms':
-                    name = "TM"
-                else:
-                    name = data.get('pokemon_name', 'Unknown Pokémon')
-
-                if item['channel_message_id']:
-                    auction = get_auction_by_channel_id_any_status(item['channel_message_id'])
-                    if auction and auction.get('auction_status') == 'active':
-                        active_items.append((item, name, category))
-                    else:
-                        ended_items.append((item, name, category))
+                if item['auction_status'] == 'active':
+                    active_items.append((item, name, category))
                 else:
                     ended_items.append((item, name, category))
 
@@ -5238,8 +7075,8 @@ def handle_myitems(update: Update, context: CallbackContext):
         if active_items:
             response.append("\n<b>🟢 Active Items:</b>")
             for i, (item, name, category) in enumerate(active_items, 1):
-                if channel_username and item['channel_message_id']:
-                    message_link = f"https://t.me/{channel_username}/{item['channel_message_id']}"
+                message_link = channel_post_link(item['channel_message_id'])
+                if message_link:
                     item_display = f'<a href="{message_link}">{name}</a>'
                 else:
                     item_display = name
@@ -5346,28 +7183,34 @@ def remove_last_bid(auction_id):
 
             c.execute('''UPDATE bids SET is_active=0 WHERE bid_id=?''', (bid_id,))
 
-            c.execute('''SELECT bidder_id, bidder_name, amount FROM bids
+            c.execute('''SELECT bid_id, bidder_id, bidder_name, amount FROM bids
                          WHERE auction_id=? AND is_active=1
-                         ORDER BY amount DESC
+                         ORDER BY amount DESC, bid_id ASC
                          LIMIT 1''', (auction_id,))
             new_top = c.fetchone()
 
             if new_top:
-                new_bidder_id, new_bidder_name, new_amount = new_top
+                new_bid_id, new_bidder_id, new_bidder_name, new_amount = new_top
                 c.execute('''UPDATE auctions SET
                              current_bid=?,
                              current_bidder_id=?,
                              current_bidder=?,
-                             previous_bidder=?
+                             previous_bidder=?,
+                             winning_bid_id=?,
+                             bid_count=MAX(bid_count - 1, 0),
+                             state_version=state_version + 1
                              WHERE auction_id=?''',
-                          (new_amount, new_bidder_id, new_bidder_name, last_bidder_name, auction_id))
+                          (new_amount, new_bidder_id, new_bidder_name, last_bidder_name, new_bid_id, auction_id))
                 result = (new_bidder_name, new_amount)
             else:
                 c.execute('''UPDATE auctions SET
                              current_bid=NULL,
                              current_bidder_id=NULL,
                              current_bidder=NULL,
-                             previous_bidder=?
+                             previous_bidder=?,
+                             winning_bid_id=NULL,
+                             bid_count=0,
+                             state_version=state_version + 1
                              WHERE auction_id=?''',
                           (last_bidder_name, auction_id))
                 result = (None, None)
@@ -5411,65 +7254,25 @@ def handle_remove_bid(update: Update, context: CallbackContext):
 
         new_amount = new_amount if new_amount else updated_auction['base_price']
 
-        auction_id_text = str(auction_id)
-        current_bid_str = f"{new_amount:,}" if new_amount is not None else 'None'
-
-        current_bidder_name = new_bidder if new_bidder else 'None'
-
-        current_bidder_id = updated_auction.get('current_bidder_id')
-        if current_bidder_id and current_bidder_name != 'None':
-            bidder_link = f'<a href="tg://user?id={current_bidder_id}">{current_bidder_name}</a>'
-        else:
-            bidder_link = current_bidder_name
-
-        item_text = updated_auction['item_text']
-
-        caption = (
-            f"{item_text}\n"
-            f"<blockquote>🔼 Current Bid: {current_bid_str}\n"
-            f"👤 Bidder: {bidder_link}</blockquote>"
-        )
-
-        bot_username = context.bot.username
-        deep_link = f"https://t.me/{bot_username}?start=bid_{auction_id}"
+        admin_chat_id = update.effective_chat.id
 
-        keyboard = [
-            [
-                InlineKeyboardButton("🔄 Refresh", callback_data=f"refresh_{auction_id}"),
-                InlineKeyboardButton("💰 Place Bid", url=deep_link)
-            ]
-        ]
+        def report_post_failure(error):
+            context.bot.send_message(
+                chat_id=admin_chat_id,
+                text=f"⚠️ Couldn't update the channel post for Item #{auction_id}: {error}"
+            )
 
-        update_success = True
-        try:
-            if updated_auction.get('photo_id'):
-                context.bot.edit_message_caption(
-                    chat_id=CHANNEL_ID,
-                    message_id=updated_auction['channel_message_id'],
-                    caption=caption,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='HTML'
-                )
-            else:
-                context.bot.edit_message_text(
-                    chat_id=CHANNEL_ID,
-                    message_id=updated_auction['channel_message_id'],
-                    text=caption,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='HTML'
-                )
-        except Exception as e:
-            debug_log(f"Channel update failed: {str(e)}")
-            update_success = False
+        # Same renderer as bids and refreshes, so the post keeps one format. The edit
+        # goes out on the post scheduler; if it finally fails the admin is told then.
+        update_auction_post(context, updated_auction, updated_auction['channel_message_id'],
+                            on_failure=report_post_failure)
 
         response = (
             f"✅ Last bid removed from Item #{auction_id}\n"
-            f"New top bid: {new_bidder or 'None'} with {new_amount:,}"
+            f"New top bid: {new_bidder or 'None'} with {new_amount:,}\n"
+            f"Channel post update queued."
         )
 
-        if not update_success:
-            response += "\n⚠️ Note: Couldn't update auction message"
-
         update.message.reply_text(response)
 
     except Exception as e:
@@ -5481,19 +7284,12 @@ def get_user_leading_bids(user_id):
         with db_connection() as conn:
             c = conn.cursor()
 
-            c.execute('''SELECT a.auction_id, a.item_text, s.data, b.amount, a.auction_status
+            c.execute('''SELECT a.auction_id, a.item_text, b.amount, a.auction_status, a.channel_message_id,
+                                a.category, a.pokemon_name, a.tm_name
                          FROM auctions a
-                         JOIN bids b ON a.auction_id = b.auction_id
-                         LEFT JOIN submissions s ON a.channel_message_id = s.channel_message_id
-                         WHERE b.bidder_id = ?
-                         AND b.is_active = 1
+                         JOIN bids b ON b.bid_id = a.winning_bid_id
+                         WHERE a.current_bidder_id = ?
                          AND a.auction_status IN ('active', 'ended') 
-                         AND b.amount = (
-                             SELECT MAX(amount)
-                             FROM bids
-                             WHERE auction_id = a.auction_id
-                             AND is_active = 1
-                         )
                          ORDER BY b.timestamp DESC''', (user_id,))
             return c.fetchall()
     except Exception as e:
@@ -5510,44 +7306,21 @@ def handle_mybids(update: Update, context: CallbackContext):
             update.message.reply_text("You're not currently the highest bidder on any item.")
             return
 
-        try:
-            channel_entity = context.bot.get_chat(CHANNEL_ID)
-            channel_username = channel_entity.username
-            if not channel_username:
-                channel_username = f"c/{str(CHANNEL_ID).replace('-100', '')}"
-        except:
-            channel_username = None
+        refresh_channel_info(context.bot)
 
         response = ["<b>Your Current Bids</b>"]
 
         for i, bid_data in enumerate(user_bids, 1):
-            auction_id = bid_data[0]
-            item_text = bid_data[1]
-            submission_data = bid_data[2]
-            amount = bid_data[3]
-            auction_status = bid_data[4]  
-
-            auction = get_auction(auction_id)
-            if not auction:
-                continue
+            amount = bid_data['amount']
+            auction_status = bid_data['auction_status']
 
-            item_name = "Unknown Item"
-            if submission_data:
-                try:
-                    data = json.loads(submission_data) if isinstance(submission_data, str) else submission_data
-                    if data.get('category') == 'tms':
-                        tm_text = data.get('tm_details', {}).get('text', '')
-                        tm_match = re.search(r'(TM\d+)', tm_text)
-                        item_name = tm_match.group(1) if tm_match else "TM"
-                    else:
-                        item_name = data.get('pokemon_name', 'Unknown Pokémon')
-                except:
-                    item_name = extract_item_name(item_text)
+            if bid_data['pokemon_name'] or bid_data['tm_name']:
+                item_name = get_item_name(bid_data)
             else:
-                item_name = extract_item_name(item_text)
+                item_name = extract_item_name(bid_data['item_text'])
 
-            if channel_username and auction.get('channel_message_id'):
-                message_link = f"https://t.me/{channel_username}/{auction['channel_message_id']}"
+            message_link = channel_post_link(bid_data['channel_message_id'])
+            if message_link:
                 item_display = f'<a href="{message_link}">{item_name}</a>'
             else:
                 item_display = item_name
@@ -5587,32 +7360,38 @@ def update_user_profile(user_id, username, first_name):
     except Exception as e:
         debug_log(f"Error updating user profile: {str(e)}")
 
+SUBMISSION_STATS_COLUMNS = '''total_submissions, pending_submissions, approved_submissions,
+                              rejected_submissions, revoked_submissions'''
+
+def log_submission_stats(c, user_id, label):
+    """DEBUG-only snapshot of a profile's counters; costs a query, so callers check debug_enabled()"""
+    c.execute(f"SELECT {SUBMISSION_STATS_COLUMNS} FROM user_profiles WHERE user_id=?", (user_id,))
+    row = c.fetchone()
+    if row:
+        debug_log(f"{label} - Total: {row['total_submissions']}, Pending: {row['pending_submissions']}, "
+                  f"Approved: {row['approved_submissions']}, Rejected: {row['rejected_submissions']}, "
+                  f"Revoked: {row['revoked_submissions']}", logging.DEBUG, user_id=user_id)
+
 def update_submission_stats(user_id, status_change, is_new_submission=False):
     try:
-        debug_log(f"=== START UPDATE SUBMISSION STATS ===")
-        debug_log(f"User: {user_id}, Status: {status_change}, New: {is_new_submission}")
+        debug = debug_enabled()
+        if debug:
+            debug_log(f"Updating submission stats: status={status_change}, new={is_new_submission}",
+                      logging.DEBUG, user_id=user_id)
 
         with profile_connection() as conn:
             c = conn.cursor()
 
-            c.execute('SELECT * FROM user_profiles WHERE user_id=?', (user_id,))
-            existing_profile = c.fetchone()
-
-            if not existing_profile:
-                debug_log(f"Creating NEW profile for user {user_id}")
-                c.execute('''INSERT INTO user_profiles
-                            (user_id, username, first_name, total_submissions, approved_submissions,
-                             rejected_submissions, pending_submissions, revoked_submissions)
-                            VALUES (?, ?, ?, 0, 0, 0, 0, 0)''',
-                         (user_id, None, None))
-                conn.commit()
-                debug_log("New profile created successfully")
+            c.execute('''INSERT OR IGNORE INTO user_profiles
+                        (user_id, username, first_name, total_submissions, approved_submissions,
+                         rejected_submissions, pending_submissions, revoked_submissions)
+                        VALUES (?, ?, ?, 0, 0, 0, 0, 0)''',
+                     (user_id, None, None))
+            if c.rowcount:
+                debug_log("Created new profile", logging.DEBUG, user_id=user_id)
 
-            c.execute('''SELECT total_submissions, pending_submissions, approved_submissions,
-                                rejected_submissions, revoked_submissions
-                         FROM user_profiles WHERE user_id=?''', (user_id,))
-            before = c.fetchone()
-            debug_log(f"BEFORE - Total: {before['total_submissions']}, Pending: {before['pending_submissions']}, Approved: {before['approved_submissions']}, Rejected: {before['rejected_submissions']}, Revoked: {before['revoked_submissions']}")
+            if debug:
+                log_submission_stats(c, user_id, "BEFORE")
 
             if is_new_submission:
                 c.execute('''UPDATE user_profiles
@@ -5620,51 +7399,33 @@ def update_submission_stats(user_id, status_change, is_new_submission=False):
                                 pending_submissions = pending_submissions + 1,
                                 updated_at = CURRENT_TIMESTAMP
                             WHERE user_id = ?''', (user_id,))
-                debug_log("ACTION: Incremented total and pending for new submission")
-            else:
-                if status_change == 'approved':
-                    c.execute('''UPDATE user_profiles
-                                SET pending_submissions = pending_submissions - 1,
-                                    approved_submissions = approved_submissions + 1,
-                                    updated_at = CURRENT_TIMESTAMP
-                                WHERE user_id = ?''', (user_id,))
-                    debug_log("ACTION: Moved from pending to approved")
-                elif status_change == 'rejected':
-                    c.execute('''UPDATE user_profiles
-                                SET pending_submissions = pending_submissions - 1,
-                                    rejected_submissions = rejected_submissions + 1,
-                                    updated_at = CURRENT_TIMESTAMP
-                                WHERE user_id = ?''', (user_id,))
-                    debug_log("ACTION: Moved from pending to rejected")
-                elif status_change == 'revoked':
-                    c.execute('''UPDATE user_profiles
-                                SET approved_submissions = approved_submissions - 1,
-                                    revoked_submissions = revoked_submissions + 1,
-                                    updated_at = CURRENT_TIMESTAMP
-                                WHERE user_id = ?''', (user_id,))
-                    debug_log("ACTION: Moved from approved to revoked")
-
-            c.execute('''SELECT total_submissions, pending_submissions, approved_submissions,
-                                rejected_submissions, revoked_submissions
-                         FROM user_profiles WHERE user_id=?''', (user_id,))
-            after_before_commit = c.fetchone()
-            debug_log(f"AFTER (before commit) - Total: {after_before_commit['total_submissions']}, Pending: {after_before_commit['pending_submissions']}, Approved: {after_before_commit['approved_submissions']}, Rejected: {after_before_commit['rejected_submissions']}, Revoked: {after_before_commit['revoked_submissions']}")
-
-            conn.commit()
-            debug_log("Transaction committed successfully")
+            elif status_change == 'approved':
+                c.execute('''UPDATE user_profiles
+                            SET pending_submissions = pending_submissions - 1,
+                                approved_submissions = approved_submissions + 1,
+                                updated_at = CURRENT_TIMESTAMP
+                            WHERE user_id = ?''', (user_id,))
+            elif status_change == 'rejected':
+                c.execute('''UPDATE user_profiles
+                            SET pending_submissions = pending_submissions - 1,
+                                rejected_submissions = rejected_submissions + 1,
+                                updated_at = CURRENT_TIMESTAMP
+                            WHERE user_id = ?''', (user_id,))
+            elif status_change == 'revoked':
+                c.execute('''UPDATE user_profiles
+                            SET approved_submissions = approved_submissions - 1,
+                                revoked_submissions = revoked_submissions + 1,
+                                updated_at = CURRENT_TIMESTAMP
+                            WHERE user_id = ?''', (user_id,))
 
-            c.execute('''SELECT total_submissions, pending_submissions, approved_submissions,
-                                rejected_submissions, revoked_submissions
-                         FROM user_profiles WHERE user_id=?''', (user_id,))
-            after_commit = c.fetchone()
-            debug_log(f"AFTER (after commit) - Total: {after_commit['total_submissions']}, Pending: {after_commit['pending_submissions']}, Approved: {after_commit['approved_submissions']}, Rejected: {after_commit['rejected_submissions']}, Revoked: {after_commit['revoked_submissions']}")
+            if debug:
+                log_submission_stats(c, user_id, "AFTER")
 
-            debug_log(f"=== END UPDATE SUBMISSION STATS ===")
+            conn.commit()
 
     except Exception as e:
-        debug_log(f"Error updating submission stats: {str(e)}")
-        import traceback
-        debug_log(f"Traceback: {traceback.format_exc()}")
+        debug_log(f"Error updating submission stats: {str(e)}", logging.ERROR, user_id=user_id)
+        logger.debug("Submission stats traceback", exc_info=True)
 
 def get_user_profile(user_id):
     try:
@@ -5718,14 +7479,12 @@ def handle_profile(update: Update, context: CallbackContext):
         ]
 
         try:
-            profile_photos = context.bot.get_user_profile_photos(user_id, limit=1)
-
-            if profile_photos and profile_photos.total_count > 0:
-                photo_file = profile_photos.photos[0][-1]  
+            photo_id = get_profile_photo_id(context.bot, user_id)
 
+            if photo_id:
                 context.bot.send_photo(
                     chat_id=update.effective_chat.id,
-                    photo=photo_file.file_id,
+                    photo=photo_id,
                     caption="\n".join(profile_html),
                     parse_mode='HTML'
                 )
@@ -5809,7 +7568,7 @@ def handle_admin_message(update: Update, context: CallbackContext):
 
 def find_user_id_by_username(username):
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
             c.execute('SELECT user_id FROM verified_users WHERE username = ?', (username,))
             result = c.fetchone()
@@ -5830,7 +7589,7 @@ def handle_cleanup(update: Update, context: CallbackContext):
             conn.commit()
         update.message.reply_text("✅ Database cleanup completed")
     except Exception as e:
-        debug_log(f"Cleanup failed: {str(e)}")
+        debug_log(f"Cleanup failed: {str(e)}", logging.WARNING)
         update.message.reply_text("❌ Cleanup failed")
 
 def cancel_post_item(update: Update, context: CallbackContext):
@@ -5889,12 +7648,12 @@ def error_handler(update: Update, context: CallbackContext):
         
     # Handle specific network errors
     if isinstance(error, telegram.error.NetworkError):
-        debug_log(f"Network error occurred: {str(error)}")
+        debug_log(f"Network error occurred: {str(error)}", logging.WARNING)
         # Don't show error message to user for network issues
         return
         
     if isinstance(error, telegram.error.TimedOut):
-        debug_log(f"Request timed out: {str(error)}")
+        debug_log(f"Request timed out: {str(error)}", logging.WARNING)
         return
     if isinstance(error, telegram.error.BadRequest):
         if "Query is too old" in str(error):
@@ -6003,14 +7762,14 @@ def safe_reply(update: Update, message: str, **kwargs):
 
 def cleanup_verification_requests():
     try:
-        with db_connection('verified_users.db') as conn:
+        with db_connection() as conn:
             # Delete requests older than 7 days
             conn.execute('''DELETE FROM verification_requests
                            WHERE request_date < datetime('now', '-7 days')''')
             conn.commit()
             debug_log("Cleaned up old verification requests")
     except Exception as e:
-        debug_log(f"Verification cleanup failed: {str(e)}")
+        debug_log(f"Verification cleanup failed: {str(e)}", logging.WARNING)
 
 
 
@@ -6081,7 +7840,7 @@ def add_admin(update: Update, context: CallbackContext):
 
     try:
         # Add to database
-        with db_connection('auctions.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
             
             # Ensure table exists
@@ -6100,6 +7859,7 @@ def add_admin(update: Update, context: CallbackContext):
         # Update in-memory admin list
         if target_user.id not in ADMINS:
             ADMINS.append(target_user.id)
+        ADMIN_FILTER.add_user_ids(target_user.id)
         
         # Update bot commands for the new admin
         try:
@@ -6121,6 +7881,8 @@ def add_admin(update: Update, context: CallbackContext):
                      "• /removebid - Remove last bid\n"
                      "• /removeitem - Remove item from auction\n"
                      "• /broad - Broadcast message\n"
+                     "• /broad_cancel - Cancel running broadcast\n"
+                     "• /unreachable - Unreachable users report\n"
                      "• /unverify - Unverify user\n"
                      "• /msg - Message specific user\n"
                      "• /addadmin - Add new admin\n"
@@ -6137,7 +7899,7 @@ def add_admin(update: Update, context: CallbackContext):
         )
 
         # Log the action
-        debug_log(f"Admin {update.effective_user.id} added new admin {target_user.id}")
+        debug_log(f"Admin {update.effective_user.id} added new admin {target_user.id}", logging.INFO)
 
     except Exception as e:
         debug_log(f"Error adding admin: {str(e)}")
@@ -6189,7 +7951,7 @@ def remove_admin(update: Update, context: CallbackContext):
 
     try:
         # Remove from database
-        with db_connection('auctions.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
             
             # Ensure table exists
@@ -6205,6 +7967,7 @@ def remove_admin(update: Update, context: CallbackContext):
         # Remove from in-memory list
         if target_user_id in ADMINS:
             ADMINS.remove(target_user_id)
+        ADMIN_FILTER.remove_user_ids(target_user_id)
         
         # Reset bot commands for the removed admin to user commands only
         try:
@@ -6240,7 +8003,7 @@ def remove_admin(update: Update, context: CallbackContext):
         )
 
         # Log the action
-        debug_log(f"Admin {remover_id} removed admin {target_user_id}")
+        debug_log(f"Admin {remover_id} removed admin {target_user_id}", logging.INFO)
 
     except Exception as e:
         debug_log(f"Error removing admin: {str(e)}")
@@ -6250,7 +8013,7 @@ def remove_admin(update: Update, context: CallbackContext):
 def list_admins(update: Update, context: CallbackContext):
     """List all bot admins"""
     try:
-        with db_connection('auctions.db') as conn:
+        with db_connection() as conn:
             c = conn.cursor()
             
             # First, ensure the table exists
@@ -6275,8 +8038,7 @@ def list_admins(update: Update, context: CallbackContext):
         response.append("\n<b>Original Admins (from config):</b>")
         for admin_id in env_admin_ids:
             try:
-                user = context.bot.get_chat(admin_id)
-                username = f"@{user.username}" if user.username else user.first_name
+                username = user_display_name(get_user_info(context.bot, admin_id))
                 response.append(f"• {username} (ID: <code>{admin_id}</code>)")
             except Exception as e:
                 debug_log(f"Could not get chat info for admin {admin_id}: {e}")
@@ -6295,8 +8057,7 @@ def list_admins(update: Update, context: CallbackContext):
                 added_by_username = "Unknown"
                 if added_by and added_by != "Unknown":
                     try:
-                        added_by_user = context.bot.get_chat(added_by)
-                        added_by_username = f"@{added_by_user.username}" if added_by_user.username else added_by_user.first_name
+                        added_by_username = user_display_name(get_user_info(context.bot, added_by))
                     except:
                         added_by_username = f"user_{added_by}"
                 
@@ -6370,7 +8131,7 @@ def update_category_setting(category, enabled):
                          SET enabled = ?, updated_at = CURRENT_TIMESTAMP
                          WHERE category = ?''', (1 if enabled else 0, category))
             conn.commit()
-            debug_log(f"Updated {category} submission setting to {enabled}")
+            debug_log(f"Updated {category} submission setting to {enabled}", logging.INFO)
             return True
     except Exception as e:
         debug_log(f"Error updating category setting: {str(e)}")
@@ -6414,16 +8175,8 @@ def handle_admin_bid_amount(update: Update, context: CallbackContext):
         )
         return
     
-    # Process the bid (same logic as regular bid handler)
+    # Process the bid through the same engine as the regular bid handler
     try:
-        with db_connection() as conn:
-            auctions_open = conn.execute("SELECT auctions_open FROM system_status WHERE id=1").fetchone()[0]
-            
-        if not auctions_open:
-            update.message.reply_text("❌ Auctions are currently closed. Bidding is not allowed.")
-            context.user_data.pop('bid_context', None)
-            return
-
         bid_text = update.message.text.replace(',', '').strip()
         bid_amount = parse_bid_amount(bid_text)
 
@@ -6435,115 +8188,10 @@ def handle_admin_bid_amount(update: Update, context: CallbackContext):
             return
 
         bid_context = context.user_data['bid_context']
-
-        auction = get_auction(bid_context['auction_id'])
-        if not auction:
-            update.message.reply_text("❌ This auction no longer exists.")
-            context.user_data.pop('bid_context', None)
-            return
-
-        current_amount = auction.get('current_bid') or auction.get('base_price', 0)
-        min_bid = current_amount + get_min_increment(current_amount)
-
-        bid_amount_int = int(bid_amount)
-        current_amount_int = int(current_amount)
-        min_bid_int = int(min_bid)
-
-        debug_log(f"ADMIN BID DEBUG: bid_amount_int={bid_amount_int}, current_amount_int={current_amount_int}, min_bid_int={min_bid_int}")
-
-        if bid_amount_int < min_bid_int:
-            current_formatted = format_bid_amount(current_amount)
-            min_formatted = format_bid_amount(min_bid)
-            increment_formatted = format_bid_amount(get_min_increment(current_amount))
-
-            debug_log(f"ADMIN BID REJECTED: {bid_amount_int} < {min_bid_int}")
-
-            update.message.reply_text(
-                f"❌ Bid must be at least {min_formatted}\n"
-                f"Current bid: {current_formatted}\n"
-                f"Minimum increment: {increment_formatted}\n\n"
-                f"💡 Your bid: {format_bid_amount(bid_amount)}"
-            )
-            return
-
         bidder_name = f"@{update.effective_user.username}" if update.effective_user.username else update.effective_user.first_name
-        prev_bidder, auction_id = record_bid(
-            bid_context['auction_id'],
-            update.effective_user.id,
-            bidder_name,
-            bid_amount_int, 
-            context
-        )
-
-        context.user_data.pop('bid_context', None)
-
-        updated_auction = get_auction(bid_context['auction_id'])
-        if not updated_auction:
-            update.message.reply_text("❌ Error updating auction.")
-            return
-
-        caption = format_auction(updated_auction)
-
-        bot_username = context.bot.username
-        deep_link = f"https://t.me/{bot_username}?start=bid_{updated_auction['auction_id']}"
-
-        keyboard = [[
-            InlineKeyboardButton("🔄 Refresh", callback_data=f"refresh_{updated_auction['auction_id']}"),
-            InlineKeyboardButton("💰 Place Bid", url=deep_link)
-        ]]
-
-        try:
-            if updated_auction.get('photo_id'):
-                context.bot.edit_message_caption(
-                    chat_id=CHANNEL_ID,
-                    message_id=bid_context['channel_msg_id'],
-                    caption=caption,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='HTML'
-                )
-            else:
-                context.bot.edit_message_text(
-                    chat_id=CHANNEL_ID,
-                    message_id=bid_context['channel_msg_id'],
-                    text=caption,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='HTML'
-                )
-        except Exception as e:
-            debug_log(f"Channel update failed: {str(e)}")
-            try:
-                plain_caption = caption.replace('<br>', '\n').replace('<a href="', '').replace('">', ' ').replace('</a>', '')
-                if updated_auction.get('photo_id'):
-                    context.bot.edit_message_caption(
-                        chat_id=CHANNEL_ID,
-                        message_id=bid_context['channel_msg_id'],
-                        caption=plain_caption,
-                        reply_markup=InlineKeyboardMarkup(keyboard)
-                    )
-                else:
-                    context.bot.edit_message_text(
-                        chat_id=CHANNEL_ID,
-                        message_id=bid_context['channel_msg_id'],
-                        text=plain_caption,
-                        reply_markup=InlineKeyboardMarkup(keyboard)
-                    )
-            except Exception as fallback_error:
-                debug_log(f"Fallback update failed: {str(fallback_error)}")
-
-        if prev_bidder and prev_bidder[0] != update.effective_user.id:
-            try:
-                send_outbid_notification(
-                    context,
-                    prev_bidder,
-                    bid_context['item_text'],
-                    bid_amount_int,
-                    auction_id
-                )
-            except Exception as e:
-                debug_log(f"Couldn't notify outbid user: {str(e)}")
 
-        formatted_bid = format_bid_amount(bid_amount)
-        update.message.reply_text(f"✅ Your bid of {formatted_bid} has been placed!")
+        result = place_bid(bid_context['auction_id'], current_admin_id, bidder_name, int(bid_amount))
+        finish_bid(update, context, bid_context, result, bid_amount, bidder_name)
 
     except ValueError:
         update.message.reply_text(
@@ -6578,7 +8226,8 @@ def ban_user(user_id, banned_by_admin_id, reason="No reason provided"):
                          (user_id, banned_by_admin_id, reason))
             
             conn.commit()
-            debug_log(f"User {user_id} banned by admin {banned_by_admin_id}")
+            set_cached_banned(user_id, True)
+            debug_log(f"User {user_id} banned by admin {banned_by_admin_id}", logging.INFO)
             return True
     except Exception as e:
         debug_log(f"Error banning user {user_id}: {str(e)}")
@@ -6597,7 +8246,8 @@ def unban_user(user_id):
                              updated_at = CURRENT_TIMESTAMP
                          WHERE user_id = ?''', (user_id,))
             conn.commit()
-            debug_log(f"User {user_id} unbanned")
+            set_cached_banned(user_id, False)
+            debug_log(f"User {user_id} unbanned", logging.INFO)
             return c.rowcount > 0
     except Exception as e:
         debug_log(f"Error unbanning user {user_id}: {str(e)}")
@@ -6606,11 +8256,8 @@ def unban_user(user_id):
 def is_user_banned(user_id):
     """Check if a user is banned"""
     try:
-        with profile_connection() as conn:
-            c = conn.cursor()
-            c.execute('''SELECT is_banned FROM user_profiles WHERE user_id = ?''', (user_id,))
-            result = c.fetchone()
-            return bool(result and result['is_banned'])
+        ensure_auth_cache()
+        return user_id in AUTH_CACHE['banned']
     except Exception as e:
         debug_log(f"Error checking ban status for user {user_id}: {str(e)}")
         return False
@@ -6646,6 +8293,7 @@ def get_ban_info(user_id):
 
 def check_not_banned(func):
     """Decorator to check if user is banned before executing any command"""
+    @functools.wraps(func)
     def wrapper(update: Update, context: CallbackContext):
         user_id = update.effective_user.id
         
@@ -6766,7 +8414,7 @@ def ban_user_command(update: Update, context: CallbackContext):
         )
         
         # Log the action
-        debug_log(f"Admin {admin_id} banned user {target_user_id} for: {reason}")
+        debug_log(f"Admin {admin_id} banned user {target_user_id} for: {reason}", logging.INFO)
     else:
         update.message.reply_text("❌ Failed to ban user. Check logs for details.")
 
@@ -6830,7 +8478,7 @@ def unban_user_command(update: Update, context: CallbackContext):
         )
         
         # Log the action
-        debug_log(f"Admin {admin_id} unbanned user {target_user_id}")
+        debug_log(f"Admin {admin_id} unbanned user {target_user_id}", logging.INFO)
     else:
         update.message.reply_text("❌ Failed to unban user. Check logs for details.")
 
@@ -7149,12 +8797,9 @@ def verify_user_owns_item(user_id, auction_id, item_type):
             # Check if user bought this item
             with db_connection() as conn:
                 c = conn.cursor()
-                c.execute('''SELECT 1 FROM bids 
-                            WHERE auction_id = ? AND bidder_id = ? 
-                            AND is_active = 1 
-                            AND amount = (
-                                SELECT MAX(amount) FROM bids WHERE auction_id = ?
-                            )''', (auction_id, user_id, auction_id))
+                c.execute('''SELECT 1 FROM auctions 
+                            WHERE auction_id = ? AND current_bidder_id = ? 
+                            AND winning_bid_id IS NOT NULL''', (auction_id, user_id))
                 return c.fetchone() is not None
                 
         elif item_type == 'sold':
@@ -7235,44 +8880,19 @@ def show_bought_items(query, context, user_id, index=0):
         index = len(bought_items) - 1
     
     item = bought_items[index]
+    auction_id = item['auction_id']
+    channel_msg_id = item['channel_message_id']
+    price = item['price']
+    created_at = item['created_at']
+
+    # The auction's photo is the Pokémon's nature page; TMs have none
+    item_name = get_item_name(item)
+    pokemon_image = item['photo_id'] if item['category'] != 'tms' else None
+    has_image = bool(pokemon_image)
+    if item['category'] != 'tms' and not pokemon_image:
+        debug_log(f"No image found for Pokemon: {item_name}")
     
-    # Handle both old (6 values) and new (7 values) tuple formats
-    if len(item) == 7:
-        auction_id, item_text, channel_msg_id, price, submission_data, created_at, auction_status = item
-    else:
-        # Fallback for old format
-        auction_id, item_text, channel_msg_id, price, submission_data, created_at = item
-        auction_status = 'ended'  # Default value
-    
-    # Parse submission data
-    try:
-        submission_data = json.loads(submission_data) if submission_data else {}
-    except:
-        submission_data = {}
-    
-    # Get item details - FIXED: Always get image from submission_data
-    if submission_data.get('category') == 'tms':
-        item_name = "TM"
-        has_image = False
-        pokemon_image = None
-    else:
-        item_name = submission_data.get('pokemon_name', 'Unknown Pokémon')
-        has_image = True
-        # FIXED: Always get image from nature data
-        pokemon_image = submission_data.get('nature', {}).get('photo')
-        if not pokemon_image:
-            has_image = False
-            debug_log(f"No image found for Pokemon: {item_name}")
-    
-    # Get channel message link
-    try:
-        channel_entity = context.bot.get_chat(CHANNEL_ID)
-        channel_username = channel_entity.username
-        if not channel_username:
-            channel_username = f"c/{str(CHANNEL_ID).replace('-100', '')}"
-        message_link = f"https://t.me/{channel_username}/{channel_msg_id}" if channel_msg_id else None
-    except:
-        message_link = None
+    message_link = channel_post_link(channel_msg_id, context.bot)
     
     # Create response
     response = [
@@ -7432,50 +9052,20 @@ def show_sold_items(query, context, user_id, index=0):
         index = len(sold_items) - 1
     
     item = sold_items[index]
+    auction_id = item['auction_id']
+    channel_msg_id = item['channel_message_id']
+    sale_price = item['sale_price']
+    base_price = item['base_price']
+    created_at = item['created_at'] or 'Unknown'
+
+    # The auction's photo is the Pokémon's nature page; TMs have none
+    item_name = get_item_name(item)
+    pokemon_image = item['photo_id'] if item['category'] != 'tms' else None
+    has_image = bool(pokemon_image)
+    if item['category'] != 'tms' and not pokemon_image:
+        debug_log(f"No image found for Pokemon: {item_name}")
     
-    # CORRECTED: get_user_sold_items returns 6 values
-    if len(item) >= 6:
-        auction_id = item[0]
-        item_text = item[1]
-        channel_msg_id = item[2]
-        sale_price = item[3]
-        base_price = item[4]
-        submission_data = item[5]
-        created_at = item[6] if len(item) > 6 else 'Unknown'
-    else:
-        debug_log(f"Unexpected item format: {len(item)} values")
-        query.answer("❌ Error loading item data!", show_alert=True)
-        return
-    
-    # Parse submission data
-    try:
-        submission_data = json.loads(submission_data) if submission_data else {}
-    except:
-        submission_data = {}
-    
-    # Get item details - FIXED: Always get image from submission_data
-    if submission_data.get('category') == 'tms':
-        item_name = "TM"
-        has_image = False
-        pokemon_image = None
-    else:
-        item_name = submission_data.get('pokemon_name', 'Unknown Pokémon')
-        has_image = True
-        # FIXED: Always get image from nature data
-        pokemon_image = submission_data.get('nature', {}).get('photo')
-        if not pokemon_image:
-            has_image = False
-            debug_log(f"No image found for Pokemon: {item_name}")
-    
-    # Get channel message link
-    try:
-        channel_entity = context.bot.get_chat(CHANNEL_ID)
-        channel_username = channel_entity.username
-        if not channel_username:
-            channel_username = f"c/{str(CHANNEL_ID).replace('-100', '')}"
-        message_link = f"https://t.me/{channel_username}/{channel_msg_id}" if channel_msg_id else None
-    except:
-        message_link = None
+    message_link = channel_post_link(channel_msg_id, context.bot)
     
     # Calculate profit
     profit = sale_price - base_price
@@ -7783,7 +9373,7 @@ def show_item_details(query, context, auction_id, item_type, user_id):
     except Exception as e:
         debug_log(f"Error showing item details: {str(e)}")
         import traceback
-        debug_log(f"Traceback: {traceback.format_exc()}")
+        debug_log(f"Traceback: {traceback.format_exc()}", logging.WARNING)
         query.answer("❌ Error loading item details!", show_alert=True)
 
 def handle_mypoke_bought(update: Update, context: CallbackContext):
@@ -7883,6 +9473,274 @@ def handle_mypoke_back(update: Update, context: CallbackContext, user_id):
 
 
 
+# Handler watchdog. Every instrumented handler call is registered here while it
+# runs; check_slow_handlers (a repeating job, so it runs off the dispatcher
+# thread) reports any call older than HANDLER_WATCHDOG_SECONDS with its stack.
+HANDLER_WATCHDOG_SECONDS = float(os.getenv("HANDLER_WATCHDOG_SECONDS", "2"))
+
+running_handlers = {}  # thread id -> {'handler', 'user_id', 'started', 'reported'}
+running_handlers_lock = threading.Lock()
+
+def check_slow_handlers(context=None):
+    now = time.perf_counter()
+    with running_handlers_lock:
+        slow = [(thread_id, call) for thread_id, call in running_handlers.items()
+                if not call['reported'] and now - call['started'] > HANDLER_WATCHDOG_SECONDS]
+        for _, call in slow:
+            call['reported'] = True
+
+    frames = sys._current_frames() if slow else {}
+    for thread_id, call in slow:
+        inc_metric('pokeauction_slow_handlers_total', (('handler', call['handler']),))
+        frame = frames.get(thread_id)
+        where = "".join(traceback.format_stack(frame, limit=4)).rstrip() if frame else "unknown"
+        debug_log(f"Handler {call['handler']} has held a worker for {now - call['started']:.1f}s",
+                  logging.WARNING, handler=call['handler'], user_id=call['user_id'])
+        logger.debug(f"Slow handler {call['handler']} is at:\n{where}")
+
+# Update lanes. The dispatcher thread only routes: every update joins the lane of
+# the user it comes from, and lanes run on a shared pool of UPDATE_WORKERS
+# threads. A lane runs one update at a time in arrival order, so a user's quick
+# messages can't race on user_data or conversation state, while different users
+# run in parallel. A lane already holding UPDATE_LANE_MAX_DEPTH updates drops
+# new ones, so one flooding user can't queue up work for every worker.
+#
+# Anything keyed by something other than the user is shared across lanes and
+# needs its own guard:
+#   * auctions: place_bid holds the auction's lock and compare-and-sets
+#     state_version, which every other writer (/removebid, approval) bumps, and
+#     Refresh and the caption cache go by (auction_id, state_version)
+#   * the post scheduler, auth caches, user info/photo caches, unreachable
+#     users, side-effect stats and metrics: module-level locks
+#   * broadcast and settlement job registries: their *_threads_lock
+#   * verification requests and submissions, which any admin can act on: the
+#     admin handlers claim them with a conditional DELETE/UPDATE/INSERT and
+#     check the rowcount, and bot_data verification entries are pop()ed
+#   * rejection contexts live in the database; the rejection itself claims the
+#     submission the same way
+UPDATE_WORKERS = int(os.getenv("UPDATE_WORKERS", "16"))
+UPDATE_LANE_MAX_DEPTH = int(os.getenv("UPDATE_LANE_MAX_DEPTH", "20"))
+
+def update_lane_key(update):
+    """The user an update belongs to, else its chat; anything else shares one lane"""
+    if isinstance(update, Update):
+        if update.effective_user:
+            return update.effective_user.id
+        if update.effective_chat:
+            return update.effective_chat.id
+    return None
+
+class LaneDispatcher(Dispatcher):
+    """Dispatcher that runs updates in per-user serial lanes on a thread pool"""
+
+    def __init__(self, *args, lane_workers=UPDATE_WORKERS, lane_max_depth=UPDATE_LANE_MAX_DEPTH, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lane_max_depth = lane_max_depth
+        self.lanes = {}  # key -> deque of updates, the first one running; present only while scheduled
+        self.lanes_lock = threading.Lock()
+        self.lane_pool = concurrent.futures.ThreadPoolExecutor(max_workers=lane_workers,
+                                                               thread_name_prefix='update-lane')
+
+    def process_update(self, update):
+        key = update_lane_key(update)
+        with self.lanes_lock:
+            lane = self.lanes.get(key)
+            if lane is None:
+                lane = self.lanes[key] = deque([update])
+            elif len(lane) >= self.lane_max_depth:
+                inc_metric('pokeauction_lane_dropped_total', ())
+                sampled_log(f'lane_full:{key}', f"Dropping update for lane {key}: {len(lane)} already waiting",
+                            logging.WARNING)
+                return
+            else:
+                lane.append(update)
+                return
+        self.lane_pool.submit(self.run_lane, key, lane)
+
+    def run_lane(self, key, lane):
+        while True:
+            update = lane[0]
+            try:
+                super().process_update(update)
+            except Exception as e:
+                debug_log(f"Error processing update in lane {key}: {str(e)}")
+            with self.lanes_lock:
+                lane.popleft()
+                if not lane:
+                    del self.lanes[key]
+                    return
+
+    def lane_backlog(self):
+        with self.lanes_lock:
+            return len(self.lanes), sum(len(lane) for lane in self.lanes.values())
+
+    def stop(self):
+        super().stop()
+        # Let every lane finish what it already accepted
+        self.lane_pool.shutdown(wait=True)
+
+def instrument_handler(name, callback):
+    """Wrap a handler callback to record its latency and errors"""
+    labels = (('handler', name),)
+
+    @functools.wraps(callback)
+    def wrapper(update, context):
+        started = time.perf_counter()
+        user = getattr(update, 'effective_user', None)
+        thread_id = threading.get_ident()
+        call = {'handler': name, 'user_id': user.id if user else None, 'started': started, 'reported': False}
+        with running_handlers_lock:
+            outer = running_handlers.get(thread_id)
+            running_handlers[thread_id] = call
+        try:
+            with logging_fields(handler=name, user_id=user.id if user else None):
+                return callback(update, context)
+        except Exception:
+            inc_metric('pokeauction_handler_errors_total', labels)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with running_handlers_lock:
+                if outer is None:
+                    running_handlers.pop(thread_id, None)
+                else:
+                    running_handlers[thread_id] = outer
+            if call['reported']:
+                debug_log(f"Slow handler {name} finished after {elapsed:.1f}s", logging.WARNING)
+            observe('pokeauction_handler_seconds', labels, elapsed)
+    return wrapper
+
+def handler_metric_name(handler):
+    name = getattr(handler.callback, '__name__', 'handler')
+    if isinstance(handler, CommandHandler):
+        return f"/{handler.command[0]}"
+    if isinstance(handler, CallbackQueryHandler):
+        return f"callback:{name}"
+    return f"message:{name}"
+
+def instrument_handlers(handlers, prefix=""):
+    for handler in handlers:
+        if isinstance(handler, ConversationHandler):
+            conversation = handler.name or "add"
+            instrument_handlers(handler.entry_points, f"{conversation}:")
+            for state, state_handlers in handler.states.items():
+                instrument_handlers(state_handlers, f"{conversation}:{state}:")
+            instrument_handlers(handler.fallbacks, f"{conversation}:")
+        elif hasattr(handler, 'callback'):
+            handler.callback = instrument_handler(prefix + handler_metric_name(handler), handler.callback)
+
+def instrument_dispatcher(dispatcher):
+    """Instrument every handler registered on the dispatcher"""
+    for group_handlers in dispatcher.handlers.values():
+        instrument_handlers(group_handlers)
+
+def runtime_gauges(dispatcher):
+    active_lanes, lane_backlog = dispatcher.lane_backlog()
+    gauges = [
+        ('pokeauction_dispatcher_backlog', "Updates waiting for the dispatcher", (), dispatcher.update_queue.qsize()),
+        ('pokeauction_update_lanes', "Users with updates running or waiting", (), active_lanes),
+        ('pokeauction_lane_backlog', "Updates running or waiting in lanes", (), lane_backlog),
+        ('pokeauction_outbound_queue_depth', "Requests waiting in the outbound queue", (), outbound_queue.depth()),
+        ('pokeauction_side_effect_queue_depth', "Events waiting for side-effect workers", (), side_effect_queue.qsize()),
+        ('pokeauction_pending_post_updates', "Channel posts waiting for an edit", (), len(pending_post_updates)),
+        ('pokeauction_pending_bid_logs', "Bid log entries waiting to be posted", (), len(bid_log_entries)),
+        ('pokeauction_dispatcher_running', "1 while the dispatcher is running", (), int(dispatcher.running)),
+    ]
+    with side_effect_stats_lock:
+        for name, stats in side_effect_stats.items():
+            for outcome, value in stats.items():
+                gauges.append(('pokeauction_side_effects', "Side-effect events by outcome (cumulative)",
+                               (('event', name), ('outcome', outcome)), value))
+    with outbound_queue.cond:
+        for outcome, value in outbound_queue.stats.items():
+            gauges.append(('pokeauction_outbound', "Outbound queue requests by outcome (cumulative)",
+                           (('outcome', outcome),), value))
+    return gauges
+
+def check_health(dispatcher):
+    """Readiness: the database answers and the dispatcher is running"""
+    checks = {}
+    try:
+        with db_connection() as conn:
+            conn.execute("SELECT 1").fetchone()
+        checks['database'] = True
+    except Exception as e:
+        debug_log(f"Health check: database unreachable: {str(e)}", logging.WARNING)
+        checks['database'] = False
+    checks['dispatcher'] = bool(dispatcher.running)
+    return all(checks.values()), checks
+
+class SecretWebhookHandler(WebhookHandler):
+    """python-telegram-bot's webhook handler plus the secret token check PTB 13 doesn't do"""
+
+    def _validate_post(self):
+        super()._validate_post()
+        received = self.request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+        if not hmac.compare_digest(received, WEBHOOK_SECRET):
+            raise tornado.web.HTTPError(403)
+
+def start_builtin_webhook_server(updater):
+    """Serve the webhook on WEBHOOK_PORT; returns the server, or None if it didn't come up"""
+    app = tornado.web.Application([(rf"/{WEBHOOK_PATH}/?", SecretWebhookHandler,
+                                    {'bot': updater.bot, 'update_queue': updater.update_queue})])
+    server = WebhookServer('0.0.0.0', WEBHOOK_PORT, app, None)
+    ready = threading.Event()
+    threading.Thread(target=server.serve_forever, kwargs={'ready': ready}, name="webhook-server", daemon=True).start()
+    if not ready.wait(10):
+        return None
+    return server
+
+def start_dispatching(updater):
+    """What start_polling() would start, minus the polling thread"""
+    updater.job_queue.start()
+    threading.Thread(target=updater.dispatcher.start, name="dispatcher", daemon=True).start()
+    updater.running = True
+
+def start_receiving_updates(updater):
+    """Start the webhook or long polling according to BOT_MODE.
+
+    The webhook endpoint is up and registered with Telegram before the
+    dispatcher starts; if either step fails the bot falls back to polling.
+    """
+    bot = updater.bot
+    if BOT_MODE == 'webhook' and not WEBHOOK_URL:
+        debug_log("BOT_MODE=webhook needs WEBHOOK_URL - falling back to polling", logging.WARNING)
+    elif BOT_MODE == 'webhook' and WEBHOOK_SERVER == 'builtin':
+        server = start_builtin_webhook_server(updater)
+        if server is None:
+            debug_log(f"Webhook server didn't start on port {WEBHOOK_PORT} - falling back to polling", logging.WARNING)
+        else:
+            try:
+                bot.set_webhook(url=f"{WEBHOOK_URL}/{WEBHOOK_PATH}", secret_token=WEBHOOK_SECRET)
+                updater.httpd = server
+                start_dispatching(updater)
+                debug_log(f"Receiving updates by webhook on port {WEBHOOK_PORT}", logging.INFO)
+                return
+            except Exception as e:
+                server.shutdown()
+                debug_log(f"Couldn't set the webhook ({str(e)}) - falling back to polling", logging.WARNING)
+    elif BOT_MODE == 'webhook' and not KEEP_ALIVE_AVAILABLE:
+        debug_log("Keep-alive server not available for the webhook - falling back to polling", logging.WARNING)
+    elif BOT_MODE == 'webhook':
+        update_queue = updater.update_queue
+
+        def enqueue_update(data):
+            update_queue.put(Update.de_json(data, bot))
+
+        set_webhook_handler(WEBHOOK_PATH, enqueue_update, WEBHOOK_SECRET)
+        try:
+            bot.set_webhook(url=f"{WEBHOOK_URL}/telegram/{WEBHOOK_PATH}", secret_token=WEBHOOK_SECRET)
+            start_dispatching(updater)
+            debug_log("Receiving updates by webhook on the keep-alive server", logging.INFO)
+            return
+        except Exception as e:
+            set_webhook_handler(WEBHOOK_PATH, None)
+            debug_log(f"Couldn't set the webhook ({str(e)}) - falling back to polling", logging.WARNING)
+
+    # start_polling() deletes any webhook left registered before it polls
+    updater.start_polling()
+    debug_log("Receiving updates by long polling", logging.INFO)
+
 def main():
 
     print("🚀 Starting Pokemon Auction Bot in Docker...")
@@ -7896,13 +9754,24 @@ def main():
 
     try:
         init_db()
-        init_verified_users_db()
-        init_leaderboard_db()
-        init_profiles_db()
         ensure_all_auctions_active()
         migrate_auction_status()
-
-        updater = Updater(token=TOKEN, use_context=True)
+        rebuild_winner_columns()
+        load_auth_cache()
+        load_unreachable_users()
+        ADMIN_FILTER.add_user_ids(ADMINS)
+
+        # Lane workers call the unthrottled endpoints directly, so they need connections too
+        request = Request(con_pool_size=OUTBOUND_SENDERS + UPDATE_WORKERS + 8)
+        api_urls = {}
+        if TELEGRAM_API_URL:
+            api_urls = {'base_url': f"{TELEGRAM_API_URL}/bot", 'base_file_url': f"{TELEGRAM_API_URL}/file/bot"}
+            debug_log(f"Using Bot API server at {TELEGRAM_API_URL}", logging.INFO)
+        job_queue = JobQueue()
+        dispatcher = LaneDispatcher(QueuedBot(TOKEN, request=request, **api_urls), queue.Queue(),
+                                    job_queue=job_queue, use_context=True)
+        job_queue.set_dispatcher(dispatcher)
+        updater = Updater(dispatcher=dispatcher, workers=None)
         dp = updater.dispatcher
 
         set_bot_commands(updater)
@@ -7910,7 +9779,8 @@ def main():
         try:
             bot = updater.bot
             chat = bot.get_chat(CHANNEL_ID)
-            debug_log(f"Bot connected to channel: {chat.title}")
+            cache_channel_info(chat)
+            debug_log(f"Bot connected to channel: {chat.title}", logging.INFO)
         except Exception as e:
             debug_log(f"FATAL: Channel access failed - {str(e)}")
             raise RuntimeError(f"Could not access channel {CHANNEL_ID}. Verify bot is admin.")
@@ -7918,10 +9788,22 @@ def main():
 
         job_queue = updater.job_queue
         job_queue.run_repeating(lambda context: cleanup_old_rejections(), interval=3600, first=10)
+        job_queue.run_repeating(flush_last_active, interval=LAST_ACTIVE_FLUSH_SECONDS, first=LAST_ACTIVE_FLUSH_SECONDS)
+        job_queue.run_repeating(check_slow_handlers, interval=max(HANDLER_WATCHDOG_SECONDS / 2, 0.5),
+                                first=HANDLER_WATCHDOG_SECONDS)
+        outbound_queue.start()
+        start_side_effect_workers()
+        start_post_updates()
+        start_bid_log_batcher(bot)
+        resume_broadcast_jobs(dp)
+        resume_settlement_jobs(dp)
 
 
         dp.add_error_handler(error_handler)
 
+        # Runs before every other handler group; only feeds the user info cache
+        dp.add_handler(TypeHandler(Update, remember_update_user), group=-1)
+
         # Command handlers
         dp.add_handler(CommandHandler("start", start))
         dp.add_handler(CommandHandler("history", show_bid_history))
@@ -7942,6 +9824,8 @@ def main():
         dp.add_handler(CommandHandler("topsellers", handle_topsellers))
         dp.add_handler(CommandHandler("help", show_help))
         dp.add_handler(CommandHandler("broad", broadcast_message))
+        dp.add_handler(CommandHandler("broad_cancel", cancel_broadcast))
+        dp.add_handler(CommandHandler("unreachable", unreachable_report))
         dp.add_handler(CommandHandler("profile", handle_profile))
         dp.add_handler(CommandHandler("msg", handle_admin_message))
         dp.add_handler(CommandHandler("cleanup", handle_cleanup))
@@ -8010,7 +9894,7 @@ def main():
         dp.add_handler(MessageHandler(
             Filters.text & 
             Filters.chat_type.private & 
-            Filters.user(ADMINS) &
+            ADMIN_FILTER &
             ~Filters.command,
             handle_submission_rejection_reason
         ))
@@ -8018,21 +9902,30 @@ def main():
             Filters.text & 
             Filters.chat_type.private & 
             ~Filters.command &
-            ~Filters.user(ADMINS),  # Regular users only
+            ~ADMIN_FILTER,  # Regular users only
             handle_bid_amount
         ))
         dp.add_handler(MessageHandler(
             Filters.text & 
             Filters.chat_type.private & 
-            Filters.user(ADMINS) &
+            ADMIN_FILTER &
             ~Filters.command,
             handle_admin_bid_amount
         ))
     
 
-        debug_log("Bot starting with all features...")
-        updater.start_polling()
+        instrument_dispatcher(dp)
+        if KEEP_ALIVE_AVAILABLE:
+            set_status_providers(lambda: render_metrics(runtime_gauges(dp)), lambda: check_health(dp))
+
+        debug_log("Bot starting with all features...", logging.INFO)
+        start_receiving_updates(updater)
         updater.idle()
+        stop_side_effect_workers()
+        stop_post_updates()
+        stop_bid_log_batcher()
+        flush_last_active()
+        close_all_connections()
 
     except Conflict:
         print("Error: Another instance is already polling updates")
@@ -4,24 +4,71 @@ Keep Alive Script for Docker Deployment
 """
 
 import os
+import hmac
 import threading
 import time
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request, abort
 
 app = Flask(__name__)
 
 PORT = int(os.environ.get('PORT', 10000))
 
+# Set by the bot when it runs in webhook mode (see set_webhook_handler)
+WEBHOOK = {'path': None, 'secret_token': None, 'handler': None}
+
+# Set by the bot once it is running (see set_status_providers)
+STATUS = {'metrics': None, 'health': None}
+
 @app.route('/')
 def home():
     return jsonify({"status": "active", "message": "🤖 Pokemon Auction Bot"})
 
 @app.route('/health')
 def health():
-    return jsonify({"status": "healthy"})
+    if not STATUS['health']:
+        return jsonify({"status": "starting"}), 503
+    try:
+        ready, checks = STATUS['health']()
+    except Exception as e:
+        return jsonify({"status": "unhealthy", "error": str(e)}), 503
+    return jsonify({"status": "healthy" if ready else "unhealthy", "checks": checks}), 200 if ready else 503
+
+@app.route('/metrics')
+def metrics():
+    if not STATUS['metrics']:
+        return Response("", mimetype='text/plain')
+    return Response(STATUS['metrics'](), mimetype='text/plain; version=0.0.4')
+
+def set_status_providers(metrics_provider, health_provider):
+    """metrics_provider() returns Prometheus text; health_provider() returns (ready, checks)"""
+    STATUS['metrics'] = metrics_provider
+    STATUS['health'] = health_provider
+
+@app.route('/telegram/<path:path>', methods=['POST'])
+def telegram_webhook(path):
+    handler = WEBHOOK['handler']
+    if not handler or not hmac.compare_digest(path, WEBHOOK['path']):
+        abort(404)
+    secret_token = WEBHOOK['secret_token']
+    if secret_token:
+        received = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+        if not hmac.compare_digest(received, secret_token):
+            abort(403)
+
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        abort(400)
+    handler(data)
+    return '', 200
+
+def set_webhook_handler(path, handler, secret_token=None):
+    """Route POSTs to /telegram/<path> to handler(update_json)"""
+    WEBHOOK['path'] = path
+    WEBHOOK['secret_token'] = secret_token
+    WEBHOOK['handler'] = handler
 
 def run_server():
-    app.run(host='0.0.0.0', port=PORT, debug=False)
+    app.run(host='0.0.0.0', port=PORT, debug=False, threaded=True)
 
 def start_keep_alive():
     thread = threading.Thread(target=run_server, daemon=True)
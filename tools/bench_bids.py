@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Bid throughput benchmark.
+
+Replays the database work a single bid does in handle_bid_amount
+(ban check, verification check, auctions_open, get_auction, record_bid,
+re-read) against a throwaway set of databases, once with the old
+connect-per-call db_connection and once with the pooled WAL connections,
+and prints bids/sec for both.
+
+    python tools/bench_bids.py [--bids 2000] [--threads 4]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+BIDDER_BASE = 900000
+
+
+@contextmanager
+def legacy_db_connection(db_name='auctions.db'):
+    """The connect/close-per-call helper bot.py used before pooling"""
+    conn = None
+    try:
+        conn = sqlite3.connect(db_name)
+        conn.row_factory = sqlite3.Row
+        yield conn
+    finally:
+        if conn:
+            conn.close()
+
+
+def setup_databases(bot, auctions):
+    bot.init_db()
+    with bot.db_connection() as conn:
+        # place_bid rejects every bid while auctions are closed
+        conn.execute("UPDATE system_status SET auctions_open=1 WHERE id=1")
+        for i in range(auctions):
+            conn.execute('''INSERT INTO auctions (item_text, base_price, is_active, auction_status, created_at)
+                            VALUES (?, 100, 1, 'active', CURRENT_TIMESTAMP)''', (f"Item {i}",))
+        conn.commit()
+    with bot.db_connection() as conn:
+        for i in range(64):
+            conn.execute('''INSERT OR IGNORE INTO verified_users (user_id, username, verified_by)
+                            VALUES (?, ?, 0)''', (BIDDER_BASE + i, f"bidder{i}"))
+        conn.commit()
+
+
+def place_one_bid(bot, auction_id, bidder_id):
+    bot.is_user_banned(bidder_id)
+    bot.check_verification_status(bidder_id)
+    with bot.db_connection() as conn:
+        conn.execute("SELECT auctions_open FROM system_status WHERE id = 1").fetchone()
+    # Bid exactly the minimum, like a bidder reading the post would
+    amount = bot.get_min_bid(bot.get_auction(auction_id))
+    bot.record_bid(auction_id, bidder_id, f"bidder{bidder_id - BIDDER_BASE}", amount)
+    bot.get_auction(auction_id)
+
+
+def run(bot, bids, threads, auctions):
+    counter = {'next': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    # Each thread bids on its own slice of the auctions. Two threads racing on
+    # one auction would have the slower bid rejected as too low, which the
+    # bid engine reports as a failure rather than measuring throughput.
+    per_thread = max(1, auctions // threads)
+
+    def worker(index):
+        while True:
+            with lock:
+                n = counter['next']
+                if n >= bids:
+                    return
+                counter['next'] += 1
+            auction_id = index + threads * (n % per_thread) + 1
+            try:
+                place_one_bid(bot, auction_id, BIDDER_BASE + (n % 64))
+            except Exception:
+                with lock:
+                    counter['errors'] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return bids / elapsed, counter['errors']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--bids', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--auctions', type=int, default=50)
+    args = parser.parse_args()
+    args.auctions = max(args.auctions, args.threads)
+
+    results = {}
+    failed = False
+    for label in ('connect-per-call', 'pooled'):
+        workdir = tempfile.mkdtemp(prefix='bench_bids_')
+        os.chdir(workdir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            import bot
+            bot.close_all_connections()
+            if label == 'connect-per-call':
+                pooled_db_connection = bot.db_connection
+                bot.db_connection = legacy_db_connection
+            setup_databases(bot, args.auctions)
+            rate, errors = run(bot, args.bids, args.threads, args.auctions)
+            if label == 'connect-per-call':
+                bot.db_connection = pooled_db_connection
+            bot.close_all_connections()
+        if errors:
+            # A failed bid skips most of the work, so the rate would be meaningless
+            print(f"{label:>18}: {errors} of {args.bids} bids failed, no rate reported")
+            failed = True
+            continue
+        results[label] = rate
+        print(f"{label:>18}: {rate:8.1f} bids/sec  ({args.threads} threads, {args.bids} bids)")
+
+    if failed:
+        sys.exit(1)
+    print(f"{'speedup':>18}: {results['pooled'] / results['connect-per-call']:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the pure helpers on the bid, refresh and /items paths.
+
+Times parse_bid_amount, format_bid_amount, get_min_increment,
+extract_base_price, extract_item_name, format_auction,
+format_pokemon_auction_item, format_tm_auction_item and
+format_item_for_list on inputs shaped like real @HexaMonBot pages, and
+compares them with the stored baseline in bench_helpers_baseline.json.
+Exits 1 when any helper got slower than the baseline by more than
+--threshold, so a formatter change can't quietly slow down rendering.
+
+    python tools/bench_helpers.py                  # compare with the baseline
+    python tools/bench_helpers.py --save-baseline  # after an intended change
+
+Timings are stored relative to a fixed pure-Python calibration loop
+timed in the same run, so a baseline saved on one machine still means
+something on another.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_helpers_baseline.json')
+
+NATURE_PAGE = (
+    "Garchomp ♂ Lv. 100\n"
+    "Nature: Jolly\n"
+    "Ability: Rough Skin\n"
+    "Held item: Life Orb\n"
+    "Friendship: 255"
+)
+
+IVS_PAGE = (
+    "IVs / EVs\n"
+    "HP: 31 / 4\n"
+    "Attack: 31 / 252\n"
+    "Defense: 31 / 0\n"
+    "Sp. Attack: 14 / 0\n"
+    "Sp. Defense: 31 / 0\n"
+    "Speed: 31 / 252\n"
+    "Total IVs: 169/186"
+)
+
+MOVESET_PAGE = (
+    "Moveset\n"
+    "• Earthquake [Ground] Power: 100, Accuracy: 100\n"
+    "• Outrage [Dragon] Power: 120, Accuracy: 100\n"
+    "• Stone Edge [Rock] Power: 100, Accuracy: 80\n"
+    "• Swords Dance [Normal] Power: -, Accuracy: -"
+)
+
+TM_PAGE = (
+    "\n"
+    "💿 TM26 - Earthquake\n"
+    "Type: Ground | Category: Physical\n"
+    "Power: 100 | Accuracy: 100\n"
+    "Can be learned by 312 Pokémon\n"
+    "You can sell this TM to the shop for 2500 PD"
+)
+
+POKEMON_DATA = {
+    'category': 'nonlegendary',
+    'seller_id': 5123456789,
+    'seller_username': 'ash\\_ketchum',
+    'seller_first_name': 'Ash',
+    'pokemon_name': 'Garchomp',
+    'base_price': 25000,
+    'nature': {'text': NATURE_PAGE},
+    'ivs': {'text': IVS_PAGE},
+    'moveset': {'text': MOVESET_PAGE},
+    'boost_info': 'Yes (Attack + Speed)',
+}
+
+TM_DATA = {
+    'category': 'tms',
+    'seller_id': 5987654321,
+    'seller_username': 'misty',
+    'seller_first_name': 'Misty',
+    'base_price': 8000,
+    'tm_details': {'text': TM_PAGE},
+}
+
+
+def build_cases(bot):
+    pokemon_text = bot.format_pokemon_auction_item(POKEMON_DATA, 1234)
+    tm_text = bot.format_tm_auction_item(TM_DATA, 1235)
+    auction = {'auction_id': 1234, 'item_text': pokemon_text, 'current_bid': 137500,
+               'base_price': 25000, 'current_bidder': '@brock'}
+    # /items rows carry the typed attribute columns save_submission fills in
+    pokemon_row = {'auction_id': 1234, 'item_text': pokemon_text, 'channel_message_id': 4321,
+                   **bot.extract_item_attributes(POKEMON_DATA)}
+    tm_row = {'auction_id': 1235, 'item_text': tm_text, 'channel_message_id': 4322,
+              **bot.extract_item_attributes(TM_DATA)}
+    bid_texts = ['5000', '12.5k', '1.25m', '137,500', '0.5k', 'abc']
+    amounts = [900, 1000, 12500, 137500, 1250000, 2000000]
+    price_texts = ['Base: 25k', 'base: 1,500', '0', '1.2m', 'none']
+
+    return [
+        ('parse_bid_amount', lambda: [bot.parse_bid_amount(t) for t in bid_texts]),
+        ('format_bid_amount', lambda: [bot.format_bid_amount(a) for a in amounts]),
+        ('get_min_increment', lambda: [bot.get_min_increment(a) for a in amounts]),
+        ('extract_base_price', lambda: [bot.extract_base_price(t) for t in price_texts]),
+        ('extract_item_name', lambda: (bot.extract_item_name(pokemon_text), bot.extract_item_name(tm_text))),
+        ('format_auction', lambda: bot.format_auction(auction)),
+        ('format_pokemon_auction_item', lambda: bot.format_pokemon_auction_item(POKEMON_DATA, 1234)),
+        ('format_tm_auction_item', lambda: bot.format_tm_auction_item(TM_DATA, 1235)),
+        ('format_item_for_list', lambda: (bot.format_item_for_list(pokemon_row),
+                                          bot.format_item_for_list(tm_row))),
+    ]
+
+
+def calibration():
+    """Fixed workload in the same style as the helpers: regex, float maths and f-strings"""
+    pattern = re.compile(r'Nature:\s*([A-Za-z]+)')
+    out = []
+    for i in range(20):
+        match = pattern.search(NATURE_PAGE)
+        out.append(f"{match.group(1)}-{i * 1.5:.2f}k".replace('.00', ''))
+    return out
+
+
+def best_seconds_per_call(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def measure(cases, repeat):
+    """One pass over cases; returns {name: seconds per call / calibration seconds per call}"""
+    # Calibrate on both sides of the pass so a noisy moment doesn't skew every ratio
+    reference = best_seconds_per_call(calibration, repeat)
+    timings = {name: best_seconds_per_call(func, repeat) for name, func in cases}
+    reference = min(reference, best_seconds_per_call(calibration, repeat))
+    return reference, {name: seconds / reference for name, seconds in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=7, help='timing rounds per helper (best is kept)')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown against the baseline, 0.25 = 25%%')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--passes', type=int, default=5, help='passes averaged (median) for --save-baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DB_PATH', os.path.join(tempfile.mkdtemp(prefix='bench_helpers_'), 'auctions.db'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        import bot
+
+    cases = build_cases(bot)
+    reference, results = measure(cases, args.repeat)
+
+    if args.save_baseline:
+        passes = [results] + [measure(cases, args.repeat)[1] for _ in range(args.passes - 1)]
+        results = {name: round(statistics.median(p[name] for p in passes), 4) for name in results}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'relative': results}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Saved {len(results)} benchmarks to {args.baseline}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('relative', {})
+
+    # A helper over the threshold is re-timed twice before it counts, to ride out scheduler noise
+    for name, func in cases:
+        stored = baseline.get(name)
+        for _ in range(2):
+            if not stored or results[name] <= stored * (1 + args.threshold):
+                break
+            results[name] = min(results[name], measure([(name, func)], args.repeat)[1][name])
+
+    regressions = []
+    print(f"calibration: {reference * 1e6:.2f} µs/call")
+    print(f"{'helper':<30} {'µs/call':>9} {'relative':>9} {'baseline':>9} {'change':>8}")
+    for name, relative in results.items():
+        stored = baseline.get(name)
+        change = f"{relative / stored - 1:+.0%}" if stored else 'new'
+        print(f"{name:<30} {relative * reference * 1e6:>9.2f} {relative:>9.3f} "
+              f"{stored if stored else float('nan'):>9.3f} {change:>8}")
+        if stored and relative > stored * (1 + args.threshold):
+            regressions.append(name)
+
+    if regressions:
+        print(f"\nREGRESSED beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions" if baseline else "\nNo baseline yet; run with --save-baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+SQL workload benchmark for the query helpers in bot.py.
+
+Runs get_active_category_counts, get_items_page (first and a deep page
+for every sort, on the biggest category), get_user_bought_items,
+get_user_sold_items, get_user_leading_bids, get_bid_history,
+display_verified_users_page (first, middle and last page) and
+get_top_buyers/get_top_sellers against a database from
+tools/gen_dataset.py. Every helper goes through the bot's own pooled
+connection. For each one the benchmark records the median and p95 time,
+the rows returned, and the EXPLAIN QUERY PLAN of each statement it
+issued, with full table scans flagged.
+
+    python tools/gen_dataset.py /tmp/big.db
+    python tools/bench_sql.py /tmp/big.db [--runs 20] [--json results.json]
+
+Heavy inputs are chosen on purpose: the users with the most wins, sales
+and leading bids, and the auction with the longest bid history.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)\b(?! USING (?:COVERING )?INDEX)')
+PAGE_SIZE = 20
+
+
+class PageReply:
+    """Just enough of an Update/CallbackContext for display_verified_users_page to render into"""
+
+    def __init__(self, total_users):
+        self.sent = []
+        self.update = SimpleNamespace(callback_query=None,
+                                      message=SimpleNamespace(reply_text=lambda *a, **k: self.sent.append(k)))
+        self.context = SimpleNamespace(user_data={'verified_users_pagination': {
+            'total_pages': (total_users + PAGE_SIZE - 1) // PAGE_SIZE,
+            'current_page': 1,
+            'total_users': total_users,
+        }})
+
+
+def pick_inputs(path):
+    conn = sqlite3.connect(path)
+    one = lambda sql: (conn.execute(sql).fetchone() or [None])[0]
+    inputs = {
+        'top_winner': one('''SELECT current_bidder_id FROM auctions WHERE auction_status='ended'
+                             AND winning_bid_id IS NOT NULL GROUP BY current_bidder_id
+                             ORDER BY COUNT(*) DESC LIMIT 1'''),
+        'top_seller': one('''SELECT seller_id FROM auctions WHERE winning_bid_id IS NOT NULL
+                             GROUP BY seller_id ORDER BY COUNT(*) DESC LIMIT 1'''),
+        'top_leader': one('''SELECT current_bidder_id FROM auctions WHERE auction_status IN ('active', 'ended')
+                             AND current_bidder_id IS NOT NULL GROUP BY current_bidder_id
+                             ORDER BY COUNT(*) DESC LIMIT 1'''),
+        'longest_auction': one('''SELECT auction_id FROM bids GROUP BY auction_id ORDER BY COUNT(*) DESC LIMIT 1'''),
+        'verified_users': one('SELECT COUNT(*) FROM verified_users'),
+        'biggest_category': one('''SELECT category FROM auctions WHERE auction_status='active'
+                                   GROUP BY category ORDER BY COUNT(*) DESC LIMIT 1'''),
+    }
+    conn.close()
+    return inputs
+
+
+def build_cases(bot, inputs):
+    pages = (inputs['verified_users'] + PAGE_SIZE - 1) // PAGE_SIZE
+
+    def verified_page(page):
+        reply = PageReply(inputs['verified_users'])
+        bot.display_verified_users_page(reply.update, reply.context, page)
+        return reply.sent
+
+    category = inputs['biggest_category'] or 'nonlegendary'
+    halfway = bot.get_active_category_counts()[category] // 2
+
+    def items_page(sort, deep):
+        cursor = None
+        if deep:
+            # Start from halfway down the category, the way a Next button carries its keyset
+            rows, _ = bot.get_items_page(category, sort, limit=max(1, halfway))
+            cursor = (rows[-1]['sort_key'], rows[-1]['auction_id']) if rows else None
+        return lambda: bot.get_items_page(category, sort, cursor)[0]
+
+    return [
+        ('get_active_category_counts', lambda: bot.get_active_category_counts()),
+        *[(f"get_items_page_{sort}{'_deep' if deep else ''}", items_page(sort, deep))
+          for sort in bot.ITEMS_SORTS for deep in (False, True)],
+        ('get_user_bought_items', lambda: bot.get_user_bought_items(inputs['top_winner'])),
+        ('get_user_sold_items', lambda: bot.get_user_sold_items(inputs['top_seller'])),
+        ('get_user_leading_bids', lambda: bot.get_user_leading_bids(inputs['top_leader'])),
+        ('get_bid_history', lambda: bot.get_bid_history(inputs['longest_auction'])),
+        ('verified_users_page_first', lambda: verified_page(1)),
+        ('verified_users_page_middle', lambda: verified_page(max(1, pages // 2))),
+        ('verified_users_page_last', lambda: verified_page(max(1, pages))),
+        ('get_top_buyers', lambda: bot.get_top_buyers()),
+        ('get_top_sellers', lambda: bot.get_top_sellers()),
+    ]
+
+
+def count_rows(result):
+    if isinstance(result, dict):
+        return len(result)
+    return len(result) if result is not None else 0
+
+
+def run_case(bot, func, runs):
+    """Time func over runs calls; returns (timings, rows, statements traced on the first call)"""
+    statements = []
+    conn = bot.get_pooled_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        result = func()
+    finally:
+        conn.set_trace_callback(None)
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings, count_rows(result), [s for s in statements if s.lstrip().upper().startswith(('SELECT', 'WITH'))]
+
+
+def query_plans(path, statements):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    plans = []
+    for sql in statements:
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            plans.append((' '.join(sql.split()), [row[-1] for row in rows]))
+        except sqlite3.Error as e:
+            plans.append((' '.join(sql.split()), [f"could not plan: {e}"]))
+    conn.close()
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('path', help='database built by tools/gen_dataset.py')
+    parser.add_argument('--runs', type=int, default=20, help='timed calls per helper')
+    parser.add_argument('--json', help='also write the results here')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print every plan, not only scans')
+    args = parser.parse_args()
+
+    path = os.path.abspath(args.path)
+    os.environ['DB_PATH'] = path
+    with contextlib.redirect_stdout(io.StringIO()):
+        import bot
+        # Bring an older generated database up to the current schema, as the bot does at startup
+        bot.init_db()
+    inputs = pick_inputs(path)
+    tables = {row[0] for row in sqlite3.connect(path).execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+    results = []
+    print(f"{'helper':<32} {'median ms':>10} {'p95 ms':>9} {'rows':>7}  scans")
+    for name, func in build_cases(bot, inputs):
+        timings, rows, statements = run_case(bot, func, args.runs)
+        plans = query_plans(path, statements)
+        scans = sorted({table for _, plan in plans for line in plan for table in SCAN_RE.findall(line)
+                        if table in tables})
+        p95 = sorted(timings)[min(len(timings) - 1, int(0.95 * len(timings)))]
+        median = statistics.median(timings)
+        print(f"{name:<32} {median * 1000:>10.2f} {p95 * 1000:>9.2f} {rows:>7}  {', '.join(scans) or '-'}")
+        if args.verbose or scans:
+            for sql, plan in plans:
+                print(f"    {sql[:110]}")
+                for line in plan:
+                    print(f"      {line}")
+        results.append({'helper': name, 'median_ms': round(median * 1000, 3), 'p95_ms': round(p95 * 1000, 3),
+                        'rows': rows, 'full_scans': scans,
+                        'plans': [{'sql': sql, 'plan': plan} for sql, plan in plans]})
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'database': path, 'inputs': inputs, 'results': results}, f, indent=2)
+            f.write('\n')
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
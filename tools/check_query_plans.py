@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN QUERY PLAN check for every SQL statement in bot.py.
+
+Builds a fresh schema through the bot's own migrations in a temporary
+directory, pulls every literal SQL string passed to execute()/executemany()
+out of bot.py, and fails if any of them plans a full table scan that isn't
+on the allow-list below. A SCAN through an index (USING INDEX / USING
+COVERING INDEX) still visits every entry of that index, so it counts as a
+full scan too; only SEARCH steps are index lookups.
+
+    python tools/check_query_plans.py [-v]
+"""
+import argparse
+import ast
+import contextlib
+import io
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Statements that are meant to read or rewrite a whole table, matched by substring
+ALLOWED_SCANS = {
+    "SELECT user_id FROM verified_users": "broadcast sends to every verified user",
+    "SELECT user_id FROM bot_admins": "admin list is loaded in full",
+    "FROM bot_admins ORDER BY added_at": "/admins lists every admin",
+    "LEFT JOIN bids b ON b.bid_id = ( SELECT bid_id FROM bids": "rebuild_winner_columns checks every auction",
+    "WHERE is_active = 1 AND auction_status != 'active'": "one-off status migration at startup",
+    "SELECT a.auction_id, s.data FROM auctions a JOIN submissions s": "migration 10 category backfill",
+    "UPDATE auctions SET bid_count = ( SELECT COUNT(*)": "migration 10 bid_count backfill",
+    "SELECT submission_id, data FROM submissions": "migration 11 attribute backfill",
+    "LEFT JOIN auctions a ON s.channel_message_id = a.channel_message_id": "verify_auction_integrity checks every approved submission",
+    "LEFT JOIN submissions s ON a.channel_message_id = s.channel_message_id": "verify_auction_integrity checks every auction",
+    "SELECT ?, v.user_id FROM verified_users v": "broadcast queues every verified user",
+    "SELECT COUNT(*) FROM verified_users": "/listverified shows the total",
+    "FROM verified_users ORDER BY verified_at DESC": "/listverified pages walk the verified_at index",
+    "FROM submission_categories ORDER BY category": "get_category_settings reads every category",
+    "FROM recipient_health WHERE unreachable = 1": "partial index holds only unreachable users",
+    "FROM recipient_health r JOIN verified_users v": "partial index holds only unreachable users",
+    "FROM broadcast_jobs WHERE status = 'running'": "partial index holds only running jobs",
+    "FROM settlement_jobs WHERE status = 'running'": "partial index holds only running jobs",
+}
+
+SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)')
+SQL_RE = re.compile(r'^\s*(SELECT|UPDATE|DELETE|INSERT|REPLACE|WITH)\b', re.IGNORECASE)
+
+
+def extract_statements(path):
+    """Yield (lineno, sql) for every string literal passed to execute()/executemany()"""
+    tree = ast.parse(open(path, encoding='utf-8').read())
+    seen = set()
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and getattr(node.func, 'attr', None) in ('execute', 'executemany')):
+            continue
+        if not node.args or not isinstance(node.args[0], ast.Constant) or not isinstance(node.args[0].value, str):
+            continue
+        sql = node.args[0].value
+        if not SQL_RE.match(sql):
+            continue
+        normalized = ' '.join(sql.split())
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        yield node.lineno, normalized
+
+
+def build_schema(workdir):
+    os.chdir(workdir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import bot
+        bot.init_db()
+        bot.close_all_connections()
+    return [os.path.join(workdir, name) for name in sorted(os.listdir(workdir)) if name.endswith('.db')]
+
+
+def explain(connections, sql):
+    """Return the plan rows from whichever database has the tables, or None"""
+    params = [None] * sql.count('?')
+    last_error = None
+    for conn in connections:
+        try:
+            return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        except sqlite3.OperationalError as e:
+            last_error = e
+    raise last_error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-v', '--verbose', action='store_true', help="print every plan")
+    args = parser.parse_args()
+
+    db_files = build_schema(tempfile.mkdtemp(prefix='query_plans_'))
+    connections = [sqlite3.connect(path) for path in db_files]
+
+    failures = 0
+    warnings = 0
+    checked = 0
+    for lineno, sql in extract_statements(os.path.join(REPO_ROOT, 'bot.py')):
+        try:
+            plan = explain(connections, sql)
+        except sqlite3.OperationalError as e:
+            warnings += 1
+            print(f"WARN  bot.py:{lineno}: {e}\n      {sql[:160]}")
+            continue
+
+        checked += 1
+        scans = [step for step in plan
+                 if SCAN_RE.search(step) and 'CONSTANT ROW' not in step]
+        allowed = next((reason for pattern, reason in ALLOWED_SCANS.items() if pattern in sql), None)
+
+        if scans and not allowed:
+            failures += 1
+            print(f"FAIL  bot.py:{lineno}: {'; '.join(scans)}\n      {sql[:160]}")
+        elif args.verbose:
+            status = f"ok (allowed: {allowed})" if scans else "ok"
+            print(f"{status:<5} bot.py:{lineno}: {' | '.join(plan)}")
+
+    print(f"\n{checked} statements checked, {failures} full table scans, {warnings} could not be planned")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
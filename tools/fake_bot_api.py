@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Telegram Bot API, for load testing without Telegram.
+
+Implements the methods bot.py calls on the hot paths (getUpdates,
+sendMessage, sendPhoto, editMessageCaption, editMessageText,
+editMessageReplyMarkup, copyMessage, getChat, answerCallbackQuery,
+setMyCommands, plus the getMe/deleteWebhook/deleteMessage calls made at
+startup) with just enough of each response for python-telegram-bot to
+parse it. Every call can be slowed by a fixed latency plus jitter, and a
+share of the rate-limited calls can be answered with 429 Too Many
+Requests to exercise the outbound queue's retry path.
+
+Run it on its own and point the bot at it:
+
+    python tools/fake_bot_api.py --port 8081 --latency-ms 50 --rate-limit 0.01
+    TELEGRAM_API_URL=http://127.0.0.1:8081 python bot.py
+
+Updates are injected in-process (see tools/load_test.py) or by POSTing an
+Update JSON to /_fake/updates. Unimplemented methods answer 404 and are
+counted, so a scenario that wanders off the covered surface shows up in
+the stats.
+"""
+import argparse
+import email.parser
+import email.policy
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.parse
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOT_USER = {'id': 100000001, 'is_bot': True, 'first_name': 'Fake Auction Bot', 'username': 'fake_auction_bot'}
+
+# Calls Telegram rate-limits per chat; only these get injected 429s
+LIMITED_METHODS = {'sendMessage', 'sendPhoto', 'copyMessage', 'editMessageCaption',
+                   'editMessageText', 'editMessageReplyMarkup'}
+
+MESSAGE_METHODS = {'sendMessage', 'sendPhoto', 'editMessageCaption', 'editMessageText',
+                   'editMessageReplyMarkup'}
+
+
+class FakeBotAPI:
+    """Bot API state: pending updates, every outgoing call per chat, and call stats"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, rate_limit=0.0, retry_after=1, seed=None):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+        self.updates = deque()
+        self.update_ids = itertools.count(1)
+        self.updates_cond = threading.Condition()
+        self.polled = threading.Event()
+
+        self.message_ids = itertools.count(1000)
+        self.outbox = defaultdict(list)  # chat_id -> [(timestamp, method, params)]
+        self.answers = {}  # callback_query_id -> (timestamp, text)
+        self.answered = set()  # every callback_query_id answered so far
+        self.outbox_cond = threading.Condition()
+
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+
+    # -- injecting updates ------------------------------------------------
+
+    def push_update(self, update):
+        with self.updates_cond:
+            update = dict(update, update_id=next(self.update_ids))
+            self.updates.append(update)
+            self.updates_cond.notify_all()
+        return update['update_id']
+
+    def user_message(self, user_id, text, first_name=None):
+        user = {'id': user_id, 'is_bot': False, 'first_name': first_name or f"User{user_id}",
+                'username': f"user{user_id}"}
+        message = {
+            'message_id': next(self.message_ids),
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private', 'first_name': user['first_name']},
+            'from': user,
+            'text': text,
+        }
+        if text.startswith('/'):
+            command = text.split()[0]
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(command)}]
+        return self.push_update({'message': message})
+
+    def button_press(self, user_id, chat_id, message_id, data):
+        """Press an inline button on message_id in chat_id; returns the callback_query id"""
+        query_id = f"cq{user_id}_{next(self.message_ids)}"
+        user = {'id': user_id, 'is_bot': False, 'first_name': f"User{user_id}", 'username': f"user{user_id}"}
+        self.push_update({'callback_query': {
+            'id': query_id,
+            'from': user,
+            'chat_instance': str(chat_id),
+            'data': data,
+            'message': {
+                'message_id': message_id,
+                'date': int(time.time()),
+                'chat': self.chat(chat_id),
+                'from': BOT_USER,
+                'caption': '',
+            },
+        }})
+        return query_id
+
+    def take_updates(self, offset, limit, timeout):
+        deadline = time.monotonic() + timeout
+        with self.updates_cond:
+            self.polled.set()
+            while self.updates and offset and self.updates[0]['update_id'] < offset:
+                self.updates.popleft()
+            while not self.updates:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self.updates_cond.wait(remaining)
+            return list(itertools.islice(self.updates, 0, limit))
+
+    # -- observing the bot ------------------------------------------------
+
+    def outbox_mark(self, chat_id):
+        with self.outbox_cond:
+            return len(self.outbox[chat_id])
+
+    def wait_for_message(self, chat_id, since, predicate=None, timeout=30.0):
+        """First call to chat_id after index `since` matching predicate(method, params), or None"""
+        deadline = time.monotonic() + timeout
+        with self.outbox_cond:
+            while True:
+                sent = self.outbox[chat_id]
+                for index in range(since, len(sent)):
+                    stamp, method, params = sent[index]
+                    if predicate is None or predicate(method, params):
+                        return stamp, method, params
+                since = len(sent)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.outbox_cond.wait(remaining)
+
+    def wait_for_answer(self, query_id, timeout=30.0):
+        deadline = time.monotonic() + timeout
+        with self.outbox_cond:
+            while query_id not in self.answers:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.outbox_cond.wait(remaining)
+            return self.answers.pop(query_id)
+
+    def count(self, key, n=1):
+        with self.stats_lock:
+            self.stats[key] += n
+
+    # -- the API ----------------------------------------------------------
+
+    def chat(self, chat_id):
+        chat_id = int(chat_id)
+        if chat_id < 0:
+            return {'id': chat_id, 'type': 'channel', 'title': f"Channel {chat_id}",
+                    'username': f"channel{abs(chat_id)}"}
+        return {'id': chat_id, 'type': 'private', 'first_name': f"User{chat_id}", 'username': f"user{chat_id}"}
+
+    def message(self, params, message_id=None):
+        result = {
+            'message_id': message_id or next(self.message_ids),
+            'date': int(time.time()),
+            'chat': self.chat(params.get('chat_id', 0)),
+            'from': BOT_USER,
+        }
+        for key in ('text', 'caption'):
+            if key in params:
+                result[key] = params[key]
+        if 'photo' in params:
+            result['photo'] = [{'file_id': str(params['photo']), 'file_unique_id': 'fake',
+                                'width': 320, 'height': 320}]
+        markup = params.get('reply_markup')
+        if isinstance(markup, str):
+            try:
+                markup = json.loads(markup)
+            except ValueError:
+                markup = None
+        if isinstance(markup, dict) and 'inline_keyboard' in markup:
+            result['reply_markup'] = markup
+        return result
+
+    def delay(self):
+        if not self.latency and not self.jitter:
+            return
+        with self.rng_lock:
+            wait = self.latency + self.rng.uniform(0, self.jitter)
+        time.sleep(wait)
+
+    def inject_429(self, method):
+        if method not in LIMITED_METHODS or not self.rate_limit:
+            return False
+        with self.rng_lock:
+            return self.rng.random() < self.rate_limit
+
+    def call(self, method, params):
+        """Returns (http_status, response_dict)"""
+        self.count(f"method.{method}")
+        if method == 'getUpdates':
+            offset = int(params.get('offset') or 0)
+            limit = int(params.get('limit') or 100)
+            timeout = float(params.get('timeout') or 0)
+            return 200, {'ok': True, 'result': self.take_updates(offset, limit, timeout)}
+
+        self.delay()
+        if self.inject_429(method):
+            self.count('injected_429')
+            return 429, {'ok': False, 'error_code': 429,
+                         'description': f"Too Many Requests: retry after {self.retry_after}",
+                         'parameters': {'retry_after': self.retry_after}}
+
+        if method == 'getMe':
+            result = BOT_USER
+        elif method == 'getChat':
+            result = self.chat(params.get('chat_id', 0))
+        elif method in ('setMyCommands', 'deleteWebhook', 'setWebhook', 'deleteMessage'):
+            result = True
+        elif method == 'answerCallbackQuery':
+            query_id = params.get('callback_query_id')
+            with self.outbox_cond:
+                # Telegram takes one answer per callback query and rejects the rest
+                if query_id in self.answered:
+                    duplicate = True
+                else:
+                    duplicate = False
+                    self.answered.add(query_id)
+                    self.answers[query_id] = (time.monotonic(), params.get('text'))
+                    self.outbox_cond.notify_all()
+            if duplicate:
+                self.count('duplicate_answer')
+                return 400, {'ok': False, 'error_code': 400,
+                             'description': "Bad Request: query is too old and response timeout expired "
+                                            "or query id is invalid"}
+            result = True
+        elif method == 'copyMessage':
+            result = {'message_id': next(self.message_ids)}
+        elif method in MESSAGE_METHODS:
+            message_id = params.get('message_id') if method.startswith('edit') else None
+            result = self.message(params, message_id and int(message_id))
+        else:
+            self.count('unknown_method')
+            return 404, {'ok': False, 'error_code': 404, 'description': f"Not Found: {method} is not faked"}
+
+        if 'chat_id' in params:
+            with self.outbox_cond:
+                self.outbox[int(params['chat_id'])].append((time.monotonic(), method, params))
+                self.outbox_cond.notify_all()
+        return 200, {'ok': True, 'result': result}
+
+
+def parse_body(headers, body):
+    content_type = headers.get('Content-Type', '')
+    if not body:
+        return {}
+    if content_type.startswith('application/json'):
+        return json.loads(body)
+    if content_type.startswith('multipart/form-data'):
+        parser = email.parser.BytesParser(policy=email.policy.HTTP)
+        form = parser.parsebytes(b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + body)
+        params = {}
+        for part in form.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if part.get_filename():
+                params[name] = f"upload:{part.get_filename()}"
+            else:
+                params[name] = part.get_content()
+        return params
+    return {k: v[0] for k, v in urllib.parse.parse_qs(body.decode()).items()}
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def handle_call(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            path = urllib.parse.urlsplit(self.path)
+            parts = path.path.strip('/').split('/')
+
+            if parts[:2] == ['_fake', 'updates'] and self.command == 'POST':
+                update_id = api.push_update(json.loads(body))
+                return self.reply(200, {'ok': True, 'result': update_id})
+
+            if len(parts) != 2 or not parts[0].startswith('bot'):
+                return self.reply(404, {'ok': False, 'error_code': 404, 'description': 'Not Found'})
+            try:
+                params = parse_body(self.headers, body)
+                params.update({k: v[0] for k, v in urllib.parse.parse_qs(path.query).items()})
+            except ValueError as e:
+                return self.reply(400, {'ok': False, 'error_code': 400, 'description': f"Bad Request: {e}"})
+            status, payload = api.call(parts[1], params)
+            self.reply(status, payload)
+
+        do_GET = handle_call
+        do_POST = handle_call
+
+    return Handler
+
+
+class FakeBotAPIServer(ThreadingHTTPServer):
+    # Connections are kept alive (HTTP/1.1), but the bot's connection pool opens a
+    # new connection for every call made while all its open ones are busy, so a
+    # burst of calls opens many at once (11 in a 40-user load test, up to con_pool_size
+    # under heavier load). The default listen backlog of 5 drops the excess SYNs, and
+    # the client's SYN retransmit costs a second or more per dropped connection.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def serve(api, host='127.0.0.1', port=0):
+    """Start the server on a daemon thread; returns (server, base_url)"""
+    server = FakeBotAPIServer((host, port), make_handler(api))
+    threading.Thread(target=server.serve_forever, name='fake-bot-api', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='added to every call')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='uniform random extra latency')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='share of send/edit/copy calls answered with 429 (0..1)')
+    parser.add_argument('--retry-after', type=int, default=1)
+    args = parser.parse_args()
+
+    api = FakeBotAPI(args.latency_ms, args.jitter_ms, args.rate_limit, args.retry_after)
+    server, url = serve(api, args.host, args.port)
+    print(f"Fake Bot API listening on {url} (TELEGRAM_API_URL={url})")
+    try:
+        while True:
+            time.sleep(30)
+            with api.stats_lock:
+                print(dict(api.stats))
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
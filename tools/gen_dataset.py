@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Synthetic auction database generator.
+
+Builds a database through bot.py's own migrations and fills it with
+production-shaped volumes spread over many seasons: approved
+submissions and their auctions (all but the last season ended and
+settled), a rising bid ladder per auction with the winner columns set
+the way place_bid leaves them, verified users, leaderboard rows and
+user profiles. Defaults match the scale we plan for:
+
+    python tools/gen_dataset.py out.db                 # 100k auctions, ~2M bids, 50k users
+    python tools/gen_dataset.py out.db --scale 0.05    # same shape, 5% of the volume
+
+Output is deterministic for a given --seed. tools/bench_sql.py times the
+query helpers against the result.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+USER_BASE = 1000000
+CHANNEL_MESSAGE_BASE = 100
+BATCH = 20000
+
+CATEGORIES = [('nonlegendary', 0.55), ('shiny', 0.2), ('legendary', 0.15), ('tms', 0.1)]
+POKEMON = ['Garchomp', 'Dragonite', 'Tyranitar', 'Metagross', 'Salamence', 'Lucario', 'Gengar',
+           'Scizor', 'Gyarados', 'Blaziken', 'Greninja', 'Excadrill', 'Ferrothorn', 'Togekiss']
+LEGENDARIES = ['Mewtwo', 'Rayquaza', 'Kyogre', 'Groudon', 'Dialga', 'Palkia', 'Giratina', 'Zekrom']
+NATURES = ['Adamant', 'Jolly', 'Modest', 'Timid', 'Bold', 'Impish', 'Calm', 'Careful', 'Brave']
+TMS = [(26, 'Earthquake'), (24, 'Thunderbolt'), (13, 'Ice Beam'), (35, 'Flamethrower'), (53, 'Energy Ball'),
+       (29, 'Psychic'), (71, 'Stone Edge'), (82, 'Dragon Tail'), (92, 'Trick Room'), (15, 'Hyper Beam')]
+
+
+def build_schema(path):
+    os.environ['DB_PATH'] = path
+    with contextlib.redirect_stdout(io.StringIO()):
+        import bot
+        bot.init_db()
+        bot.close_all_connections()
+    return bot
+
+
+def pick_category(rng):
+    roll = rng.random()
+    for category, share in CATEGORIES:
+        roll -= share
+        if roll <= 0:
+            return category
+    return CATEGORIES[0][0]
+
+
+def submission_data(bot, rng, category, seller_id, base_price):
+    data = {'category': category, 'seller_id': seller_id, 'seller_username': f"user{seller_id}",
+            'seller_first_name': f"User{seller_id}", 'base_price': base_price}
+    if category == 'tms':
+        number, move = rng.choice(TMS)
+        data['tm_details'] = {'text': f"💿 TM{number:02d} - {move}\nPower: 90 | Accuracy: 100"}
+        return data, bot.format_tm_auction_item(data)
+    name = rng.choice(LEGENDARIES if category == 'legendary' else POKEMON)
+    data.update({
+        'pokemon_name': name,
+        'nature': {'text': f"{name} Lv. {rng.randint(50, 100)}\nNature: {rng.choice(NATURES)}"},
+        'ivs': {'text': "IVs / EVs\n" + "\n".join(f"{stat}: {rng.randint(0, 31)} / {rng.choice([0, 4, 252])}"
+                                                  for stat in ('HP', 'Atk', 'Def', 'SpA', 'SpD', 'Spe'))},
+        'moveset': {'text': "Moveset\n• Earthquake\n• Outrage\n• Stone Edge\n• Swords Dance"},
+        'boost_info': rng.choice(['No', 'Yes (Attack)', 'Yes (Speed)']),
+    })
+    return data, bot.format_pokemon_auction_item(data)
+
+
+def stamp(moment):
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def generate(path, auctions, bids_per_auction, users, seasons, active, seed):
+    bot = build_schema(path)
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA foreign_keys=OFF")
+    started = time.perf_counter()
+
+    user_ids = [USER_BASE + i for i in range(users)]
+    first_day = datetime(2024, 1, 1)
+    season_days = 7
+    wins, sales = {}, {}
+
+    conn.executemany('''INSERT INTO verified_users (user_id, username, verified_by, verified_at, last_active)
+                        VALUES (?, ?, ?, ?, ?)''',
+                     ((uid, f"user{uid}", user_ids[0], stamp(first_day + timedelta(minutes=i)),
+                       stamp(first_day + timedelta(days=rng.randint(0, seasons * season_days))))
+                      for i, uid in enumerate(user_ids)))
+
+    # Sellers and bidders follow a long tail: a few hundred regulars do most of the trading
+    sellers = user_ids[:max(1, users // 20)]
+    heavy_bidders = user_ids[:max(1, users // 50)]
+
+    submission_rows, auction_rows, bid_rows = [], [], []
+    bid_id = 0
+    per_season = max(1, auctions // seasons)
+
+    columns = ", ".join(bot.ITEM_ATTRIBUTE_COLUMNS)
+    placeholders = ", ?" * len(bot.ITEM_ATTRIBUTE_COLUMNS)
+
+    def flush():
+        conn.executemany(f'''INSERT INTO submissions (submission_id, user_id, data, status, created_at,
+                                                      channel_message_id, {columns})
+                             VALUES (?, ?, ?, 'approved', ?, ?{placeholders})''', submission_rows)
+        conn.executemany(f'''INSERT INTO auctions (auction_id, item_text, base_price, current_bid,
+                                                   current_bidder_id, current_bidder, is_active, auction_status,
+                                                   channel_message_id, created_at, seller_id, seller_name,
+                                                   winning_bid_id, bid_count, {columns})
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?{placeholders})''', auction_rows)
+        conn.executemany('''INSERT INTO bids (bid_id, auction_id, bidder_id, bidder_name, amount, timestamp,
+                                              is_active)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)''', bid_rows)
+        conn.commit()
+        submission_rows.clear()
+        auction_rows.clear()
+        bid_rows.clear()
+
+    for auction_id in range(1, auctions + 1):
+        is_active = auction_id > auctions - active
+        season = min(seasons - 1, (auction_id - 1) // per_season)
+        created = first_day + timedelta(days=season * season_days, seconds=rng.randint(0, 86400 * 2))
+        category = pick_category(rng)
+        seller_id = rng.choice(sellers)
+        base_price = rng.choice([0, 1000, 5000, 10000, 25000, 50000])
+        data, item_text = submission_data(bot, rng, category, seller_id, base_price)
+        channel_message_id = CHANNEL_MESSAGE_BASE + auction_id
+        attributes = bot.extract_item_attributes(data)
+        attributes = tuple(attributes[name] for name in bot.ITEM_ATTRIBUTE_COLUMNS)
+        submission_rows.append((auction_id, seller_id, json.dumps(data), stamp(created), channel_message_id)
+                               + attributes)
+
+        amount = base_price
+        count = max(0, int(rng.expovariate(1.0 / bids_per_auction))) if bids_per_auction else 0
+        winner = None
+        live_bids = 0
+        for n in range(count):
+            amount += bot.get_min_increment(amount) * rng.choice([1, 1, 1, 2, 5])
+            bidder = rng.choice(heavy_bidders) if rng.random() < 0.4 else rng.choice(user_ids)
+            bid_id += 1
+            # Roughly one bid in fifty was later removed by an admin
+            removed = rng.random() < 0.02 and n < count - 1
+            bid_rows.append((bid_id, auction_id, bidder, f"user{bidder}", amount,
+                             stamp(created + timedelta(minutes=n * 3)), 0 if removed else 1))
+            if not removed:
+                winner = (bid_id, bidder, amount)
+                live_bids += 1
+
+        if winner:
+            auction_rows.append((auction_id, item_text, base_price, winner[2], winner[1], f"@user{winner[1]}",
+                                 1 if is_active else 0, 'active' if is_active else 'ended', channel_message_id,
+                                 stamp(created), seller_id, f"user{seller_id}", winner[0], live_bids) + attributes)
+            if not is_active:
+                wins[winner[1]] = wins.get(winner[1], 0) + 1
+                sales[seller_id] = sales.get(seller_id, 0) + 1
+        else:
+            auction_rows.append((auction_id, item_text, base_price, None, None, None,
+                                 1 if is_active else 0, 'active' if is_active else 'ended', channel_message_id,
+                                 stamp(created), seller_id, f"user{seller_id}", None, 0) + attributes)
+
+        if len(bid_rows) >= BATCH or len(auction_rows) >= BATCH:
+            flush()
+            print(f"\r{auction_id}/{auctions} auctions, {bid_id} bids", end='', flush=True)
+    flush()
+
+    conn.executemany('''INSERT INTO leaderboard (user_id, username, total_wins, total_sales) VALUES (?, ?, ?, ?)''',
+                     ((uid, f"user{uid}", wins.get(uid, 0), sales.get(uid, 0)) for uid in set(wins) | set(sales)))
+    conn.executemany('''INSERT OR IGNORE INTO user_profiles (user_id, username, first_name, total_submissions,
+                                                            approved_submissions)
+                        VALUES (?, ?, ?, ?, ?)''',
+                     ((uid, f"user{uid}", f"User{uid}", sales.get(uid, 0), sales.get(uid, 0)) for uid in sellers))
+    conn.execute("UPDATE system_status SET auctions_open=1 WHERE id=1")
+    conn.commit()
+    conn.close()
+
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(path) / 1024 / 1024
+    print(f"\rGenerated {auctions} auctions ({active} active), {bid_id} bids, {users} users "
+          f"over {seasons} seasons in {elapsed:.0f}s; {size:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('path', help='database file to create (must not exist)')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplies auctions, bids and users')
+    parser.add_argument('--auctions', type=int, default=100000)
+    parser.add_argument('--bids-per-auction', type=float, default=20.0, help='mean, exponentially distributed')
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--seasons', type=int, default=100)
+    parser.add_argument('--active', type=int, default=300, help='auctions left open in the current season')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+    auctions = max(1, int(args.auctions * args.scale))
+    generate(os.path.abspath(args.path), auctions, args.bids_per_auction, max(10, int(args.users * args.scale)),
+             min(args.seasons, auctions), min(args.active, auctions), args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test: the real bot.py against tools/fake_bot_api.py.
+
+Seeds a throwaway database with open auctions and verified bidders, starts
+the fake Bot API in-process and bot.py as a subprocess pointed at it
+(TELEGRAM_API_URL), then lets N simulated users loose. Each user runs
+rounds of:
+
+  * /start bid_<id> deep link, read the minimum from the prompt, send a
+    bid and wait for the ✅ confirmation (re-bidding if outbid meanwhile)
+  * a 🔄 Refresh press on the auction's channel post
+  * /items and /mypoke
+
+and the run reports update throughput, p50/p99 latency per action, bid
+outcomes and the error/timeout rates, plus what the fake API saw
+(calls per method, injected 429s).
+
+    python tools/load_test.py [--users 500] [--concurrency 100] [--rounds 3]
+                              [--auctions 5] [--latency-ms 40] [--jitter-ms 40]
+                              [--rate-limit 0.01]
+
+The bot's own output is kept in <workdir>/bot.log (--keep keeps the
+workdir).
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_bot_api import FakeBotAPI, serve
+
+TOKEN = '123456:load-test-token-0123456789abcdefghij'
+CHANNEL_ID = -1001000000001
+LOGS_CHANNEL_ID = -1001000000002
+ADMIN_ID = 1
+USER_BASE = 500000
+CHANNEL_MESSAGE_BASE = 9000
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def seed(workdir, auctions, users):
+    """Create the schema through bot.init_db() and add auctions and verified bidders"""
+    os.environ['DB_PATH'] = os.path.join(workdir, 'auctions.db')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import bot
+        bot.init_db()
+        with bot.db_connection() as conn:
+            conn.execute("UPDATE system_status SET auctions_open=1 WHERE id=1")
+            for i in range(auctions):
+                conn.execute('''INSERT INTO auctions (item_text, base_price, is_active, auction_status,
+                                                      channel_message_id)
+                                VALUES (?, 1000, 1, 'active', ?)''',
+                             (f"Load test item {i}", CHANNEL_MESSAGE_BASE + i))
+            conn.executemany('''INSERT INTO verified_users (user_id, username, verified_by)
+                                VALUES (?, ?, ?)''',
+                             [(USER_BASE + i, f"user{USER_BASE + i}", ADMIN_ID) for i in range(users)])
+            conn.commit()
+        bot.close_all_connections()
+    return os.environ['DB_PATH'], bot.parse_bid_amount
+
+
+def start_bot(workdir, api_url, db_path):
+    env = dict(os.environ,
+               BOT_TOKEN=TOKEN,
+               TELEGRAM_API_URL=api_url,
+               DB_PATH=db_path,
+               BOT_MODE='polling',
+               CHANNEL_ID=str(CHANNEL_ID),
+               LOGS_CHANNEL_ID=str(LOGS_CHANNEL_ID),
+               DISCUSSION_ID=str(LOGS_CHANNEL_ID),
+               ADMIN_IDS=str(ADMIN_ID),
+               PORT=str(free_port()),
+               TMPDIR=workdir,
+               LOG_LEVEL=os.getenv('LOG_LEVEL', 'WARNING'),
+               PYTHONUNBUFFERED='1')
+    log = open(os.path.join(workdir, 'bot.log'), 'wb')
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, 'bot.py')],
+                               cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return process, log
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+class Scenario:
+    def __init__(self, api, args, parse_amount):
+        self.api = api
+        self.args = args
+        self.parse_amount = parse_amount
+        self.latencies = defaultdict(list)
+        self.outcomes = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, action, outcome, started=None, finished=None):
+        with self.lock:
+            self.outcomes[(action, outcome)] += 1
+            if started is not None and finished is not None:
+                self.latencies[action].append(finished - started)
+
+    def say(self, user_id, text, predicate=None):
+        """Send text as user_id and wait for the bot's reply; returns (sent_at, reply or None)"""
+        mark = self.api.outbox_mark(user_id)
+        sent_at = time.monotonic()
+        self.api.user_message(user_id, text)
+        return sent_at, self.api.wait_for_message(user_id, mark, predicate, self.args.timeout)
+
+    def reply_text(self, reply):
+        return reply[2].get('text') or reply[2].get('caption') or ''
+
+    def bid(self, user_id, rng):
+        auction_id = rng.randrange(self.args.auctions) + 1
+
+        sent_at, prompt = self.say(user_id, f"/start bid_{auction_id}",
+                                   lambda m, p: 'Minimum Bid' in (p.get('text') or '') or '❌' in (p.get('text') or ''))
+        if prompt is None:
+            return self.record('bid_prompt', 'timeout')
+        self.record('bid_prompt', 'ok', sent_at, prompt[0])
+        text = self.reply_text(prompt)
+        if 'Minimum Bid' not in text:
+            return self.record('bid_prompt', 'refused')
+        minimum = self.parse_amount(text.split('Minimum Bid:')[1].split()[0])
+
+        is_answer = lambda m, p: (p.get('text') or '').startswith(('✅ Your bid', '❌'))
+        for attempt in range(3):
+            amount = minimum + rng.choice([0, 0, 100, 500])
+            sent_at, answer = self.say(user_id, str(amount), is_answer)
+            if answer is None:
+                return self.record('bid', 'timeout')
+            text = self.reply_text(answer)
+            if text.startswith('✅'):
+                return self.record('bid', 'accepted', sent_at, answer[0])
+            if not text.startswith('❌ Bid must be at least'):
+                return self.record('bid', 'refused', sent_at, answer[0])
+            self.record('bid', 'outbid', sent_at, answer[0])
+            minimum = self.parse_amount(text.split('at least')[1].split()[0])
+        self.record('bid', 'gave_up')
+
+    def refresh(self, user_id, rng):
+        auction_index = rng.randrange(self.args.auctions)
+        sent_at = time.monotonic()
+        query_id = self.api.button_press(user_id, CHANNEL_ID, CHANNEL_MESSAGE_BASE + auction_index,
+                                         f"refresh_{auction_index + 1}")
+        answer = self.api.wait_for_answer(query_id, self.args.timeout)
+        if answer is None:
+            return self.record('refresh', 'timeout')
+        text = answer[1] or ''
+        if 'up to date' in text:
+            outcome = 'up_to_date'
+        elif 'queued' in text:
+            outcome = 'queued'
+        else:
+            outcome = 'other'
+        self.record('refresh', outcome, sent_at, answer[0])
+
+    def command(self, user_id, command):
+        sent_at, reply = self.say(user_id, command)
+        if reply is None:
+            return self.record(command, 'timeout')
+        self.record(command, 'ok', sent_at, reply[0])
+
+    def run_user(self, index):
+        rng = random.Random(index)
+        user_id = USER_BASE + index
+        for _ in range(self.args.rounds):
+            self.bid(user_id, rng)
+            self.refresh(user_id, rng)
+            self.command(user_id, '/items')
+            self.command(user_id, '/mypoke')
+
+
+def report(scenario, api, elapsed, bot_exit):
+    outcomes = scenario.outcomes
+    actions = sorted({action for action, _ in outcomes})
+    total = sum(outcomes.values())
+
+    print(f"\n{total} actions in {elapsed:.1f}s ({total / elapsed:.1f} actions/s)")
+    print(f"{'action':<12} {'count':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}  outcomes")
+    for action in actions:
+        counts = {outcome: n for (a, outcome), n in outcomes.items() if a == action}
+        latencies = scenario.latencies.get(action, [])
+        print(f"{action:<12} {sum(counts.values()):>7} "
+              f"{percentile(latencies, 50) * 1000:>8.0f} {percentile(latencies, 99) * 1000:>8.0f} "
+              f"{(max(latencies) if latencies else float('nan')) * 1000:>8.0f}  "
+              + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+
+    failures = sum(n for (_, outcome), n in outcomes.items() if outcome in ('timeout', 'gave_up'))
+    accepted = outcomes[('bid', 'accepted')]
+    print(f"\nbids accepted: {accepted} ({accepted / elapsed:.1f}/s); "
+          f"errors: {failures} ({failures / max(total, 1):.2%} of actions)")
+
+    with api.stats_lock:
+        stats = dict(api.stats)
+    calls = {k.split('.', 1)[1]: v for k, v in stats.items() if k.startswith('method.')}
+    print("fake API calls: " + ", ".join(f"{k}={v}" for k, v in sorted(calls.items())))
+    print(f"injected 429s: {stats.get('injected_429', 0)}, unfaked methods: {stats.get('unknown_method', 0)}, "
+          f"duplicate callback answers: {stats.get('duplicate_answer', 0)}")
+    print(f"bot exit code: {bot_exit}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=100, help='users active at once')
+    parser.add_argument('--rounds', type=int, default=3, help='scenario rounds per user')
+    parser.add_argument('--auctions', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=40.0)
+    parser.add_argument('--jitter-ms', type=float, default=40.0)
+    parser.add_argument('--rate-limit', type=float, default=0.01,
+                        help='share of send/edit/copy calls answered with 429')
+    parser.add_argument('--timeout', type=float, default=60.0, help='seconds to wait for each reply')
+    parser.add_argument('--keep', action='store_true', help='keep the work directory')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='load_test_')
+    db_path, parse_amount = seed(workdir, args.auctions, args.users)
+
+    api = FakeBotAPI(args.latency_ms, args.jitter_ms, args.rate_limit, seed=1)
+    server, api_url = serve(api)
+    process, log = start_bot(workdir, api_url, db_path)
+    print(f"bot pid {process.pid}, fake API {api_url}, workdir {workdir}")
+
+    try:
+        if not api.polled.wait(60) or process.poll() is not None:
+            print(f"bot did not start polling; see {workdir}/bot.log")
+            return 1
+
+        scenario = Scenario(api, args, parse_amount)
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(scenario.run_user, range(args.users)))
+        elapsed = time.monotonic() - started
+    finally:
+        if process.poll() is None:
+            process.send_signal(signal.SIGINT)
+            try:
+                process.wait(60)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        log.close()
+        server.shutdown()
+
+    failures = report(scenario, api, elapsed, process.returncode)
+    if args.keep:
+        print(f"workdir kept at {workdir}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
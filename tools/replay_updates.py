@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Replay recorded Telegram Update JSON at the webhook endpoint.
+
+Point it at a running bot (BOT_MODE=webhook) to drive real handlers:
+
+    python tools/replay_updates.py updates.json --url http://127.0.0.1:10000/telegram/<WEBHOOK_PATH> --secret <WEBHOOK_SECRET>
+
+or run it with --self-test to check the keep_alive webhook route itself,
+in-process: every update must be accepted and parsed back into the same
+Update, and a wrong path or secret must be rejected.
+
+    python tools/replay_updates.py tools/sample_updates.json --self-test
+
+The input is a JSON array of updates or one update per line.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def load_updates(path):
+    with open(path, encoding='utf-8') as f:
+        text = f.read().strip()
+    if text.startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def replay(updates, url, secret, delay):
+    failures = 0
+    started = time.perf_counter()
+    for data in updates:
+        body = json.dumps(data).encode('utf-8')
+        req = urllib.request.Request(url, data=body, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+        if secret:
+            req.add_header('X-Telegram-Bot-Api-Secret-Token', secret)
+        sent = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                status = resp.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except urllib.error.URLError as e:
+            print(f"  update {data.get('update_id')}: {e.reason}")
+            return 1
+        elapsed_ms = (time.perf_counter() - sent) * 1000
+        print(f"  update {data.get('update_id')}: HTTP {status} in {elapsed_ms:.1f} ms")
+        if status != 200:
+            failures += 1
+        if delay:
+            time.sleep(delay)
+
+    total = time.perf_counter() - started
+    print(f"\n{len(updates)} updates replayed in {total:.2f}s, {failures} rejected")
+    return 1 if failures else 0
+
+
+def self_test(updates):
+    import telegram
+    import keep_alive
+
+    received = []
+    keep_alive.set_webhook_handler('test-path', lambda data: received.append(telegram.Update.de_json(data, None)),
+                                   secret_token='test-secret')
+    client = keep_alive.app.test_client()
+    headers = {'X-Telegram-Bot-Api-Secret-Token': 'test-secret'}
+
+    problems = []
+    for data in updates:
+        resp = client.post('/telegram/test-path', json=data, headers=headers)
+        if resp.status_code != 200:
+            problems.append(f"update {data.get('update_id')}: HTTP {resp.status_code}")
+
+    if [u.update_id for u in received] != [d['update_id'] for d in updates]:
+        problems.append("updates were not delivered to the handler in order")
+    for update, data in zip(received, updates):
+        if update.to_dict().get('update_id') != data['update_id'] or update.effective_user is None:
+            problems.append(f"update {data['update_id']} did not round-trip")
+
+    if client.post('/telegram/wrong-path', json=updates[0], headers=headers).status_code != 404:
+        problems.append("wrong path was not rejected with 404")
+    if client.post('/telegram/test-path', json=updates[0],
+                   headers={'X-Telegram-Bot-Api-Secret-Token': 'nope'}).status_code != 403:
+        problems.append("wrong secret was not rejected with 403")
+    if client.post('/telegram/test-path', data='not json', headers=headers).status_code != 400:
+        problems.append("malformed body was not rejected with 400")
+
+    print(f"{len(updates)} updates replayed through keep_alive, {len(received)} delivered")
+    for problem in problems:
+        print(f"  FAIL {problem}")
+    print("Webhook route OK" if not problems else f"{len(problems)} problems")
+    return 1 if problems else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('file', help="JSON array or JSON-lines file of Update objects")
+    parser.add_argument('--url', help="webhook URL of a running bot")
+    parser.add_argument('--secret', default=os.getenv('WEBHOOK_SECRET'),
+                        help="X-Telegram-Bot-Api-Secret-Token to send")
+    parser.add_argument('--delay', type=float, default=0, help="seconds between updates")
+    parser.add_argument('--self-test', action='store_true',
+                        help="check the keep_alive webhook route in-process instead")
+    args = parser.parse_args()
+
+    updates = load_updates(args.file)
+    if args.self_test:
+        return self_test(updates)
+    if not args.url:
+        parser.error("--url is required unless --self-test is given")
+    return replay(updates, args.url, args.secret, args.delay)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
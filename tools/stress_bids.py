@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Concurrent bid stress check for place_bid().
+
+Fires thousands of bids from many threads at a handful of auctions, each
+bidder reading the current minimum and racing to beat it, then checks the
+invariants the bid engine promises:
+
+  * every recorded bid beat the one before it (the base price for the
+    first bid) by at least get_min_increment, recomputed from the stored
+    bids rather than taken from place_bid's answer
+  * auctions.current_bid / current_bidder_id / winning_bid_id match the
+    highest accepted bid
+
+    python tools/stress_bids.py [--threads 16] [--bids 5000] [--auctions 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+BIDDER_BASE = 700000
+
+
+def setup(bot, auctions, bidders):
+    bot.init_db()
+    with bot.db_connection() as conn:
+        conn.execute("UPDATE system_status SET auctions_open=1 WHERE id=1")
+        for i in range(auctions):
+            conn.execute('''INSERT INTO auctions (item_text, base_price, is_active, auction_status)
+                            VALUES (?, 1000, 1, 'active')''', (f"Stress item {i}",))
+        for i in range(bidders):
+            conn.execute('''INSERT INTO verified_users (user_id, username, verified_by)
+                            VALUES (?, ?, 0)''', (BIDDER_BASE + i, f"bidder{i}"))
+        conn.commit()
+    bot.load_auth_cache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--bids', type=int, default=5000)
+    parser.add_argument('--auctions', type=int, default=3)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='stress_bids_'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        import bot
+        setup(bot, args.auctions, args.threads)
+
+    outcomes = Counter()
+    errors = []
+    lock = threading.Lock()
+    remaining = [args.bids]
+
+    def bidder(index):
+        rng = random.Random(index)
+        bidder_id = BIDDER_BASE + index
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            auction_id = rng.randint(1, args.auctions)
+            try:
+                # Read-then-bid like a real user: look at the minimum, then race everyone else
+                with bot.db_connection() as conn:
+                    row = conn.execute("SELECT * FROM auctions WHERE auction_id=?", (auction_id,)).fetchone()
+                seen_min = bot.get_min_bid(row)
+                amount = seen_min + rng.choice([0, 0, 0, 1, 50])
+                result = bot.place_bid(auction_id, bidder_id, f"bidder{index}", amount)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+                continue
+            with lock:
+                outcomes[result.status] += 1
+
+    threads = [threading.Thread(target=bidder, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    elapsed = time.perf_counter() - start
+
+    problems = list(errors[:5])
+    with bot.db_connection() as conn:
+        for auction_id in range(1, args.auctions + 1):
+            bids = conn.execute('''SELECT bid_id, bidder_id, amount FROM bids
+                                   WHERE auction_id=? AND is_active=1 ORDER BY bid_id''', (auction_id,)).fetchall()
+            auction = conn.execute("SELECT * FROM auctions WHERE auction_id=?", (auction_id,)).fetchone()
+
+            previous = auction['base_price']
+            for b in bids:
+                required = previous + bot.get_min_increment(previous)
+                if b['amount'] < required:
+                    problems.append(f"auction {auction_id}: bid #{b['bid_id']} of {b['amount']} "
+                                    f"is below {previous} + increment = {required}")
+                previous = b['amount']
+
+            if bids:
+                top = bids[-1]
+                if (auction['current_bid'] != top['amount'] or auction['current_bidder_id'] != top['bidder_id']
+                        or auction['winning_bid_id'] != top['bid_id']):
+                    problems.append(f"auction {auction_id}: winner columns {tuple(auction)[4:6]} "
+                                    f"don't match top bid {tuple(top)}")
+
+    total = sum(outcomes.values())
+    print(f"{total} bids from {args.threads} threads in {elapsed:.2f}s ({total / elapsed:.0f} bids/sec)")
+    print("  " + ", ".join(f"{status}: {count}" for status, count in sorted(outcomes.items())))
+    print(f"  {len(errors)} errors")
+
+    if problems:
+        print("\nINVARIANT VIOLATIONS:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print("All invariants hold")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())